@@ -0,0 +1 @@
+# Benchmarks (ejecutar desde src/ con python -m bench.<nombre>)
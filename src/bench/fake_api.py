@@ -0,0 +1,517 @@
+"""Servidor falso de la Bot API para pruebas de carga de bot.py.
+
+Implementa el subconjunto de metodos que usa el bot (getMe, deleteWebhook,
+setWebhook, getUpdates, sendMessage, editMessageText, answerCallbackQuery y
+setMyCommands) sobre un servidor HTTP minimo con asyncio, con latencia
+configurable y respuestas 429 inyectadas al azar. Si el bot registra un
+webhook, los updates se le envian por POST como hace Telegram.
+
+El driver lanza bot.py apuntando a este servidor (TELEGRAM_API_URL), juega
+muchas partidas de Hombres Lobo a la vez pulsando los botones que envia el
+bot y mide la latencia de punta a punta de cada update (desde que se entrega
+hasta la primera respuesta del bot) y el rendimiento total. Con --modo ambos
+juega la misma carga por polling y por webhook y compara las latencias.
+
+Uso: python -m bench.fake_api [--chats 200] [--jugadores 6 12]
+                              [--latencia-ms 30] [--jitter-ms 20] [--prob-429 0.01]
+                              [--workers 4] [--modo polling|webhook|ambos]
+     python -m bench.fake_api --solo-servidor --puerto 8081
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import signal
+import sys
+import socket
+import tempfile
+import time
+from collections import Counter
+from typing import Callable, Optional
+from urllib.parse import parse_qsl
+
+import httpx
+
+from core import callbacks
+from core.callbacks import Accion
+from games.tally import NO_LYNCH
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "MultiGame", "username": "multigame_bot",
+            "can_join_groups": True, "can_read_all_group_messages": False,
+            "supports_inline_queries": False}
+
+# Metodos a los que no se aplica latencia ni 429
+SIN_RETARDO = {"getMe", "getUpdates", "deleteWebhook", "setWebhook"}
+
+_STATUS = {200: b"OK", 404: b"Not Found", 429: b"Too Many Requests"}
+
+
+def _chat(chat_id: int) -> dict:
+    if chat_id < 0:
+        return {"id": chat_id, "type": "group", "title": f"Grupo {-chat_id}"}
+    return {"id": chat_id, "type": "private", "first_name": f"Jugador {chat_id}"}
+
+
+def _user(user_id: int) -> dict:
+    return {"id": user_id, "is_bot": False, "first_name": f"Jugador {user_id}"}
+
+
+def percentil(valores: list[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(p / 100 * len(valores)))]
+
+
+class FakeTelegram:
+    """Bot API en memoria. Los updates se inyectan con push_*()."""
+
+    def __init__(self, latencia: float = 0.0, jitter: float = 0.0, prob_429: float = 0.0,
+                 retry_after: int = 1, seed: Optional[int] = None):
+        self.latencia = latencia
+        self.jitter = jitter
+        self.prob_429 = prob_429
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self._updates: list[dict] = []
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._callback_ids = itertools.count(1)
+        self._nuevos = asyncio.Event()
+        self._server: Optional[asyncio.AbstractServer] = None
+        # El bot ya pide updates (getUpdates) o ha registrado su webhook
+        self.listo = asyncio.Event()
+        # Webhook registrado: (url, secret_token) y conexiones simultaneas
+        self.webhook: Optional[tuple[str, Optional[str]]] = None
+        self._webhook_slots: Optional[asyncio.Semaphore] = None
+        self._webhook_client: Optional[httpx.AsyncClient] = None
+        # Destino de los mensajes enviados por el bot (chat_id -> callback)
+        self.suscriptores: dict[int, Callable] = {}
+        # Esperas de latencia: primer mensaje a un chat / respuesta a un callback
+        self._esperando_chat: dict[int, tuple[float, asyncio.Future]] = {}
+        self._esperando_callback: dict[str, tuple[float, asyncio.Future]] = {}
+        self._callback_de_mensaje: dict[tuple[int, int], str] = {}
+        self.latencias: dict[str, list[float]] = {"comando": [], "callback": []}
+        # Estadisticas
+        self.metodos: Counter = Counter()
+        self.errores_429 = 0
+        self.updates_entregados = 0
+
+    # Inyeccion de updates
+    def _push(self, update: dict):
+        update["update_id"] = next(self._update_ids)
+        if self.webhook is not None:
+            asyncio.create_task(self._post_webhook(update))
+            return
+        self._updates.append(update)
+        self._nuevos.set()
+
+    async def _post_webhook(self, update: dict):
+        """Envia un update al webhook; como Telegram, reintenta si falla."""
+        url, secret_token = self.webhook
+        headers = {"X-Telegram-Bot-Api-Secret-Token": secret_token} if secret_token else {}
+        async with self._webhook_slots:
+            for _ in range(5):
+                try:
+                    response = await self._webhook_client.post(url, json=update, headers=headers)
+                    if response.status_code == 200:
+                        self.updates_entregados += 1
+                        return
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(0.1)
+        print(f"Webhook: update {update['update_id']} sin entregar")
+
+    def push_message(self, chat_id: int, user_id: int, text: str) -> asyncio.Future:
+        """Envia un comando al bot. El futuro se resuelve con su primera respuesta en el chat."""
+        entities = []
+        if text.startswith("/"):
+            entities.append({"type": "bot_command", "offset": 0, "length": len(text.split()[0])})
+        self._push({"message": {
+            "message_id": next(self._message_ids), "date": int(time.time()),
+            "chat": _chat(chat_id), "from": _user(user_id), "text": text, "entities": entities,
+        }})
+        future = asyncio.get_running_loop().create_future()
+        self._esperando_chat[chat_id] = (time.perf_counter(), future)
+        return future
+
+    def push_callback(self, chat_id: int, user_id: int, message_id: int, data: str) -> asyncio.Future:
+        """Pulsa un boton. El futuro se resuelve cuando el bot responde al callback
+        o edita el mensaje del boton (algunos handlers no llaman a answer)."""
+        callback_id = str(next(self._callback_ids))
+        self._push({"callback_query": {
+            "id": callback_id, "from": _user(user_id), "chat_instance": str(chat_id), "data": data,
+            "message": {"message_id": message_id, "date": int(time.time()), "chat": _chat(chat_id),
+                        "from": BOT_USER, "text": "..."},
+        }})
+        future = asyncio.get_running_loop().create_future()
+        self._esperando_callback[callback_id] = (time.perf_counter(), future)
+        self._callback_de_mensaje[(chat_id, message_id)] = callback_id
+        return future
+
+    def _resolver(self, esperas: dict, key, tipo: str):
+        entry = esperas.pop(key, None)
+        if entry is not None:
+            start, future = entry
+            self.latencias[tipo].append(time.perf_counter() - start)
+            if not future.done():
+                future.set_result(None)
+
+    def _entregar(self, message: dict):
+        chat_id = message["chat"]["id"]
+        self._resolver(self._esperando_chat, chat_id, "comando")
+        suscriptor = self.suscriptores.get(chat_id)
+        if suscriptor is not None:
+            suscriptor(message)
+
+    # Metodos de la Bot API
+    async def _api_getMe(self, params):
+        return BOT_USER
+
+    async def _api_deleteWebhook(self, params):
+        self.webhook = None
+        return True
+
+    async def _api_setWebhook(self, params):
+        self.webhook = (params["url"], params.get("secret_token"))
+        max_connections = int(params.get("max_connections") or 40)
+        self._webhook_slots = asyncio.Semaphore(max_connections)
+        if self._webhook_client is None:
+            self._webhook_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=max_connections), timeout=30
+            )
+        self.listo.set()
+        return True
+
+    async def _api_getUpdates(self, params):
+        self.listo.set()
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 100)
+        timeout = float(params.get("timeout") or 0)
+        if offset:
+            self._updates = [u for u in self._updates if u["update_id"] >= offset]
+        if not self._updates and timeout:
+            self._nuevos.clear()
+            try:
+                await asyncio.wait_for(self._nuevos.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        updates = self._updates[:limit]
+        self.updates_entregados += len(updates)
+        return updates
+
+    async def _api_sendMessage(self, params):
+        chat_id = int(params["chat_id"])
+        message = {"message_id": next(self._message_ids), "date": int(time.time()),
+                   "chat": _chat(chat_id), "from": BOT_USER, "text": params.get("text", "")}
+        if "reply_markup" in params:
+            message["reply_markup"] = params["reply_markup"]
+        self._entregar(message)
+        return message
+
+    async def _api_editMessageText(self, params):
+        chat_id = int(params["chat_id"])
+        message = {"message_id": int(params["message_id"]), "date": int(time.time()),
+                   "edit_date": int(time.time()), "chat": _chat(chat_id), "from": BOT_USER,
+                   "text": params.get("text", "")}
+        callback_id = self._callback_de_mensaje.pop((chat_id, message["message_id"]), None)
+        self._resolver(self._esperando_callback, callback_id, "callback")
+        if "reply_markup" in params:
+            message["reply_markup"] = params["reply_markup"]
+            self._entregar(message)
+        return message
+
+    async def _api_answerCallbackQuery(self, params):
+        self._resolver(self._esperando_callback, str(params["callback_query_id"]), "callback")
+        return True
+
+    async def _api_setMyCommands(self, params):
+        return True
+
+    # HTTP
+    async def dispatch(self, method: str, params: dict) -> tuple[int, dict]:
+        self.metodos[method] += 1
+        handler = getattr(self, f"_api_{method}", None)
+        if handler is None:
+            return 404, {"ok": False, "error_code": 404, "description": "Not Found: method not found"}
+
+        if method not in SIN_RETARDO:
+            if self.latencia or self.jitter:
+                await asyncio.sleep(self.latencia + self.rng.uniform(0, self.jitter))
+            if self.prob_429 and self.rng.random() < self.prob_429:
+                self.errores_429 += 1
+                return 429, {
+                    "ok": False, "error_code": 429,
+                    "description": f"Too Many Requests: retry after {self.retry_after}",
+                    "parameters": {"retry_after": self.retry_after},
+                }
+        return 200, {"ok": True, "result": await handler(params)}
+
+    @staticmethod
+    def _params(content_type: str, body: bytes) -> dict:
+        if not body:
+            return {}
+        if content_type.startswith("application/json"):
+            return json.loads(body)
+        # python-telegram-bot manda form-urlencoded con los objetos en JSON
+        params = {}
+        for key, value in parse_qsl(body.decode()):
+            try:
+                params[key] = json.loads(value)
+            except ValueError:
+                params[key] = value
+        return params
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                path = request_line.split()[1].decode()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode().partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                method = path.split("?")[0].rsplit("/", 1)[-1]
+                status, payload = await self.dispatch(method, self._params(headers.get("content-type", ""), body))
+                data = json.dumps(payload).encode()
+                writer.write(
+                    b"HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+                    % (status, _STATUS[status], len(data)) + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        self._server = await asyncio.start_server(self._client, host, port)
+        return self._server
+
+    async def close(self):
+        """Cierra el servidor y despierta los getUpdates que siguen esperando."""
+        self._server.close()
+        self._nuevos.set()
+        await self._server.wait_closed()
+        if self._webhook_client is not None:
+            await self._webhook_client.aclose()
+        await asyncio.sleep(0.1)
+
+
+class PartidaLobos:
+    """Un grupo con sus jugadores que juega una partida pulsando los botones del bot."""
+
+    def __init__(self, api: FakeTelegram, chat_id: int, user_ids: list[int],
+                 rng: random.Random, timeout: float):
+        self.api = api
+        self.chat_id = chat_id
+        self.user_ids = user_ids
+        self.rng = rng
+        self.timeout = timeout
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        for chat in (chat_id, *user_ids):
+            api.suscriptores[chat] = self.inbox.put_nowait
+
+    async def _esperar(self, future: asyncio.Future):
+        try:
+            await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def comando(self, user_id: int, text: str):
+        await self._esperar(self.api.push_message(self.chat_id, user_id, text))
+
+    async def pulsar(self, chat_id: int, user_id: int, message_id: int, data: str):
+        await self._esperar(self.api.push_callback(chat_id, user_id, message_id, data))
+
+    async def jugar(self) -> str:
+        creador = self.user_ids[0]
+        await self.comando(creador, "/lobos")
+        for user_id in self.user_ids[1:]:
+            await self.comando(user_id, "/unirse")
+        await self.comando(creador, "/iniciar")
+
+        while True:
+            try:
+                message = await asyncio.wait_for(self.inbox.get(), self.timeout)
+            except asyncio.TimeoutError:
+                # Partida atascada (el bot dejo de responder)
+                await self.comando(creador, "/cancelar")
+                return "atascada"
+
+            chat_id = message["chat"]["id"]
+            text = message.get("text", "")
+            botones = [row[0]["callback_data"]
+                       for row in message.get("reply_markup", {}).get("inline_keyboard", [])]
+
+            if chat_id == self.chat_id:
+                if "GANA" in text:
+                    return "terminada"
+                if "Usen /votar" in text:
+                    await self.comando(creador, "/votar")
+                elif botones and callbacks.decode(botones[0])[0] == Accion.VOTO_DIA:
+                    # Votan todos los vivos (los que aparecen en la lista)
+                    votantes = [ids[1] for _, ids in map(callbacks.decode, botones) if ids[1] != NO_LYNCH]
+                    for votante in votantes:
+                        await self.pulsar(chat_id, votante, message["message_id"], self.rng.choice(botones))
+            elif botones:
+                await self._accion_nocturna(chat_id, message["message_id"], botones)
+
+    async def _accion_nocturna(self, user_id: int, message_id: int, botones: list[str]):
+        if callbacks.decode(botones[0])[0] == Accion.CUPIDO:
+            elegidos = self.rng.sample(botones[:-1], 2)
+            for data in elegidos + [botones[-1]]:
+                await self.pulsar(user_id, user_id, message_id, data)
+        else:
+            await self.pulsar(user_id, user_id, message_id, self.rng.choice(botones))
+
+
+def _puerto_libre(host: str) -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+async def lanzar_bot(url: str, directorio: str, limites_reales: bool,
+                     workers: int = 1, webhook: bool = False) -> asyncio.subprocess.Process:
+    src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env.update({
+        "TELEGRAM_API_URL": url,
+        "TELEGRAM_BOT_TOKEN": env.get("TELEGRAM_BOT_TOKEN", "123456:fake"),
+        "SNAPSHOT_PATH": os.path.join(directorio, "partidas.snapshot"),
+        "JOURNAL_DIR": os.path.join(directorio, "journal"),
+        "SHARD_WORKERS": str(workers),
+    })
+    env.pop("WEBHOOK_URL", None)
+    if webhook:
+        port = _puerto_libre("127.0.0.1")
+        env.update({
+            "WEBHOOK_URL": f"http://127.0.0.1:{port}/webhook",
+            "WEBHOOK_LISTEN": "127.0.0.1",
+            "WEBHOOK_PORT": str(port),
+            "WEBHOOK_SECRET": f"secreto{random.getrandbits(64):x}",
+        })
+    if not limites_reales:
+        # Los 429 los simula el servidor; sin limites se mide solo el bot
+        for key in ("RATE_GLOBAL", "RATE_CHAT", "RATE_CHAT_BURST"):
+            env.setdefault(key, "1000000")
+    log = open(os.path.join(directorio, "bot.log"), "wb")
+    return await asyncio.create_subprocess_exec(
+        sys.executable, os.path.join(src, "bot.py"), cwd=directorio, env=env,
+        stdout=log, stderr=asyncio.subprocess.STDOUT,
+    )
+
+
+async def ronda(args, modo: str) -> Optional[FakeTelegram]:
+    """Juega la carga completa con el bot recibiendo updates por `modo`."""
+    api = FakeTelegram(args.latencia_ms / 1000, args.jitter_ms / 1000, args.prob_429,
+                       args.retry_after, args.seed)
+    server = await api.serve(args.host, args.puerto)
+    port = server.sockets[0].getsockname()[1]
+    url = f"http://{args.host}:{port}/bot"
+    print(f"Bot API falsa en {url} ({modo})")
+
+    directorio = tempfile.mkdtemp(prefix="fake_api_")
+    bot = await lanzar_bot(url, directorio, args.limites_reales, args.workers, modo == "webhook")
+    try:
+        await asyncio.wait_for(api.listo.wait(), 30)
+    except asyncio.TimeoutError:
+        print(f"El bot no ha arrancado, ver {directorio}/bot.log")
+        bot.kill()
+        await api.close()
+        return None
+
+    rng = random.Random(args.seed)
+    partidas = []
+    for i in range(args.chats):
+        jugadores = rng.randint(*args.jugadores)
+        user_ids = [(i + 1) * 100 + j for j in range(jugadores)]
+        partidas.append(PartidaLobos(api, -(i + 1), user_ids, random.Random(rng.random()), args.timeout))
+
+    start = time.perf_counter()
+    resultados = Counter(await asyncio.gather(*(p.jugar() for p in partidas)))
+    elapsed = time.perf_counter() - start
+
+    bot.send_signal(signal.SIGINT)
+    try:
+        await asyncio.wait_for(bot.wait(), 15)
+    except asyncio.TimeoutError:
+        bot.kill()
+    await api.close()
+
+    llamadas = sum(api.metodos.values())
+    print(f"{args.chats} chats en {elapsed:.2f} s: {dict(resultados)}")
+    print(f"{api.updates_entregados} updates ({api.updates_entregados / elapsed:,.0f}/s), "
+          f"{llamadas} llamadas a la API ({llamadas / elapsed:,.0f}/s), {api.errores_429} respuestas 429")
+    print(f"{'latencia':<10}{'n':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for tipo, valores in api.latencias.items():
+        print(f"{tipo:<10}{len(valores):>8}" + "".join(
+            f"{percentil(valores, p) * 1000:>10.1f}" for p in (50, 95, 99, 100)))
+    print("Llamadas:", dict(api.metodos.most_common()))
+    print(f"Log del bot: {directorio}/bot.log")
+    return api
+
+
+def comparar(apis: dict[str, FakeTelegram]):
+    """Latencia de update a respuesta de cada modo, lado a lado."""
+    modos = list(apis)
+    print(f"\n{'latencia ms':<16}" + "".join(f"{modo:>12}" for modo in modos))
+    for tipo in ("comando", "callback"):
+        for p in (50, 95, 99):
+            print(f"{f'{tipo} p{p}':<16}" + "".join(
+                f"{percentil(apis[modo].latencias[tipo], p) * 1000:>12.1f}" for modo in modos))
+
+
+async def carga(args):
+    if args.solo_servidor:
+        api = FakeTelegram(args.latencia_ms / 1000, args.jitter_ms / 1000, args.prob_429,
+                           args.retry_after, args.seed)
+        server = await api.serve(args.host, args.puerto)
+        port = server.sockets[0].getsockname()[1]
+        print(f"Bot API falsa en http://{args.host}:{port}/bot")
+        async with server:
+            await server.serve_forever()
+        return
+
+    modos = ["polling", "webhook"] if args.modo == "ambos" else [args.modo]
+    apis = {}
+    for modo in modos:
+        api = await ronda(args, modo)
+        if api is not None:
+            apis[modo] = api
+    if len(apis) > 1:
+        comparar(apis)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chats", type=int, default=200)
+    parser.add_argument("--jugadores", type=int, nargs=2, default=[6, 12], metavar=("MIN", "MAX"))
+    parser.add_argument("--latencia-ms", type=float, default=30)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--prob-429", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=10, help="Segundos sin respuesta para dar una partida por atascada")
+    parser.add_argument("--limites-reales", action="store_true", help="Usar los RATE_* del bot en vez de quitarlos")
+    parser.add_argument("--workers", type=int, default=1, help="SHARD_WORKERS del bot (procesos worker)")
+    parser.add_argument("--modo", choices=["polling", "webhook", "ambos"], default="polling",
+                        help="Como recibe el bot los updates")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=0)
+    parser.add_argument("--solo-servidor", action="store_true", help="Solo levantar el servidor, sin bot ni carga")
+    parser.add_argument("--seed", type=int, default=None)
+    asyncio.run(carga(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
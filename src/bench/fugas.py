@@ -0,0 +1,220 @@
+"""Fugas en el ciclo de vida de las partidas.
+
+Uso: python -m bench.fugas [--partidas 100000] [--simultaneas 200] [--seed 1]
+
+Juega partidas sin Telegram pasando por GameLifecycle igual que los
+handlers del bot, con muchas a la vez en pocos chats y con jugadores que
+estan en varias: crear, unirse, salir (tambien a mitad de partida y hasta
+dejarla vacia), cancelar, seleccion de Cupido sin confirmar, plazos,
+partidas abandonadas (las elimina el barrido) y partidas terminadas.
+
+Al final cuenta las entradas de los indices que han quedado sin partida
+(GameLifecycle.leaks) y las partidas que siguen vivas en memoria. Termina
+con codigo 1 si hay alguna.
+"""
+import argparse
+import asyncio
+import gc
+import random
+import sys
+import time
+from collections import Counter
+
+from core import GameRegistry
+from core.commands import ChatCommands
+from core.deadlines import DeadlineScheduler
+from core.lifecycle import GameLifecycle
+from core.sweeper import IdleSweeper
+from games.hombres_lobo import WerewolfGame, Role
+from games.hombres_lobo.game import GamePhase
+from games.impostor import ImpostorGame
+from games.impostor.game import GameState
+from games.simulador import AgenteAleatorio, Simulador
+
+CHATS = 1000
+USUARIOS = 5000
+# Pasos maximos de una partida antes de darla por abandonada
+MAX_PASOS = 300
+
+
+class BotNulo:
+    """Solo lo que usa ChatCommands."""
+
+    async def set_my_commands(self, commands, scope=None):
+        return True
+
+
+def terminada(game) -> bool:
+    if isinstance(game, WerewolfGame):
+        return game.phase == GamePhase.FINISHED
+    return game.state == GameState.VOTING and game.all_voted()
+
+
+class Banco:
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.registry = GameRegistry()
+        self.registry.deadlines = DeadlineScheduler()
+        self.commands = ChatCommands({None: [], "impostor": [], "lobos": []}, delay=0)
+        self.lifecycle = GameLifecycle(self.registry, self.commands)
+        self.bot = BotNulo()
+        self.sim = Simulador(AgenteAleatorio(rng))
+        self.sweeper = IdleSweeper(self.registry, ttls={}, default_ttl=float("inf"))
+        self.sweeper.on_evict = lambda chat_id, motivo: self.lifecycle.end(self.bot, chat_id)
+        # chat_id -> pasos dados
+        self.en_curso: dict[int, int] = {}
+        self.finales = Counter()
+
+    def _fin(self, chat_id: int, como: str):
+        self.en_curso.pop(chat_id, None)
+        self.finales[como] += 1
+
+    async def crear(self):
+        rng = self.rng
+        chat_id = -rng.randrange(1, CHATS + 1)
+        if self.registry.get(chat_id) is not None:
+            return False
+        tipo = WerewolfGame if rng.random() < 0.7 else ImpostorGame
+        jugadores = rng.sample(range(1, USUARIOS + 1), rng.randint(6, 12))
+        game = tipo(chat_id=chat_id, creator_id=jugadores[0])
+        async with self.registry.lock(chat_id):
+            for user_id in jugadores:
+                game.add_player(user_id, f"Jugador {user_id}")
+            await self.lifecycle.create(self.bot, chat_id, game)
+        self.en_curso[chat_id] = 0
+        return True
+
+    async def paso(self, chat_id: int):
+        rng = self.rng
+        async with self.registry.lock(chat_id):
+            self.registry.touch(chat_id)
+            game = self.registry.get(chat_id)
+            if game is None:
+                # La elimino el tope
+                self._fin(chat_id, "expulsada")
+                return
+            self.en_curso[chat_id] += 1
+            r = rng.random()
+
+            if self.en_curso[chat_id] > MAX_PASOS or r < 0.01:
+                # Nadie vuelve a tocarla: la elimina el barrido
+                self._fin(chat_id, "abandonada")
+            elif r < 0.03:
+                await self.lifecycle.end(self.bot, chat_id)
+                self._fin(chat_id, "cancelada")
+            elif r < 0.08:
+                user_id = rng.choice(list(game.players))
+                if game.creator_id == user_id:
+                    # Sin creador no se puede empezar: se van todos
+                    for user_id in list(game.players):
+                        await self.lifecycle.leave(self.bot, chat_id, game, user_id)
+                else:
+                    await self.lifecycle.leave(self.bot, chat_id, game, user_id)
+                if self.registry.get(chat_id) is None:
+                    self._fin(chat_id, "vacia")
+            elif isinstance(game, ImpostorGame):
+                self._impostor(chat_id, game)
+            else:
+                self._lobos(chat_id, game)
+
+            if chat_id in self.en_curso and terminada(game):
+                await self.lifecycle.end(self.bot, chat_id)
+                self._fin(chat_id, "terminada")
+
+    def _impostor(self, chat_id: int, game: ImpostorGame):
+        if game.state == GameState.LOBBY:
+            if game.start_game(game.creator_id)[0]:
+                self.lifecycle.start(chat_id, game)
+            return
+        for user_id in game.players:
+            game.get_player_role(user_id)
+        game.start_voting()
+        for user_id in list(game.players):
+            game.vote(user_id, self.rng.choice([u for u in game.players if u != user_id]))
+
+    def _lobos(self, chat_id: int, game: WerewolfGame):
+        registry = self.registry
+        if game.phase == GamePhase.LOBBY:
+            if game.start_game(game.creator_id)[0]:
+                self.lifecycle.start(chat_id, game)
+                registry.deadlines.schedule(chat_id, 90, (game.phase, game.day_number))
+            return
+
+        cupido = game.holder(Role.CUPIDO)
+        if game.phase == GamePhase.NIGHT and cupido and Role.CUPIDO in game.pending_actions:
+            # Cupido elige y a veces no confirma (se queda la seleccion hasta que acabe la partida)
+            selections = registry.selection(cupido.user_id)
+            selections[:] = [p.user_id for p in game.get_alive_players()][:2]
+            if self.rng.random() < 0.5:
+                registry.drop_selection(cupido.user_id)
+        if game.phase == GamePhase.NIGHT:
+            self.sim._noche(game)
+            if game.phase == GamePhase.NIGHT:
+                game.expire_night()
+                game.resolve_night()
+        elif game.phase == GamePhase.HUNTER:
+            game.skip_hunter()
+        else:
+            self.sim._dia(game)
+        if game.phase != GamePhase.FINISHED:
+            registry.deadlines.schedule(chat_id, 90, (game.phase, game.day_number))
+
+    async def jugar(self, partidas: int, simultaneas: int):
+        rng = self.rng
+        sweeper = self.sweeper
+        # Las abandonadas son las menos recientes: el tope las elimina antes que a las demas
+        sweeper.max_games = simultaneas + simultaneas // 4
+        creadas = 0
+        while creadas < partidas or self.en_curso:
+            if creadas < partidas and len(self.en_curso) < simultaneas:
+                creadas += await self.crear()
+                if len(self.registry) > sweeper.max_games:
+                    await sweeper.sweep()
+                continue
+            await self.paso(rng.choice(list(self.en_curso)))
+
+        # Las abandonadas que quedan: sin tope y con TTL 0 las elimina todas
+        sweeper.max_games = 0
+        sweeper.default_ttl = 0
+        await sweeper.sweep()
+        await self.commands.flush(self.bot)
+        return sweeper.evicted
+
+
+async def medir(partidas: int, simultaneas: int, seed: int) -> int:
+    banco = Banco(random.Random(seed))
+    start = time.perf_counter()
+    barridas = await banco.jugar(partidas, simultaneas)
+    elapsed = time.perf_counter() - start
+
+    print(f"{partidas} partidas en {elapsed:.1f}s ({partidas / elapsed:,.0f}/s)")
+    print("Finales: " + ", ".join(f"{k} {v}" for k, v in sorted(banco.finales.items())))
+    print(f"Eliminadas por el barrido: {barridas['idle']} inactivas, {barridas['cap']} por el tope")
+
+    fugas = banco.lifecycle.leaks()
+    del banco
+    gc.collect()
+    vivas = sum(isinstance(o, (WerewolfGame, ImpostorGame)) for o in gc.get_objects())
+    fugas["partidas en memoria"] = [None] * vivas
+
+    total = 0
+    for indice, entradas in fugas.items():
+        total += len(entradas)
+        detalle = f"  {entradas[:5]}" if entradas and entradas[0] is not None else ""
+        print(f"  {indice:<22}{len(entradas):>8}{detalle}")
+    print("Fugas: ninguna" if total == 0 else f"Fugas: {total}")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--partidas", type=int, default=100000)
+    parser.add_argument("--simultaneas", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if asyncio.run(medir(args.partidas, args.simultaneas, args.seed)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
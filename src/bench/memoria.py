@@ -0,0 +1,103 @@
+"""Memoria por partida con 12 jugadores, con y sin __slots__.
+
+Uso: python -m bench.memoria [--partidas 1000 10000]
+
+La version "sin slots" es una copia de las mismas clases generada con
+dataclasses.make_dataclass, con los mismos campos pero con __dict__ por
+instancia, para comparar antes/despues con las partidas reales.
+"""
+import argparse
+import dataclasses
+import gc
+import tracemalloc
+
+from games.hombres_lobo import WerewolfGame
+from games.impostor import ImpostorGame
+
+JUGADORES = 12
+
+
+def crear_lobos(chat_id: int) -> WerewolfGame:
+    game = WerewolfGame(chat_id=chat_id, creator_id=1)
+    for user_id in range(1, JUGADORES + 1):
+        game.add_player(user_id, f"Jugador {user_id}", f"jugador{user_id}")
+    game.start_game(1)
+    return game
+
+
+def crear_impostor(chat_id: int) -> ImpostorGame:
+    game = ImpostorGame(chat_id=chat_id, creator_id=1)
+    for user_id in range(1, JUGADORES + 1):
+        game.add_player(user_id, f"Jugador {user_id}", f"jugador{user_id}")
+    game.start_game(1)
+    return game
+
+
+_clases_dict: dict[type, type] = {}
+
+
+def _clase_dict(cls: type) -> type:
+    """Misma dataclass pero sin __slots__ (con __dict__ por instancia)."""
+    if cls not in _clases_dict:
+        campos = [(f.name, f.type, dataclasses.field(default=None)) for f in dataclasses.fields(cls)]
+        _clases_dict[cls] = dataclasses.make_dataclass(cls.__name__ + "Dict", campos)
+    return _clases_dict[cls]
+
+
+def a_dict(obj, memo: dict):
+    """Copia profunda que cambia cada dataclass por su version con __dict__."""
+    key = id(obj)
+    if key in memo:
+        return memo[key]
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        copia = _clase_dict(type(obj))()
+        memo[key] = copia
+        for f in dataclasses.fields(obj):
+            setattr(copia, f.name, a_dict(getattr(obj, f.name), memo))
+        return copia
+    if isinstance(obj, dict):
+        copia = memo[key] = {}
+        for k, v in obj.items():
+            copia[k] = a_dict(v, memo)
+        return copia
+    if isinstance(obj, list):
+        copia = memo[key] = []
+        copia.extend(a_dict(v, memo) for v in obj)
+        return copia
+    return obj
+
+
+def medir(crear, partidas: int, sin_slots: bool) -> int:
+    """Bytes asignados para mantener `partidas` partidas vivas."""
+    gc.collect()
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    if sin_slots:
+        juegos = [a_dict(crear(-i), {}) for i in range(partidas)]
+    else:
+        juegos = [crear(-i) for i in range(partidas)]
+    total = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    del juegos
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--partidas", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'juego':<10}{'partidas':>10}{'sin slots':>14}{'con slots':>14}{'ahorro':>9}{'B/partida':>11}")
+    for nombre, crear in (("lobos", crear_lobos), ("impostor", crear_impostor)):
+        for partidas in args.partidas:
+            antes = medir(crear, partidas, sin_slots=True)
+            despues = medir(crear, partidas, sin_slots=False)
+            ahorro = 100 * (antes - despues) / antes
+            print(
+                f"{nombre:<10}{partidas:>10}{antes:>14,}{despues:>14,}"
+                f"{ahorro:>8.1f}%{despues // partidas:>11,}"
+            )
+
+
+if __name__ == "__main__":
+    main()
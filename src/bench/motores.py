@@ -0,0 +1,352 @@
+"""Microbenchmarks de los motores de juego por tamano de partida.
+
+Mide los metodos mas usados de WerewolfGame e ImpostorGame con partidas de
+6 a 500 jugadores, guarda los resultados en JSON y los compara con una
+baseline: si algun caso es mas lento que la baseline por encima del umbral,
+termina con codigo 1. Junto a cada caso se mide un bucle de calibracion fijo
+y se compara el tiempo relativo a el, asi que la baseline sirve en cualquier
+maquina y no depende de lo cargada que este mientras se mide. Hay que
+regenerarla (--guardar-baseline) en cada cambio que haga mas lento un caso
+a proposito.
+
+Uso: python -m bench.motores [--tamanos 6 12 50 100 500] [--salida resultados.json]
+                             [--baseline bench/motores_baseline.json] [--umbral 0.2]
+     python -m bench.motores --guardar-baseline
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import time
+from typing import Callable
+
+from games.hombres_lobo import WerewolfGame, Role
+from games.impostor import ImpostorGame
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "motores_baseline.json")
+TAMANOS = [6, 12, 50, 100, 500]
+SEED = 1234
+# Partidas preparadas por lote en los metodos que cambian el estado
+LOTE_CAMBIA_ESTADO = 20
+# Llamadas por lote del bucle de calibracion (unos 100 us)
+LOTE_CALIBRACION = 5
+# Mediciones de cada caso al guardar la baseline (se queda la mediana)
+REPETICIONES_BASELINE = 3
+# Veces que se repite un caso que sale como regresion antes de darla por buena
+REPETICIONES_CONFIRMAR = 2
+
+
+# Partidas de ejemplo para cada caso
+def _lobby_lobos(n: int) -> WerewolfGame:
+    game = WerewolfGame(chat_id=-1, creator_id=1)
+    for user_id in range(1, n + 1):
+        game.add_player(user_id, f"Jugador {user_id}")
+    return game
+
+
+def _lobos(n: int) -> WerewolfGame:
+    game = _lobby_lobos(n)
+    game.start_game(1, SEED)
+    return game
+
+
+def _votacion_lobos(n: int) -> WerewolfGame:
+    """Partida en la votacion del primer dia, sin votos."""
+    game = _lobos(n)
+    game.resolve_night()
+    game.start_voting()
+    return game
+
+
+def _lobby_impostor(n: int) -> ImpostorGame:
+    game = ImpostorGame(chat_id=-1, creator_id=1)
+    for user_id in range(1, n + 1):
+        game.add_player(user_id, f"Jugador {user_id}")
+    return game
+
+
+def _votacion_impostor(n: int) -> ImpostorGame:
+    game = _lobby_impostor(n)
+    game.start_game(1, SEED)
+    game.start_voting()
+    return game
+
+
+# Casos: nombre -> (preparar(n) -> llamada, cambia_estado)
+# Si la llamada cambia el estado se prepara una partida nueva para cada muestra.
+def _start_game(n):
+    game = _lobby_lobos(n)
+    return lambda: game.start_game(1, SEED)
+
+
+def _wolf_vote(n):
+    game = _lobos(n)
+    wolf = game.get_wolves()[0]
+    target = game.get_alive_non_wolves()[0]
+    return lambda: game.wolf_vote(wolf.user_id, target.user_id)
+
+
+def _day_vote(n):
+    game = _votacion_lobos(n)
+    voter, target = game.get_alive_players()[:2]
+    return lambda: game.day_vote(voter.user_id, target.user_id)
+
+
+def _resolve_voting(n):
+    # Todos votan al primer aldeano vivo: hay linchamiento
+    game = _votacion_lobos(n)
+    target = next(p for p in game.get_alive_non_wolves() if p.role != Role.CAZADOR)
+    for player in game.get_alive_players():
+        game.day_tally.cast(player.user_id, target.user_id)
+    return game._resolve_voting
+
+
+def _resolve_night(n):
+    game = _lobos(n)
+    wolves = game.get_wolves()
+    target = game.get_alive_non_wolves()[0]
+    for wolf in wolves:
+        game.wolf_vote(wolf.user_id, target.user_id)
+    return game.resolve_night
+
+
+def _check_winner(n):
+    return _lobos(n)._check_winner
+
+
+def _get_alive_list(n):
+    return _lobos(n).get_alive_list
+
+
+def _get_players_list_lobos(n):
+    return _lobos(n).get_players_list
+
+
+def _imp_start_game(n):
+    game = _lobby_impostor(n)
+    return lambda: game.start_game(1, SEED)
+
+
+def _imp_vote(n):
+    game = _votacion_impostor(n)
+    return lambda: game.vote(1, 2)
+
+
+def _imp_get_results(n):
+    game = _votacion_impostor(n)
+    for user_id in game.players:
+        game.vote(user_id, 1 if user_id != 1 else 2)
+    return game.get_results
+
+
+def _imp_get_players_list(n):
+    return _lobby_impostor(n).get_players_list
+
+
+CASOS: dict[str, tuple[Callable, bool]] = {
+    "lobos.start_game": (_start_game, True),
+    "lobos.wolf_vote": (_wolf_vote, True),
+    "lobos.day_vote": (_day_vote, True),
+    "lobos._resolve_voting": (_resolve_voting, True),
+    "lobos.resolve_night": (_resolve_night, True),
+    "lobos._check_winner": (_check_winner, False),
+    "lobos.get_alive_list": (_get_alive_list, False),
+    "lobos.get_players_list": (_get_players_list_lobos, False),
+    "impostor.start_game": (_imp_start_game, True),
+    "impostor.vote": (_imp_vote, True),
+    "impostor.get_results": (_imp_get_results, False),
+    "impostor.get_players_list": (_imp_get_players_list, False),
+}
+
+
+def _calibracion():
+    """Trabajo fijo en Python puro (dict, f-strings, ordenar) de unos 20 us."""
+    nombres = {}
+    for i in range(200):
+        nombres[i] = f"Jugador {i}"
+    return sorted(nombres.values(), key=len)
+
+
+def _lote(llamada: Callable) -> int:
+    """Llamadas por lote para que cada lote dure al menos ~200 us."""
+    lote = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(lote):
+            llamada()
+        if time.perf_counter_ns() - start >= 200_000 or lote >= 10_000:
+            return lote
+        lote *= 2
+
+
+def _calibrar() -> float:
+    """Tiempo por llamada (us) de un lote del bucle de calibracion."""
+    start = time.perf_counter_ns()
+    for _ in range(LOTE_CALIBRACION):
+        _calibracion()
+    return (time.perf_counter_ns() - start) / 1000 / LOTE_CALIBRACION
+
+
+def medir(preparar: Callable, cambia_estado: bool, n: int, muestras: int) -> tuple[list[float], list[float]]:
+    """Tiempo medio por llamada (us) de cada lote del caso y de la calibracion.
+
+    Antes de cada lote del caso se mide uno del bucle de calibracion, asi que
+    los dos pasan por los mismos momentos de carga de la maquina. Si la
+    llamada cambia el estado, cada llamada del lote va sobre una partida
+    recien preparada; la preparacion no se mide.
+    """
+    tiempos = []
+    calibraciones = []
+    gc.disable()
+    try:
+        if cambia_estado:
+            lote = LOTE_CAMBIA_ESTADO
+            for i in range(muestras + 1):
+                llamadas = [preparar(n) for _ in range(lote)]
+                calibracion = _calibrar()
+                start = time.perf_counter_ns()
+                for llamada in llamadas:
+                    llamada()
+                if i:  # El primer lote es de calentamiento
+                    tiempos.append((time.perf_counter_ns() - start) / 1000 / lote)
+                    calibraciones.append(calibracion)
+        else:
+            llamada = preparar(n)
+            lote = _lote(llamada)
+            for _ in range(muestras):
+                calibraciones.append(_calibrar())
+                start = time.perf_counter_ns()
+                for _ in range(lote):
+                    llamada()
+                tiempos.append((time.perf_counter_ns() - start) / 1000 / lote)
+    finally:
+        gc.enable()
+    return tiempos, calibraciones
+
+
+def medir_caso(nombre: str, n: int, muestras: int, repeticiones: int = 1) -> dict:
+    """Mide un caso `repeticiones` veces y devuelve la medicion mediana.
+
+    El tiempo relativo es el mejor lote del caso entre el mejor lote de la
+    calibracion: no depende de la maquina ni de lo cargada que este.
+    """
+    preparar, cambia_estado = CASOS[nombre]
+    mediciones = []
+    for _ in range(repeticiones):
+        tiempos, calibraciones = medir(preparar, cambia_estado, n, muestras)
+        mediciones.append({
+            "mediana_us": round(statistics.median(tiempos), 3),
+            "min_us": round(min(tiempos), 3),
+            "calibracion_us": round(min(calibraciones), 3),
+            "relativo": round(min(tiempos) / min(calibraciones), 6),
+        })
+    mediciones.sort(key=lambda m: m["relativo"])
+    return mediciones[len(mediciones) // 2]
+
+
+def ejecutar(tamanos: list[int], muestras: int, filtro: str = "", repeticiones: int = 1) -> dict:
+    resultados = {}
+    for nombre in CASOS:
+        if filtro not in nombre:
+            continue
+        for n in tamanos:
+            resultados[f"{nombre}[{n}]"] = medir_caso(nombre, n, muestras, repeticiones)
+    calibraciones = [m["calibracion_us"] for m in resultados.values()]
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "lotes": muestras,
+            "calibracion_us": statistics.median(calibraciones) if calibraciones else None,
+        },
+        "resultados": resultados,
+    }
+
+
+def confirmar(actual: dict, regresiones: list[str], muestras: int):
+    """Vuelve a medir los casos que empeoran y se queda con su mejor medicion.
+
+    Un lote lento por la carga de la maquina no debe bastar para fallar.
+    """
+    print(f"\nRepitiendo {len(regresiones)} casos que empeoran...\n")
+    for caso in regresiones:
+        nombre, n = caso[:-1].split("[")
+        for _ in range(REPETICIONES_CONFIRMAR):
+            medida = medir_caso(nombre, int(n), muestras)
+            if medida["relativo"] < actual["resultados"][caso]["relativo"]:
+                actual["resultados"][caso] = medida
+
+
+def comparar(actual: dict, baseline: dict, umbral: float, casos: list[str] | None = None) -> list[str]:
+    """Imprime la comparacion y devuelve los casos que empeoran mas del umbral.
+
+    Se compara el mejor lote en unidades del bucle de calibracion (relativo):
+    en una maquina compartida la mediana varia mucho mas entre ejecuciones, y
+    el tiempo absoluto cambia con la maquina y con su carga.
+    """
+    if "relativo" not in next(iter(baseline["resultados"].values()), {"relativo": 0}):
+        raise SystemExit("La baseline no tiene tiempos relativos; regenerala con --guardar-baseline")
+    regresiones = []
+    print(f"{'caso':<34}{'baseline':>10}{'actual':>10}{'actual us':>12}{'ratio':>8}")
+    for caso in casos or actual["resultados"]:
+        medida = actual["resultados"][caso]
+        base = baseline["resultados"].get(caso)
+        if base is None:
+            print(f"{caso:<34}{'-':>10}{medida['relativo']:>10.3f}{medida['min_us']:>12.2f}{'nuevo':>8}")
+            continue
+        ratio = medida["relativo"] / base["relativo"] if base["relativo"] else 1.0
+        marca = ""
+        if ratio > 1 + umbral:
+            regresiones.append(caso)
+            marca = "  REGRESION"
+        print(
+            f"{caso:<34}{base['relativo']:>10.3f}{medida['relativo']:>10.3f}"
+            f"{medida['min_us']:>12.2f}{ratio:>8.2f}{marca}"
+        )
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS)
+    parser.add_argument("--muestras", type=int, default=30, help="Lotes medidos por caso")
+    parser.add_argument("--caso", default="", help="Solo los casos que contengan este texto")
+    parser.add_argument("--salida", help="Fichero JSON donde guardar los resultados")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--umbral", type=float, default=0.2, help="Empeoramiento tolerado (0.2 = 20%%)")
+    parser.add_argument("--guardar-baseline", action="store_true")
+    args = parser.parse_args()
+
+    repeticiones = REPETICIONES_BASELINE if args.guardar_baseline else 1
+    actual = ejecutar(args.tamanos, args.muestras, args.caso, repeticiones)
+    if args.salida:
+        with open(args.salida, "w") as f:
+            json.dump(actual, f, indent=2)
+    if args.guardar_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(actual, f, indent=2)
+        print(f"Baseline guardada en {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        for caso, medida in actual["resultados"].items():
+            print(f"{caso:<34}{medida['relativo']:>10.3f}{medida['min_us']:>12.2f}")
+        print(f"Sin baseline ({args.baseline}); usa --guardar-baseline para crearla")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regresiones = comparar(actual, baseline, args.umbral)
+    if regresiones:
+        confirmar(actual, regresiones, args.muestras)
+        regresiones = comparar(actual, baseline, args.umbral, regresiones)
+    if regresiones:
+        print(f"\n{len(regresiones)} casos empeoran mas de un {args.umbral:.0%}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
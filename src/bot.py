@@ -1,12 +1,17 @@
 import os
 import asyncio
+import functools
+import time
 from dotenv import load_dotenv
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, BotCommand, BotCommandScopeChat
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, BotCommand
+from telegram.constants import ChatType
 from telegram.ext import (
     ApplicationBuilder,
     CommandHandler,
     CallbackQueryHandler,
+    CallbackContext,
     ContextTypes,
+    TypeHandler,
 )
 
 # Comandos por estado
@@ -36,234 +41,324 @@ COMMANDS_LOBOS = [
 ]
 from games.impostor import ImpostorGame
 from games.hombres_lobo import WerewolfGame
-from games.hombres_lobo.roles import Role, ROLES_INFO
+from games.hombres_lobo.game import GamePhase
+from games.hombres_lobo.roles import Role
+from games.hombres_lobo.night import Flautista
+from games.tally import NO_LYNCH
+from games import textos
+from core import GameRegistry
+from core.fanout import fan_out
+from core.outbound import OutboundScheduler
+from core.commands import ChatCommands
+from core.lifecycle import GameLifecycle
+from core.tally_board import TallyBoards
+from core import callbacks, fanout, journal, sharding, snapshot, webhook
+from core.callbacks import Accion
+from core.metrics import Metrics, MetricsServer, counter, game_collector, gauge, histograms
+from core.deadlines import DeadlineScheduler
+from core import sweeper as idle
 
 load_dotenv()
 
 TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+# URL alternativa de la Bot API (p. ej. el servidor falso de bench.fake_api)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL")
+NUM_SHARDS = int(os.getenv("NUM_SHARDS", "16"))
+# Mensajes privados que se envian a la vez al empezar la noche
+FANOUT_CONCURRENCY = int(os.getenv("FANOUT_CONCURRENCY", "8"))
+# Procesos worker entre los que se reparten los chats (1 = un solo proceso).
+# No se debe cambiar con partidas en curso: cada worker restaura solo sus chats.
+SHARD_WORKERS = int(os.getenv("SHARD_WORKERS", "1"))
+
+# Modo webhook: si hay WEBHOOK_URL los updates llegan por webhook en vez de por polling
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+# Sin WEBHOOK_SECRET se genera uno al azar en cada arranque
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or None
+# Updates procesandose a la vez como maximo en modo webhook
+WEBHOOK_MAX_INFLIGHT = int(os.getenv("WEBHOOK_MAX_INFLIGHT", "64"))
+
+# Limites de envio de la Bot API (mensajes por segundo)
+outbound = OutboundScheduler(
+    global_rate=float(os.getenv("RATE_GLOBAL", "30")),
+    chat_rate=float(os.getenv("RATE_CHAT", "1")),
+    chat_burst=float(os.getenv("RATE_CHAT_BURST", "3")),
+)
+
+# Almacen de partidas activas (con lock por chat)
+registry = GameRegistry(num_shards=NUM_SHARDS)
 
-# Almacen de partidas activas
-impostor_games: dict[int, ImpostorGame] = {}
-werewolf_games: dict[int, WerewolfGame] = {}
+# Journal de acciones (se escribe por lotes cada JOURNAL_FLUSH_MS)
+JOURNAL_DIR = os.getenv("JOURNAL_DIR", "journal")
+JOURNAL_FLUSH_MS = float(os.getenv("JOURNAL_FLUSH_MS", "50"))
+action_journal = journal.Journal(JOURNAL_DIR, flush_interval=JOURNAL_FLUSH_MS / 1000)
+
+# Comandos de cada chat: se agrupan los cambios de COMMANDS_DEBOUNCE_MS y no se repiten
+COMMANDS_DEBOUNCE_MS = float(os.getenv("COMMANDS_DEBOUNCE_MS", "1000"))
+chat_commands = ChatCommands(
+    {None: COMMANDS_DEFAULT, "impostor": COMMANDS_IMPOSTOR, "lobos": COMMANDS_LOBOS},
+    delay=COMMANDS_DEBOUNCE_MS / 1000,
+)
 
-# Mapeo de user_id -> chat_id para acciones privadas
-user_to_game: dict[int, int] = {}
+# Recuento de cada votacion en un mensaje que se edita como mucho una vez cada TALLY_DEBOUNCE_MS
+TALLY_DEBOUNCE_MS = float(os.getenv("TALLY_DEBOUNCE_MS", "1500"))
+tally_boards = TallyBoards(delay=TALLY_DEBOUNCE_MS / 1000)
+
+# Alta y baja de partidas: al terminar una se limpia todo lo que apunta a ella
+lifecycle = GameLifecycle(registry, chat_commands, tally_boards)
+
+# Snapshot periodico de las partidas en curso
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "partidas.snapshot")
+SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL", "30"))
+snapshotter = snapshot.Snapshotter(registry, SNAPSHOT_PATH, SNAPSHOT_INTERVAL, journal=action_journal,
+                                   chat_commands=chat_commands)
+
+# Plazos de cada fase (segundos). Al vencer se aplica la accion por defecto:
+# los roles que faltan no actuan, se abre o se cierra la votacion y el
+# Cazador no dispara
+PLAZOS = {
+    GamePhase.NIGHT: float(os.getenv("NIGHT_TIMEOUT", "90")),
+    GamePhase.DAY_DISCUSSION: float(os.getenv("DISCUSSION_TIMEOUT", "180")),
+    GamePhase.DAY_VOTING: float(os.getenv("VOTING_TIMEOUT", "90")),
+    GamePhase.HUNTER: float(os.getenv("HUNTER_TIMEOUT", "60")),
+}
+# Tiempo minimo que tiene la Bruja desde que se le pide su accion
+WITCH_TIMEOUT = float(os.getenv("WITCH_TIMEOUT", "45"))
+deadlines = DeadlineScheduler()
+registry.deadlines = deadlines
+
+# Partidas abandonadas: se eliminan tras IDLE_TTL_* segundos sin actividad de los
+# jugadores y, si MAX_GAMES > 0, se eliminan las menos recientes al pasar del tope
+sweeper = idle.IdleSweeper(
+    registry,
+    ttls={
+        "lobby": float(os.getenv("IDLE_TTL_LOBBY", "1800")),
+        "voting": float(os.getenv("IDLE_TTL_VOTING", "1800")),
+    },
+    default_ttl=float(os.getenv("IDLE_TTL", "3600")),
+    max_games=int(os.getenv("MAX_GAMES", "0")),
+    interval=float(os.getenv("SWEEP_INTERVAL", "60")),
+)
+
+# Metricas Prometheus en METRICS_LISTEN:METRICS_PORT/metrics (0 = desactivado).
+# Con SHARD_WORKERS el ingress usa METRICS_PORT y el worker i, METRICS_PORT + 1 + i
+metrics = Metrics()
+metrics.add_collector(game_collector(registry))
+metrics.add_collector(lambda: [
+    *gauge("bot_deadlines_pending", "Plazos de fase programados", [({}, len(deadlines))]),
+    *counter("bot_deadlines_expired_total", "Plazos de fase vencidos", [({}, deadlines.expired)]),
+])
+metrics.add_collector(lambda: counter(
+    "bot_games_evicted_total", "Partidas eliminadas por inactividad (idle) o por el tope (cap)",
+    (({"reason": reason}, n) for reason, n in sweeper.evicted.items()),
+))
+metrics.add_collector(lambda: [
+    *counter("bot_tally_edits_total", "Ediciones del mensaje de recuento", [({}, tally_boards.edits)]),
+    *counter("bot_tally_edits_saved_total", "Votos que no necesitaron su propia edicion del recuento",
+             [({}, tally_boards.saved)]),
+])
+metrics.add_collector(lambda: [
+    *histograms("bot_fanout_seconds", "Duracion de cada envio en paralelo por fase", "phase",
+                fanout.phase_stats),
+    *counter("bot_fanout_messages_total", "Mensajes enviados en paralelo por fase",
+             (({"phase": phase}, n) for phase, n in sorted(fanout.phase_messages.items()))),
+])
+outbound.metrics = metrics
+metrics_server = MetricsServer(
+    metrics, os.getenv("METRICS_LISTEN", "127.0.0.1"), int(os.getenv("METRICS_PORT", "0"))
+)
 
 
 # ==================== UTILIDADES ====================
 
-async def set_chat_commands(bot, chat_id: int, game_type: str | None):
-    """Actualiza los comandos disponibles en un chat segun el juego activo."""
-    try:
-        scope = BotCommandScopeChat(chat_id=chat_id)
-        if game_type == "impostor":
-            await bot.set_my_commands(COMMANDS_IMPOSTOR, scope=scope)
-        elif game_type == "lobos":
-            await bot.set_my_commands(COMMANDS_LOBOS, scope=scope)
-        else:
-            await bot.set_my_commands(COMMANDS_DEFAULT, scope=scope)
-    except Exception as e:
-        print(f"Error actualizando comandos del chat {chat_id}: {e}")
+def texto_recuento(game: WerewolfGame | ImpostorGame) -> str:
+    """Texto del mensaje de recuento de la votacion en curso."""
+    return f"🗳️ {game.get_tally_board()}"
+
+
+def programar_plazo(game: WerewolfGame, chat_id: int, segundos: float | None = None):
+    """Programa el plazo de la fase actual de la partida (o lo quita si no tiene)."""
+    plazo = PLAZOS.get(game.phase) if segundos is None else segundos
+    if plazo:
+        deadlines.schedule(chat_id, plazo, (game.phase, game.day_number))
+    else:
+        deadlines.cancel(chat_id)
 
 
 def get_game_for_user(user_id: int) -> tuple[WerewolfGame | None, int | None]:
     """Obtiene el juego en el que participa un usuario."""
-    chat_id = user_to_game.get(user_id)
+    chat_id = registry.chat_for_user(user_id)
     if chat_id:
-        game = werewolf_games.get(chat_id)
+        game = registry.get_werewolf(chat_id)
         if game and user_id in game.players:
             return game, chat_id
     return None, None
 
 
-async def send_night_actions(context: ContextTypes.DEFAULT_TYPE, game: WerewolfGame, chat_id: int):
-    """Envia las acciones nocturnas a cada rol."""
+def _chat_de_grupo(update: Update, *ids: int) -> int:
+    return update.effective_chat.id
 
-    from games.hombres_lobo.roles import Role
 
-    # Mensaje en el grupo
-    await context.bot.send_message(
-        chat_id=chat_id,
-        text=f"🌙 *NOCHE {game.day_number}*\n\nLa aldea duerme... Los roles especiales estan actuando.",
-        parse_mode="Markdown"
-    )
+def _chat_de_accion(update: Update, chat_id: int, *ids: int) -> int:
+    """Chat del grupo: primer id del callback_data de las acciones privadas."""
+    return chat_id
 
-    # Lista de jugadores vivos para botones
-    alive_players = game.get_alive_players()
 
-    for player in alive_players:
-        role = player.role
+def _chat_de_callback(update: Update) -> int:
+    """Chat del grupo embebido en el callback_data de un boton privado."""
+    try:
+        _, ids = callbacks.decode(update.callback_query.data)
+    except callbacks.CallbackDataError:
+        ids = ()
+    return ids[0] if ids else update.effective_chat.id
+
+
+def por_chat(handler, chat_id_de=_chat_de_grupo):
+    """Ejecuta el handler con el lock del chat al que afecta."""
+    @functools.wraps(handler)
+    async def envoltura(update: Update, context: ContextTypes.DEFAULT_TYPE, *ids: int):
+        chat_id = chat_id_de(update, *ids)
+        async with registry.lock(chat_id):
+            registry.touch(chat_id)
+            return await handler(update, context, *ids)
+    return envoltura
+
+
+def _botones(game: WerewolfGame, player, chat_id: int, accion: Accion, prefijo: str) -> list:
+    """Un boton por cada jugador que puede elegir con su accion nocturna."""
+    return [
+        [InlineKeyboardButton(f"{prefijo}{p.name}", callback_data=callbacks.encode(accion, chat_id, p.user_id))]
+        for p in game.night_targets(player)
+    ]
+
+
+def pedir_cupido(game: WerewolfGame, player, chat_id: int):
+    keyboard = _botones(game, player, chat_id, Accion.CUPIDO, textos.CUPIDO_BOTON)
+    keyboard.append([InlineKeyboardButton(textos.CUPIDO_CONFIRMAR, callback_data=callbacks.encode(Accion.CUPIDO_CONFIRMAR, chat_id))])
+    return textos.CUPIDO_PIDE, keyboard
 
-        try:
-            # CUPIDO - Solo primera noche
-            if role == Role.CUPIDO and game.day_number == 1:
-                keyboard = []
-                for p in alive_players:
-                    keyboard.append([InlineKeyboardButton(
-                        f"💕 {p.name}",
-                        callback_data=f"cupido_{chat_id}_{p.user_id}"
-                    )])
-                keyboard.append([InlineKeyboardButton("✅ Confirmar enamorados", callback_data=f"cupido_confirm_{chat_id}")])
-
-                await context.bot.send_message(
-                    chat_id=player.user_id,
-                    text="💘 *CUPIDO*\n\nElige a 2 jugadores para enamorarlos.\n(Haz click en 2 nombres)",
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode="Markdown"
-                )
-
-            # PROTECTOR
-            elif role == Role.PROTECTOR:
-                keyboard = []
-                for p in alive_players:
-                    if p.user_id != game.last_protected:  # No puede repetir
-                        keyboard.append([InlineKeyboardButton(
-                            f"🛡️ {p.name}",
-                            callback_data=f"protector_{chat_id}_{p.user_id}"
-                        )])
-
-                await context.bot.send_message(
-                    chat_id=player.user_id,
-                    text="🛡️ *PROTECTOR*\n\n¿A quien proteges esta noche?",
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode="Markdown"
-                )
-
-            # HOMBRES LOBO
-            elif role == Role.HOMBRE_LOBO:
-                # Mostrar quienes son los otros lobos
-                wolves = game.get_wolves()
-                wolf_names = [w.name for w in wolves if w.user_id != player.user_id]
-
-                keyboard = []
-                for p in game.get_alive_non_wolves():
-                    keyboard.append([InlineKeyboardButton(
-                        f"🩸 {p.name}",
-                        callback_data=f"lobo_{chat_id}_{p.user_id}"
-                    )])
-
-                otros_lobos = f"\nOtros lobos: {', '.join(wolf_names)}" if wolf_names else ""
-
-                await context.bot.send_message(
-                    chat_id=player.user_id,
-                    text=f"🐺 *HOMBRE LOBO*{otros_lobos}\n\n¿A quien devoran esta noche?",
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode="Markdown"
-                )
-
-            # VIDENTE
-            elif role == Role.VIDENTE:
-                keyboard = []
-                for p in alive_players:
-                    if p.user_id != player.user_id:
-                        keyboard.append([InlineKeyboardButton(
-                            f"🔮 {p.name}",
-                            callback_data=f"vidente_{chat_id}_{p.user_id}"
-                        )])
-
-                await context.bot.send_message(
-                    chat_id=player.user_id,
-                    text="🔮 *VIDENTE*\n\n¿A quien quieres investigar?",
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode="Markdown"
-                )
-
-            # BRUJA - Se le envia despues de que los lobos elijan
-            elif role == Role.BRUJA:
-                # Guardar referencia para enviarle despues
-                pass
-
-        except Exception as e:
-            print(f"Error enviando accion a {player.name}: {e}")
-
-
-async def send_witch_action(context: ContextTypes.DEFAULT_TYPE, game: WerewolfGame, chat_id: int):
-    """Envia la accion de la bruja despues de que los lobos elijan."""
-
-    bruja = next((p for p in game.get_alive_players() if p.role == Role.BRUJA), None)
-    if not bruja:
-        return
 
+def pedir_protector(game: WerewolfGame, player, chat_id: int):
+    # No puede repetir: night_targets ya quita al protegido de la noche anterior
+    return textos.PROTECTOR_PIDE, _botones(game, player, chat_id, Accion.PROTECTOR, textos.PROTECTOR_BOTON)
+
+
+def pedir_lobo(game: WerewolfGame, player, chat_id: int):
+    # Mostrar quienes son los otros lobos
+    wolf_names = [w.name for w in game.holders(Role.HOMBRE_LOBO) if w.user_id != player.user_id]
+    keyboard = _botones(game, player, chat_id, Accion.LOBO, textos.LOBO_BOTON)
+    return textos.lobo_pide(wolf_names), keyboard
+
+
+def pedir_vidente(game: WerewolfGame, player, chat_id: int):
+    return textos.VIDENTE_PIDE, _botones(game, player, chat_id, Accion.VIDENTE, textos.VIDENTE_BOTON)
+
+
+def pedir_bruja(game: WerewolfGame, player, chat_id: int):
     keyboard = []
+    victim_name = game.players[game.wolf_target].name if game.wolf_target else None
 
     # Pocion de vida
-    if not game.witch_heal_used and game.wolf_target:
-        victim_name = game.players[game.wolf_target].name
+    if not game.witch_heal_used and victim_name:
         keyboard.append([InlineKeyboardButton(
-            f"💚 Salvar a {victim_name}",
-            callback_data=f"bruja_heal_{chat_id}"
+            textos.bruja_boton_salvar(victim_name),
+            callback_data=callbacks.encode(Accion.BRUJA_CURAR, chat_id)
         )])
 
     # Pocion de muerte
     if not game.witch_kill_used:
         keyboard.append([InlineKeyboardButton(
-            "💀 Usar pocion de muerte",
-            callback_data=f"bruja_kill_{chat_id}"
+            textos.BRUJA_BOTON_MATAR,
+            callback_data=callbacks.encode(Accion.BRUJA_MATAR, chat_id)
         )])
 
     keyboard.append([InlineKeyboardButton(
-        "⏭️ No hacer nada",
-        callback_data=f"bruja_skip_{chat_id}"
+        textos.BRUJA_BOTON_NADA,
+        callback_data=callbacks.encode(Accion.BRUJA_NADA, chat_id)
     )])
 
-    victim_msg = ""
-    if game.wolf_target:
-        victim_msg = f"\n\nLos lobos atacaron a: {game.players[game.wolf_target].name}"
-
     pociones = []
     if not game.witch_heal_used:
-        pociones.append("💚 Vida")
+        pociones.append(textos.POCION_VIDA)
     if not game.witch_kill_used:
-        pociones.append("💀 Muerte")
-    pociones_msg = f"\nPociones disponibles: {', '.join(pociones)}" if pociones else "\nNo te quedan pociones."
+        pociones.append(textos.POCION_MUERTE)
 
-    try:
-        await context.bot.send_message(
-            chat_id=bruja.user_id,
-            text=f"🧙‍♀️ *BRUJA*{victim_msg}{pociones_msg}\n\n¿Que quieres hacer?",
+    return textos.bruja_pide(victim_name, pociones), keyboard
+
+
+def pedir_flautista(game: WerewolfGame, player, chat_id: int):
+    keyboard = _botones(game, player, chat_id, Accion.FLAUTISTA, textos.FLAUTISTA_BOTON)
+    return textos.flautista_pide(Flautista.per_night), keyboard
+
+
+# Mensaje privado (texto, teclado) con el que se pide su accion a cada rol nocturno
+PEDIR_ACCION = {
+    Role.CUPIDO: pedir_cupido,
+    Role.PROTECTOR: pedir_protector,
+    Role.HOMBRE_LOBO: pedir_lobo,
+    Role.VIDENTE: pedir_vidente,
+    Role.BRUJA: pedir_bruja,
+    Role.FLAUTISTA: pedir_flautista,
+}
+
+
+async def send_role_prompts(context: ContextTypes.DEFAULT_TYPE, game: WerewolfGame, chat_id: int, roles):
+    """Pide por privado su accion a los jugadores vivos con esos roles (en paralelo)."""
+    prompts = []
+    for role in roles:
+        pedir = PEDIR_ACCION[role]
+        for player in game.holders(role):
+            text, keyboard = pedir(game, player, chat_id)
+            prompts.append((player, text, keyboard))
+
+    jobs = [
+        functools.partial(
+            context.bot.send_message,
+            chat_id=player.user_id,
+            text=text,
             reply_markup=InlineKeyboardMarkup(keyboard),
             parse_mode="Markdown"
         )
-    except Exception as e:
-        print(f"Error enviando accion a Bruja: {e}")
+        for player, text, keyboard in prompts
+    ]
+    errors = await fan_out(jobs, FANOUT_CONCURRENCY, phase="acciones_nocturnas")
 
+    for (player, _, _), error in zip(prompts, errors):
+        if error:
+            print(f"Error enviando accion a {player.name}: {error}")
 
-async def check_night_complete(context: ContextTypes.DEFAULT_TYPE, game: WerewolfGame, chat_id: int):
-    """Verifica si todas las acciones nocturnas estan completas."""
 
-    alive = game.get_alive_players()
+async def send_night_actions(context: ContextTypes.DEFAULT_TYPE, game: WerewolfGame, chat_id: int):
+    """Envia las acciones nocturnas a los roles que ya pueden actuar."""
 
-    # Verificar Cupido (solo noche 1)
-    cupido = next((p for p in alive if p.role == Role.CUPIDO), None)
-    if cupido and game.day_number == 1 and not cupido.night_action_done:
-        return False
+    # Mensaje en el grupo
+    await context.bot.send_message(
+        chat_id=chat_id,
+        text=textos.noche_grupo(game.day_number),
+        parse_mode="Markdown"
+    )
 
-    # Verificar Protector
-    protector = next((p for p in alive if p.role == Role.PROTECTOR), None)
-    if protector and not protector.night_action_done:
-        return False
+    # Los que esperan a otro rol (la Bruja a los lobos) se avisan en check_night_complete
+    await send_role_prompts(context, game, chat_id, game.awake_roles())
 
-    # Verificar Lobos
-    wolves = game.get_wolves()
-    if not game.wolf_target:
-        return False
+    programar_plazo(game, chat_id)
 
-    # Verificar Vidente
-    vidente = next((p for p in alive if p.role == Role.VIDENTE), None)
-    if vidente and not vidente.night_action_done:
-        return False
 
-    # Verificar Bruja
-    bruja = next((p for p in alive if p.role == Role.BRUJA), None)
-    if bruja and not bruja.night_action_done:
-        # Enviar accion a la bruja si los lobos ya eligieron
-        if game.wolf_target and not hasattr(game, '_witch_notified'):
-            game._witch_notified = True
-            await send_witch_action(context, game, chat_id)
+async def check_night_complete(context: ContextTypes.DEFAULT_TYPE, game: WerewolfGame, chat_id: int):
+    """Avanza la noche tras una accion: avisa a quien ya puede actuar y resuelve si no queda nada."""
+
+    # Roles cuyo requisito acaba de cumplirse (la Bruja tras los lobos)
+    ready = game.pop_ready_prompts()
+    if ready:
+        # Tienen al menos WITCH_TIMEOUT aunque a la noche le quede menos
+        programar_plazo(game, chat_id, max(WITCH_TIMEOUT, deadlines.remaining(chat_id)))
+        await send_role_prompts(context, game, chat_id, ready)
+
+    if not game.night_complete():
         return False
 
     # Todas las acciones completas - resolver noche
-    game._witch_notified = False
     success, msg = game.resolve_night()
 
     await context.bot.send_message(
@@ -274,30 +369,126 @@ async def check_night_complete(context: ContextTypes.DEFAULT_TYPE, game: Werewol
 
     # Si el juego termino
     if game.phase.value == "finished":
-        del werewolf_games[chat_id]
-        # Limpiar mapeo de usuarios
-        for player in game.players.values():
-            if player.user_id in user_to_game:
-                del user_to_game[player.user_id]
-        await set_chat_commands(context.bot, chat_id, None)
+        await lifecycle.end(context.bot, chat_id)
+    else:
+        programar_plazo(game, chat_id)
 
     return True
 
 
+async def send_hunter_action(context: ContextTypes.DEFAULT_TYPE, game: WerewolfGame, chat_id: int):
+    """Pide su disparo al Cazador linchado."""
+    hunter = game.get_hunter()
+    if not hunter:
+        return
+
+    keyboard = []
+    for p in game.get_alive_players():
+        keyboard.append([InlineKeyboardButton(
+            f"{textos.CAZADOR_BOTON}{p.name}",
+            callback_data=callbacks.encode(Accion.CAZADOR, chat_id, p.user_id)
+        )])
+
+    programar_plazo(game, chat_id)
+    try:
+        await context.bot.send_message(
+            chat_id=hunter.user_id,
+            text=textos.CAZADOR_PIDE,
+            reply_markup=InlineKeyboardMarkup(keyboard),
+            parse_mode="Markdown"
+        )
+    except Exception as e:
+        print(f"Error enviando accion a Cazador: {e}")
+
+
+async def send_day_voting(context: ContextTypes.DEFAULT_TYPE, game: WerewolfGame, chat_id: int):
+    """Envia al grupo los botones de la votacion del pueblo."""
+    keyboard = []
+    for player in game.get_alive_players():
+        keyboard.append([InlineKeyboardButton(f"{textos.BOTON_VOTO}{player.name}", callback_data=callbacks.encode(Accion.VOTO_DIA, chat_id, player.user_id))])
+
+    keyboard.append([InlineKeyboardButton(textos.BOTON_NO_LINCHAR, callback_data=callbacks.encode(Accion.VOTO_DIA, chat_id, NO_LYNCH))])
+
+    programar_plazo(game, chat_id)
+    await context.bot.send_message(
+        chat_id=chat_id,
+        text=textos.votacion_pueblo(game.get_alive_list()),
+        reply_markup=InlineKeyboardMarkup(keyboard),
+        parse_mode="Markdown"
+    )
+    await tally_boards.open(context.bot, chat_id, texto_recuento(game))
+
+
+async def send_day_result(context: ContextTypes.DEFAULT_TYPE, game: WerewolfGame, chat_id: int,
+                          msg: str, vencido: bool = False):
+    """Publica el resultado del linchamiento (o del Cazador) y pasa a la fase siguiente."""
+    if game.phase == GamePhase.DAY_VOTING:
+        return
+
+    # El recuento queda con los votos finales
+    await tally_boards.close(context.bot, chat_id)
+    text = f"⏰ {msg}" if vencido else f"🐺 {msg}"
+    await context.bot.send_message(chat_id=chat_id, text=text)
+
+    if game.phase == GamePhase.FINISHED:
+        await lifecycle.end(context.bot, chat_id)
+    elif game.phase == GamePhase.NIGHT:
+        await send_night_actions(context, game, chat_id)
+    elif game.phase == GamePhase.HUNTER:
+        await send_hunter_action(context, game, chat_id)
+
+
+async def partida_expulsada(bot, chat_id: int, motivo: str):
+    """Termina la partida que elimina el barrido y avisa al grupo."""
+    game = await lifecycle.end(bot, chat_id)
+    if game is None:
+        return None
+    juego = textos.NOMBRE_IMPOSTOR if isinstance(game, ImpostorGame) else textos.NOMBRE_LOBOS
+    if motivo == idle.IDLE:
+        aviso = textos.cancelada_inactiva(juego)
+    else:
+        aviso = textos.cancelada_por_tope(juego)
+    try:
+        await bot.send_message(chat_id=chat_id, text=aviso)
+    except Exception as e:
+        print(f"Error avisando de la partida expulsada en {chat_id}: {e}")
+    return game
+
+
+async def plazo_vencido(context: ContextTypes.DEFAULT_TYPE, chat_id: int, stamp: tuple):
+    """Vence el plazo de una fase: se aplica la accion por defecto y la partida sigue."""
+    async with registry.lock(chat_id):
+        game = registry.get_werewolf(chat_id)
+        # La fase ya cambio (o la partida termino) mientras se esperaba el lock
+        if not game or (game.phase, game.day_number) != stamp:
+            return
+
+        if game.phase == GamePhase.NIGHT:
+            game.expire_night()
+            await check_night_complete(context, game, chat_id)
+        elif game.phase == GamePhase.DAY_DISCUSSION:
+            game.start_voting()
+            await context.bot.send_message(chat_id=chat_id, text=f"⏰ {textos.DEBATE_SIN_TIEMPO}")
+            await send_day_voting(context, game, chat_id)
+        elif game.phase == GamePhase.DAY_VOTING:
+            success, msg = game.close_voting()
+            await send_day_result(context, game, chat_id, msg, vencido=True)
+        elif game.phase == GamePhase.HUNTER:
+            success, msg = game.skip_hunter()
+            await send_day_result(context, game, chat_id, msg, vencido=True)
+
+
 # ==================== COMANDOS GENERALES ====================
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     keyboard = [
-        [InlineKeyboardButton("🎭 El Impostor", callback_data="menu_impostor")],
-        [InlineKeyboardButton("🐺 Hombres Lobo", callback_data="menu_werewolf")],
+        [InlineKeyboardButton(textos.BOTON_MENU_IMPOSTOR, callback_data=callbacks.encode(Accion.MENU_IMPOSTOR))],
+        [InlineKeyboardButton(textos.BOTON_MENU_LOBOS, callback_data=callbacks.encode(Accion.MENU_LOBOS))],
     ]
     reply_markup = InlineKeyboardMarkup(keyboard)
 
     await update.message.reply_text(
-        "🎮 *Bot MultiGame*\n\n"
-        "Bienvenido! Elige un juego:\n\n"
-        "🎭 *El Impostor* - 3+ jugadores\n"
-        "🐺 *Hombres Lobo* - 6+ jugadores",
+        textos.MENU,
         reply_markup=reply_markup,
         parse_mode="Markdown"
     )
@@ -307,37 +498,12 @@ async def ayuda(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
 
     # Mostrar ayuda segun el juego activo
-    if chat_id in impostor_games:
-        await update.message.reply_text(
-            "📖 *El Impostor - Comandos*\n\n"
-            "/unirse - Unirse a la partida\n"
-            "/salir - Salir de la partida\n"
-            "/iniciar - Iniciar el juego\n"
-            "/votar - Iniciar votacion\n"
-            "/cancelar - Cancelar la partida",
-            parse_mode="Markdown"
-        )
-    elif chat_id in werewolf_games:
-        await update.message.reply_text(
-            "📖 *Hombres Lobo - Comandos*\n\n"
-            "/unirse - Unirse a la partida\n"
-            "/salir - Salir de la partida\n"
-            "/iniciar - Iniciar el juego\n"
-            "/votar - Iniciar votacion\n"
-            "/vivos - Ver jugadores vivos\n"
-            "/rol - Ver tu rol\n"
-            "/cancelar - Cancelar la partida",
-            parse_mode="Markdown"
-        )
+    if registry.get_impostor(chat_id):
+        await update.message.reply_text(textos.AYUDA_IMPOSTOR, parse_mode="Markdown")
+    elif registry.get_werewolf(chat_id):
+        await update.message.reply_text(textos.AYUDA_LOBOS, parse_mode="Markdown")
     else:
-        await update.message.reply_text(
-            "📖 *Comandos disponibles*\n\n"
-            "/start - Menu principal\n"
-            "/ayuda - Ver comandos\n"
-            "/impostor - Crear partida El Impostor\n"
-            "/lobos - Crear partida Hombres Lobo",
-            parse_mode="Markdown"
-        )
+        await update.message.reply_text(textos.AYUDA, parse_mode="Markdown")
 
 
 # ==================== EL IMPOSTOR ====================
@@ -346,27 +512,21 @@ async def impostor_crear(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
     user = update.effective_user
 
-    if chat_id in impostor_games:
-        await update.message.reply_text("Ya hay una partida de El Impostor en este chat.")
+    if registry.get_impostor(chat_id):
+        await update.message.reply_text(textos.YA_HAY_IMPOSTOR)
         return
 
-    if chat_id in werewolf_games:
-        await update.message.reply_text("Ya hay una partida de Hombres Lobo en este chat.")
+    if registry.get_werewolf(chat_id):
+        await update.message.reply_text(textos.YA_HAY_LOBOS)
         return
 
     game = ImpostorGame(chat_id=chat_id, creator_id=user.id)
     game.add_player(user.id, user.full_name, user.username)
-    impostor_games[chat_id] = game
-
-    # Actualizar comandos del chat
-    await set_chat_commands(context.bot, chat_id, "impostor")
+    await lifecycle.create(context.bot, chat_id, game)
+    sweeper.check_cap()
 
     await update.message.reply_text(
-        f"🎭 *El Impostor*\n\n"
-        f"Partida creada por {user.full_name}!\n\n"
-        f"Usen /unirse para entrar.\n"
-        f"El creador usa /iniciar cuando esten listos.\n\n"
-        f"Jugadores: 1/{game.min_players}+",
+        textos.partida_creada(textos.IMP_TITULO, user.full_name, game.min_players),
         parse_mode="Markdown"
     )
 
@@ -375,9 +535,9 @@ async def impostor_unirse(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
     user = update.effective_user
 
-    game = impostor_games.get(chat_id)
+    game = registry.get_impostor(chat_id)
     if not game:
-        await update.message.reply_text("No hay partida activa. Usa /impostor para crear una.")
+        await update.message.reply_text(textos.SIN_PARTIDA_IMPOSTOR)
         return
 
     success, msg = game.add_player(user.id, user.full_name, user.username)
@@ -388,15 +548,14 @@ async def impostor_salir(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
     user = update.effective_user
 
-    game = impostor_games.get(chat_id)
+    game = registry.get_impostor(chat_id)
     if not game:
-        await update.message.reply_text("No hay partida activa.")
+        await update.message.reply_text(textos.SIN_PARTIDA)
         return
 
-    success, msg = game.remove_player(user.id)
+    success, msg = await lifecycle.leave(context.bot, chat_id, game, user.id)
     if msg == "GAME_EMPTY":
-        del impostor_games[chat_id]
-        await update.message.reply_text("Partida cancelada (no quedan jugadores).")
+        await update.message.reply_text(textos.PARTIDA_VACIA)
     else:
         await update.message.reply_text(msg)
 
@@ -405,9 +564,9 @@ async def impostor_iniciar(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
     user = update.effective_user
 
-    game = impostor_games.get(chat_id)
+    game = registry.get_impostor(chat_id)
     if not game:
-        await update.message.reply_text("No hay partida activa.")
+        await update.message.reply_text(textos.SIN_PARTIDA)
         return
 
     success, msg = game.start_game(user.id)
@@ -418,52 +577,44 @@ async def impostor_iniciar(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Crear botones para ver rol
     keyboard = []
     for i, player in enumerate(game.players.values()):
-        keyboard.append([InlineKeyboardButton(f"👤 {player.name}", callback_data=f"imp_rol_{player.user_id}")])
+        keyboard.append([InlineKeyboardButton(f"{textos.IMP_BOTON_ROL}{player.name}", callback_data=callbacks.encode(Accion.IMP_ROL, player.user_id))])
 
     reply_markup = InlineKeyboardMarkup(keyboard)
 
     await update.message.reply_text(
-        "🎭 *El juego ha comenzado!*\n\n"
-        "Cada jugador debe hacer click en su nombre para ver su rol.\n\n"
-        "Recuerda: El impostor NO conoce la palabra secreta.",
+        textos.IMP_EMPEZADO,
         reply_markup=reply_markup,
         parse_mode="Markdown"
     )
 
 
-async def impostor_rol_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def impostor_rol_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, target_id: int):
     query = update.callback_query
     user = query.from_user
     chat_id = query.message.chat_id
 
-    game = impostor_games.get(chat_id)
+    game = registry.get_impostor(chat_id)
     if not game:
-        await query.answer("No hay partida activa.")
+        await query.answer(textos.SIN_PARTIDA)
         return
 
-    target_id = int(query.data.split("_")[2])
-
     if user.id != target_id:
-        await query.answer("Este boton no es para ti!", show_alert=True)
+        await query.answer(textos.IMP_BOTON_NO_ES_TUYO, show_alert=True)
         return
 
     success, msg = game.get_player_role(user.id)
     await query.answer(msg, show_alert=True)
 
     if game.all_players_seen_role():
-        await query.message.reply_text(
-            "Todos han visto su rol!\n\n"
-            "Ahora discutan sobre la palabra. Pueden dar pistas o hacer preguntas.\n\n"
-            "Cuando esten listos para votar, usen /votar"
-        )
+        await query.message.reply_text(textos.IMP_TODOS_VIERON_ROL)
 
 
 async def impostor_votar(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
 
-    game = impostor_games.get(chat_id)
+    game = registry.get_impostor(chat_id)
     if not game:
-        await update.message.reply_text("No hay partida activa.")
+        await update.message.reply_text(textos.SIN_PARTIDA)
         return
 
     success, msg = game.start_voting()
@@ -473,40 +624,40 @@ async def impostor_votar(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     keyboard = []
     for player in game.players.values():
-        keyboard.append([InlineKeyboardButton(f"🗳️ {player.name}", callback_data=f"imp_vote_{player.user_id}")])
+        keyboard.append([InlineKeyboardButton(f"{textos.BOTON_VOTO}{player.name}", callback_data=callbacks.encode(Accion.IMP_VOTO, player.user_id))])
 
     reply_markup = InlineKeyboardMarkup(keyboard)
 
     await update.message.reply_text(
-        "🗳️ *VOTACION*\n\n"
-        "Voten por quien creen que es el impostor!",
+        textos.IMP_VOTACION,
         reply_markup=reply_markup,
         parse_mode="Markdown"
     )
+    await tally_boards.open(context.bot, chat_id, texto_recuento(game))
 
 
-async def impostor_vote_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def impostor_vote_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, target_id: int):
     query = update.callback_query
     user = query.from_user
     chat_id = query.message.chat_id
 
-    game = impostor_games.get(chat_id)
+    game = registry.get_impostor(chat_id)
     if not game:
-        await query.answer("No hay partida activa.")
+        await query.answer(textos.SIN_PARTIDA)
         return
 
-    target_id = int(query.data.split("_")[2])
-
     success, msg = game.vote(user.id, target_id)
     await query.answer(msg)
 
     if game.all_voted():
+        await tally_boards.close(context.bot, chat_id)
         result, players_won = game.get_results()
         emoji = "🎉" if players_won else "😈"
 
         await query.message.reply_text(f"{emoji} {result}")
-        del impostor_games[chat_id]
-        await set_chat_commands(context.bot, chat_id, None)
+        await lifecycle.end(context.bot, chat_id)
+    elif success:
+        await tally_boards.request(context.bot, chat_id, functools.partial(texto_recuento, game))
 
 
 # ==================== HOMBRES LOBO ====================
@@ -515,27 +666,21 @@ async def lobos_crear(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
     user = update.effective_user
 
-    if chat_id in werewolf_games:
-        await update.message.reply_text("Ya hay una partida de Hombres Lobo en este chat.")
+    if registry.get_werewolf(chat_id):
+        await update.message.reply_text(textos.YA_HAY_LOBOS)
         return
 
-    if chat_id in impostor_games:
-        await update.message.reply_text("Ya hay una partida de El Impostor en este chat.")
+    if registry.get_impostor(chat_id):
+        await update.message.reply_text(textos.YA_HAY_IMPOSTOR)
         return
 
     game = WerewolfGame(chat_id=chat_id, creator_id=user.id)
     game.add_player(user.id, user.full_name, user.username)
-    werewolf_games[chat_id] = game
-
-    # Actualizar comandos del chat
-    await set_chat_commands(context.bot, chat_id, "lobos")
+    await lifecycle.create(context.bot, chat_id, game)
+    sweeper.check_cap()
 
     await update.message.reply_text(
-        f"🐺 *Hombres Lobo de Castronegro*\n\n"
-        f"Partida creada por {user.full_name}!\n\n"
-        f"Usen /unirse para entrar.\n"
-        f"El creador usa /iniciar cuando esten listos.\n\n"
-        f"Jugadores: 1/{game.min_players}+",
+        textos.partida_creada(textos.LOBOS_TITULO, user.full_name, game.min_players),
         parse_mode="Markdown"
     )
 
@@ -544,15 +689,15 @@ async def lobos_unirse(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
     user = update.effective_user
 
-    game = werewolf_games.get(chat_id)
+    game = registry.get_werewolf(chat_id)
     if not game:
-        game = impostor_games.get(chat_id)
+        game = registry.get_impostor(chat_id)
         if game:
             success, msg = game.add_player(user.id, user.full_name, user.username)
             await update.message.reply_text(msg)
             return
 
-        await update.message.reply_text("No hay partida activa. Usa /impostor o /lobos para crear una.")
+        await update.message.reply_text(textos.SIN_PARTIDA_CREAR)
         return
 
     success, msg = game.add_player(user.id, user.full_name, user.username)
@@ -563,35 +708,43 @@ async def lobos_salir(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
     user = update.effective_user
 
-    game = werewolf_games.get(chat_id) or impostor_games.get(chat_id)
+    game = registry.get(chat_id)
     if not game:
-        await update.message.reply_text("No hay partida activa.")
+        await update.message.reply_text(textos.SIN_PARTIDA)
         return
 
-    success, msg = game.remove_player(user.id)
+    success, msg = await lifecycle.leave(context.bot, chat_id, game, user.id)
     if msg == "GAME_EMPTY":
-        if chat_id in werewolf_games:
-            del werewolf_games[chat_id]
-        if chat_id in impostor_games:
-            del impostor_games[chat_id]
-        await set_chat_commands(context.bot, chat_id, None)
-        await update.message.reply_text("Partida cancelada (no quedan jugadores).")
-    else:
-        await update.message.reply_text(msg)
+        await update.message.reply_text(textos.PARTIDA_VACIA)
+        return
+    await update.message.reply_text(msg)
+
+    if not success or not isinstance(game, WerewolfGame):
+        return
+    if game.phase == GamePhase.NIGHT:
+        # Si era el ultimo con su rol (o el lobo que faltaba) la noche puede haber terminado
+        await check_night_complete(context, game, chat_id)
+    elif game.voting_complete():
+        # Sin su voto puede que ya hayan votado todos los que quedan
+        success, msg = game.close_voting()
+        await send_day_result(context, game, chat_id, msg)
+    elif game.phase == GamePhase.DAY_VOTING:
+        # Sus votos (y los que tenia) ya no cuentan
+        await tally_boards.request(context.bot, chat_id, functools.partial(texto_recuento, game))
 
 
 async def lobos_iniciar(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
     user = update.effective_user
 
-    game = werewolf_games.get(chat_id)
+    game = registry.get_werewolf(chat_id)
     if not game:
-        game = impostor_games.get(chat_id)
+        game = registry.get_impostor(chat_id)
         if game:
             await impostor_iniciar(update, context)
             return
 
-        await update.message.reply_text("No hay partida activa.")
+        await update.message.reply_text(textos.SIN_PARTIDA)
         return
 
     success, msg = game.start_game(user.id)
@@ -600,31 +753,26 @@ async def lobos_iniciar(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     # Mapear usuarios al juego
-    for player in game.players.values():
-        user_to_game[player.user_id] = chat_id
-
-    # Enviar roles por privado
-    roles_enviados = []
-    roles_fallidos = []
+    lifecycle.start(chat_id, game)
+
+    # Enviar roles por privado (en paralelo)
+    players = list(game.players.values())
+    jobs = []
+    for player in players:
+        game.get_player_role(player.user_id)
+        jobs.append(functools.partial(
+            context.bot.send_message,
+            chat_id=player.user_id,
+            text=textos.ROL_PRIVADO[player.role],
+            parse_mode="Markdown"
+        ))
+    errors = await fan_out(jobs, FANOUT_CONCURRENCY, phase="roles")
 
-    for player in game.players.values():
-        try:
-            _, role_msg = game.get_player_role(player.user_id)
-            role_info = ROLES_INFO[player.role]
-            await context.bot.send_message(
-                chat_id=player.user_id,
-                text=f"🐺 *Hombres Lobo - Tu rol:*\n\n{role_info.emoji} *{role_info.name}*\n\n{role_info.description}",
-                parse_mode="Markdown"
-            )
-            roles_enviados.append(player.name)
-        except Exception:
-            roles_fallidos.append(player.name)
-
-    msg_enviados = f"Roles enviados a: {', '.join(roles_enviados)}" if roles_enviados else ""
-    msg_fallidos = f"\n⚠️ No pude enviar a: {', '.join(roles_fallidos)}\n(Deben iniciar chat conmigo primero)" if roles_fallidos else ""
+    roles_enviados = [p.name for p, error in zip(players, errors) if error is None]
+    roles_fallidos = [p.name for p, error in zip(players, errors) if error is not None]
 
     await update.message.reply_text(
-        f"🐺 *El juego ha comenzado!*\n\n{msg_enviados}{msg_fallidos}",
+        textos.lobos_empezado(roles_enviados, roles_fallidos),
         parse_mode="Markdown"
     )
 
@@ -636,36 +784,35 @@ async def lobos_rol(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
     user = update.effective_user
 
-    game = werewolf_games.get(chat_id) or impostor_games.get(chat_id)
+    game = registry.get(chat_id)
     if not game:
-        await update.message.reply_text("No hay partida activa.")
+        await update.message.reply_text(textos.SIN_PARTIDA)
         return
 
     if user.id not in game.players:
-        await update.message.reply_text("No estas en la partida.")
+        await update.message.reply_text(textos.NO_EN_PARTIDA)
         return
 
     player = game.players[user.id]
 
     if hasattr(player, 'role') and player.role:
-        role_info = ROLES_INFO[player.role]
-        msg = f"{role_info.emoji} *{role_info.name}*\n\n{role_info.description}"
+        msg = textos.ROL_FICHA[player.role]
     else:
         success, msg = game.get_player_role(user.id)
 
     try:
         await context.bot.send_message(chat_id=user.id, text=msg, parse_mode="Markdown")
-        await update.message.reply_text("Te envie tu rol por privado.")
+        await update.message.reply_text(textos.ROL_POR_PRIVADO)
     except Exception:
-        await update.message.reply_text("No pude enviarte el mensaje. Inicia una conversacion conmigo primero.")
+        await update.message.reply_text(textos.ROL_SIN_PRIVADO)
 
 
 async def lobos_jugadores(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
 
-    game = werewolf_games.get(chat_id) or impostor_games.get(chat_id)
+    game = registry.get(chat_id)
     if not game:
-        await update.message.reply_text("No hay partida activa.")
+        await update.message.reply_text(textos.SIN_PARTIDA)
         return
 
     await update.message.reply_text(game.get_players_list())
@@ -674,9 +821,9 @@ async def lobos_jugadores(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def lobos_vivos(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
 
-    game = werewolf_games.get(chat_id)
+    game = registry.get_werewolf(chat_id)
     if not game:
-        await update.message.reply_text("No hay partida activa de Hombres Lobo.")
+        await update.message.reply_text(textos.SIN_PARTIDA_LOBOS)
         return
 
     await update.message.reply_text(game.get_alive_list())
@@ -685,14 +832,14 @@ async def lobos_vivos(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def lobos_votar(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
 
-    game = werewolf_games.get(chat_id)
+    game = registry.get_werewolf(chat_id)
     if not game:
-        game = impostor_games.get(chat_id)
+        game = registry.get_impostor(chat_id)
         if game:
             await impostor_votar(update, context)
             return
 
-        await update.message.reply_text("No hay partida activa.")
+        await update.message.reply_text(textos.SIN_PARTIDA)
         return
 
     success, msg = game.start_voting()
@@ -700,45 +847,27 @@ async def lobos_votar(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(msg)
         return
 
-    keyboard = []
-    for player in game.get_alive_players():
-        keyboard.append([InlineKeyboardButton(f"🗳️ {player.name}", callback_data=f"wolf_vote_{chat_id}_{player.user_id}")])
-
-    keyboard.append([InlineKeyboardButton("⏭️ No linchar a nadie", callback_data=f"wolf_vote_{chat_id}_skip")])
-
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
-    await update.message.reply_text(
-        f"🗳️ *VOTACION DEL PUEBLO*\n\n{game.get_alive_list()}\n\nVoten por quien quieren linchar!",
-        reply_markup=reply_markup,
-        parse_mode="Markdown"
-    )
+    await send_day_voting(context, game, chat_id)
 
 
 # ==================== CALLBACKS ACCIONES NOCTURNAS ====================
 
-# Almacen temporal para seleccion de Cupido
-cupido_selections: dict[int, list[int]] = {}
-
-async def cupido_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def cupido_callback(update: Update, context: ContextTypes.DEFAULT_TYPE,
+                          chat_id: int, target_id: int | None = None):
     query = update.callback_query
     user = query.from_user
-    data = query.data
-
-    parts = data.split("_")
 
-    if parts[1] == "confirm":
+    if target_id is None:
         # Confirmar enamorados
-        chat_id = int(parts[2])
-        game = werewolf_games.get(chat_id)
+        game = registry.get_werewolf(chat_id)
 
-        if not game:
-            await query.answer("Partida no encontrada.")
+        if not game or user.id not in game.players:
+            await query.answer(textos.PARTIDA_NO_ENCONTRADA)
             return
 
-        selections = cupido_selections.get(user.id, [])
+        selections = registry.selection(user.id)
         if len(selections) != 2:
-            await query.answer("Debes seleccionar exactamente 2 jugadores!", show_alert=True)
+            await query.answer(textos.CUPIDO_ELIGE_DOS, show_alert=True)
             return
 
         success, msg = game.cupido_action(user.id, selections[0], selections[1])
@@ -752,68 +881,59 @@ async def cupido_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 try:
                     await context.bot.send_message(
                         chat_id=lover_id,
-                        text=f"💕 *Cupido te ha elegido!*\n\nEstas enamorado/a de {other_name}.\nSi uno muere, el otro tambien morira de amor.",
+                        text=textos.enamorado_de(other_name),
                         parse_mode="Markdown"
                     )
                 except:
                     pass
 
-            await query.edit_message_text("💘 Has enamorado a los jugadores seleccionados!")
-            del cupido_selections[user.id]
+            await query.edit_message_text(textos.CUPIDO_HECHO)
+            registry.drop_selection(user.id)
 
             await check_night_complete(context, game, chat_id)
     else:
-        # Seleccionar jugador
-        chat_id = int(parts[1])
-        target_id = int(parts[2])
-
-        if user.id not in cupido_selections:
-            cupido_selections[user.id] = []
+        # Seleccionar jugador (la seleccion se guarda hasta confirmar o hasta que acabe la partida)
+        game = registry.get_werewolf(chat_id)
+        if not game or user.id not in game.players:
+            await query.answer(textos.PARTIDA_NO_ENCONTRADA)
+            return
 
-        selections = cupido_selections[user.id]
+        selections = registry.selection(user.id)
 
         if target_id in selections:
             selections.remove(target_id)
-            await query.answer(f"Deseleccionado")
+            await query.answer(textos.CUPIDO_DESELECCIONADO)
         elif len(selections) < 2:
             selections.append(target_id)
-            await query.answer(f"Seleccionado ({len(selections)}/2)")
+            await query.answer(textos.cupido_seleccionado(len(selections)))
         else:
-            await query.answer("Ya seleccionaste 2 jugadores!", show_alert=True)
+            await query.answer(textos.CUPIDO_YA_DOS, show_alert=True)
 
 
-async def protector_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def protector_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, chat_id: int, target_id: int):
     query = update.callback_query
     user = query.from_user
 
-    parts = query.data.split("_")
-    chat_id = int(parts[1])
-    target_id = int(parts[2])
-
-    game = werewolf_games.get(chat_id)
+    game = registry.get_werewolf(chat_id)
     if not game:
-        await query.answer("Partida no encontrada.")
+        await query.answer(textos.PARTIDA_NO_ENCONTRADA)
         return
 
     success, msg = game.protector_action(user.id, target_id)
     await query.answer(msg, show_alert=True)
 
     if success:
-        await query.edit_message_text(f"🛡️ Proteges a {game.players[target_id].name} esta noche.")
+        await query.edit_message_text(textos.protector_hecho(game.players[target_id].name))
         await check_night_complete(context, game, chat_id)
 
 
-async def lobo_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def lobo_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, chat_id: int, target_id: int):
     query = update.callback_query
     user = query.from_user
 
-    parts = query.data.split("_")
-    chat_id = int(parts[1])
-    target_id = int(parts[2])
-
-    game = werewolf_games.get(chat_id)
+    game = registry.get_werewolf(chat_id)
     if not game:
-        await query.answer("Partida no encontrada.")
+        await query.answer(textos.PARTIDA_NO_ENCONTRADA)
         return
 
     success, msg = game.wolf_vote(user.id, target_id)
@@ -821,45 +941,38 @@ async def lobo_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     if success:
         target_name = game.players[target_id].name
-        await query.edit_message_text(f"🐺 Has votado por {target_name}.\n\n{msg}")
+        await query.edit_message_text(textos.lobo_hecho(target_name, msg))
 
         # Si todos los lobos votaron, notificar a la bruja
         if game.wolf_target:
             await check_night_complete(context, game, chat_id)
 
 
-async def vidente_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def vidente_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, chat_id: int, target_id: int):
     query = update.callback_query
     user = query.from_user
 
-    parts = query.data.split("_")
-    chat_id = int(parts[1])
-    target_id = int(parts[2])
-
-    game = werewolf_games.get(chat_id)
+    game = registry.get_werewolf(chat_id)
     if not game:
-        await query.answer("Partida no encontrada.")
+        await query.answer(textos.PARTIDA_NO_ENCONTRADA)
         return
 
     success, msg = game.vidente_action(user.id, target_id)
     await query.answer(msg, show_alert=True)
 
     if success:
-        await query.edit_message_text(f"🔮 Resultado de tu investigacion:\n\n{msg}")
+        await query.edit_message_text(textos.vidente_hecho(msg))
         await check_night_complete(context, game, chat_id)
 
 
-async def bruja_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def bruja_callback(update: Update, context: ContextTypes.DEFAULT_TYPE,
+                         chat_id: int, target_id: int | None = None, *, action: str):
     query = update.callback_query
     user = query.from_user
 
-    parts = query.data.split("_")
-    action = parts[1]
-    chat_id = int(parts[2])
-
-    game = werewolf_games.get(chat_id)
+    game = registry.get_werewolf(chat_id)
     if not game:
-        await query.answer("Partida no encontrada.")
+        await query.answer(textos.PARTIDA_NO_ENCONTRADA)
         return
 
     if action == "heal":
@@ -869,97 +982,87 @@ async def bruja_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     elif action == "kill":
         # Mostrar lista de jugadores para matar
-        keyboard = []
-        for p in game.get_alive_players():
-            if p.user_id != user.id:
-                keyboard.append([InlineKeyboardButton(
-                    f"💀 {p.name}",
-                    callback_data=f"bruja_target_{chat_id}_{p.user_id}"
-                )])
-        keyboard.append([InlineKeyboardButton("❌ Cancelar", callback_data=f"bruja_skip_{chat_id}")])
+        player = game.players.get(user.id)
+        keyboard = _botones(game, player, chat_id, Accion.BRUJA_OBJETIVO, textos.BRUJA_BOTON_OBJETIVO) if player else []
+        keyboard.append([InlineKeyboardButton(textos.BRUJA_BOTON_CANCELAR, callback_data=callbacks.encode(Accion.BRUJA_NADA, chat_id))])
 
         await query.edit_message_text(
-            "🧙‍♀️ ¿A quien quieres matar con tu pocion?",
+            textos.BRUJA_A_QUIEN,
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
         return
 
     elif action == "target":
-        target_id = int(parts[3])
         success, msg = game.bruja_action(user.id, kill_target=target_id)
         await query.answer(msg, show_alert=True)
         await query.edit_message_text(f"🧙‍♀️ {msg}")
 
     elif action == "skip":
-        player = game.players.get(user.id)
-        if player:
-            player.night_action_done = True
-        await query.edit_message_text("🧙‍♀️ No usas ninguna pocion esta noche.")
+        success, msg = game.bruja_action(user.id)
+        await query.edit_message_text(f"🧙‍♀️ {msg}")
 
     await check_night_complete(context, game, chat_id)
 
 
+async def flautista_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, chat_id: int, target_id: int):
+    query = update.callback_query
+    user = query.from_user
+
+    game = registry.get_werewolf(chat_id)
+    if not game:
+        await query.answer(textos.PARTIDA_NO_ENCONTRADA)
+        return
+
+    success, msg = game.flautista_action(user.id, target_id)
+    await query.answer(msg)
+
+    if success:
+        if Role.FLAUTISTA in game.pending_actions:
+            # Aun puede elegir a otro: se quitan los ya elegidos
+            text, keyboard = pedir_flautista(game, game.players[user.id], chat_id)
+            await query.edit_message_text(text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode="Markdown")
+        else:
+            await query.edit_message_text(f"🪈 {msg}")
+            await check_night_complete(context, game, chat_id)
+
+
 # ==================== CALLBACK VOTACION DIURNA ====================
 
-async def wolf_day_vote_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def wolf_day_vote_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, chat_id: int, target_id: int):
     query = update.callback_query
     user = query.from_user
 
-    parts = query.data.split("_")
-    chat_id = int(parts[2])
-    target = parts[3]
-
-    game = werewolf_games.get(chat_id)
+    game = registry.get_werewolf(chat_id)
     if not game:
-        await query.answer("Partida no encontrada.")
+        await query.answer(textos.PARTIDA_NO_ENCONTRADA)
         return
 
-    if target == "skip":
-        # Votar por no linchar
-        voter = game.players.get(user.id)
-        if voter and voter.is_alive:
-            voter.vote = -1  # Voto especial para "no linchar"
-            alive = game.get_alive_players()
-            votes = sum(1 for p in alive if p.vote is not None)
-            await query.answer(f"Votaste por no linchar. ({votes}/{len(alive)})")
-
-            if votes == len(alive):
-                # Contar votos
-                skip_votes = sum(1 for p in alive if p.vote == -1)
-                if skip_votes > len(alive) // 2:
-                    game.phase = game.phase.__class__.NIGHT
-                    game.day_number += 1
-                    game._reset_night_phase()
-                    await query.message.reply_text(
-                        "El pueblo decide no linchar a nadie.\n\n" + game._get_night_start_message()
-                    )
-                    await send_night_actions(context, game, chat_id)
-                else:
-                    # Resolver votacion normal
-                    success, msg = game._resolve_voting()
-                    await query.message.reply_text(f"🐺 {msg}")
-
-                    if game.phase.value == "finished":
-                        del werewolf_games[chat_id]
-                        await set_chat_commands(context.bot, chat_id, None)
-                    elif game.phase.value == "night":
-                        await send_night_actions(context, game, chat_id)
+    # target_id puede ser NO_LYNCH (no linchar a nadie)
+    success, msg = game.day_vote(user.id, target_id)
+    await query.answer(msg if len(msg) < 200 else textos.VOTO_REGISTRADO)
+    if success and game.phase == GamePhase.DAY_VOTING:
+        await tally_boards.request(context.bot, chat_id, functools.partial(texto_recuento, game))
+    elif success:
+        await send_day_result(context, game, chat_id, msg)
+
+
+async def cazador_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, chat_id: int, target_id: int):
+    query = update.callback_query
+    user = query.from_user
+
+    game = registry.get_werewolf(chat_id)
+    if not game:
+        await query.answer(textos.PARTIDA_NO_ENCONTRADA)
         return
 
-    target_id = int(target)
-    success, msg = game.day_vote(user.id, target_id)
-    await query.answer(msg if len(msg) < 200 else "Voto registrado!")
+    success, msg = game.hunter_shot(user.id, target_id)
+    if not success:
+        await query.answer(msg, show_alert=True)
+        return
 
-    if game.phase.value == "finished":
-        await query.message.reply_text(f"🐺 {msg}")
-        del werewolf_games[chat_id]
-        for player in game.players.values():
-            if player.user_id in user_to_game:
-                del user_to_game[player.user_id]
-        await set_chat_commands(context.bot, chat_id, None)
-    elif game.phase.value == "night":
-        await query.message.reply_text(f"🐺 {msg}")
-        await send_night_actions(context, game, chat_id)
+    await query.answer()
+    await query.edit_message_text(textos.cazador_hecho(game.players[target_id].name))
+    await send_day_result(context, game, chat_id, msg)
 
 
 # ==================== CANCELAR PARTIDA ====================
@@ -968,107 +1071,243 @@ async def cancelar_partida(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
     user = update.effective_user
 
-    game = werewolf_games.get(chat_id) or impostor_games.get(chat_id)
+    game = registry.get(chat_id)
     if not game:
-        await update.message.reply_text("No hay partida activa.")
+        await update.message.reply_text(textos.SIN_PARTIDA)
         return
 
     # Solo el creador puede cancelar
     if user.id != game.creator_id:
-        await update.message.reply_text("Solo el creador de la partida puede cancelarla.")
+        await update.message.reply_text(textos.SOLO_CREADOR_CANCELA)
         return
 
-    game_name = "El Impostor" if chat_id in impostor_games else "Hombres Lobo"
+    game_name = textos.NOMBRE_IMPOSTOR if isinstance(game, ImpostorGame) else textos.NOMBRE_LOBOS
+    await lifecycle.end(context.bot, chat_id)
 
-    if chat_id in werewolf_games:
-        # Limpiar mapeo de usuarios
-        for player in game.players.values():
-            if player.user_id in user_to_game:
-                del user_to_game[player.user_id]
-        del werewolf_games[chat_id]
-
-    if chat_id in impostor_games:
-        del impostor_games[chat_id]
-
-    await set_chat_commands(context.bot, chat_id, None)
-    await update.message.reply_text(f"❌ Partida de {game_name} cancelada.")
+    await update.message.reply_text(textos.partida_cancelada(game_name))
 
 
 # ==================== CALLBACKS MENU ====================
 
-async def menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, *, juego: str):
     query = update.callback_query
     await query.answer()
 
-    if query.data == "menu_impostor":
-        await query.message.reply_text(
-            "🎭 *El Impostor*\n\n"
-            "Un jugador es el impostor y no conoce la palabra secreta.\n"
-            "Los demas deben descubrirlo!\n\n"
-            "Usa /impostor para crear una partida.",
-            parse_mode="Markdown"
-        )
-    elif query.data == "menu_werewolf":
-        await query.message.reply_text(
-            "🐺 *Hombres Lobo de Castronegro*\n\n"
-            "Aldeanos vs Hombres Lobo.\n"
-            "De noche los lobos cazan, de dia el pueblo vota.\n\n"
-            "Usa /lobos para crear una partida.",
-            parse_mode="Markdown"
-        )
+    if juego == "impostor":
+        await query.message.reply_text(textos.MENU_IMPOSTOR, parse_mode="Markdown")
+    elif juego == "lobos":
+        await query.message.reply_text(textos.MENU_LOBOS, parse_mode="Markdown")
+
+
+async def boton_caducado(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Botones con un callback_data de otra version o desconocido."""
+    await update.callback_query.answer(textos.BOTON_CADUCADO, show_alert=True)
 
 
 # ==================== SETUP ====================
 
+async def start_metrics(application):
+    await metrics_server.serve()
+
+
+async def stop_metrics(application):
+    await metrics_server.close()
+
+
+def _colas(application):
+    """Collector de metricas: updates y envios en espera."""
+    def collect():
+        yield from gauge("bot_update_queue_depth", "Updates esperando a un handler",
+                         [({}, application.update_queue.qsize())])
+        yield from gauge("bot_outbound_waiting", "Envios esperando turno en el limitador",
+                         [({}, outbound.stats.queue_depth)])
+    return collect
+
+
 async def post_init(application):
     # Comandos globales por defecto (cuando no hay partida activa)
     await application.bot.set_my_commands(COMMANDS_DEFAULT)
+    action_journal.start()
+    snapshotter.start()
+    metrics.add_collector(_colas(application))
+    await start_metrics(application)
+    # Plazos de las partidas restauradas (empiezan de cero)
+    for chat_id, game in registry.games():
+        if isinstance(game, WerewolfGame):
+            programar_plazo(game, chat_id)
+    deadlines.start(functools.partial(plazo_vencido, CallbackContext(application)))
+    sweeper.start(functools.partial(partida_expulsada, application.bot))
+
+
+async def post_stop(application):
+    await sweeper.stop()
+    await deadlines.stop()
+    # Cambios de comandos pendientes (el bot aun puede llamar a la API)
+    await chat_commands.flush(application.bot)
+    print(f"Comandos de chat: {chat_commands.calls} llamadas, {chat_commands.saved} ahorradas")
+    await tally_boards.flush(application.bot)
+    print(f"Recuentos: {tally_boards.edits} ediciones, {tally_boards.saved} ahorradas")
+
+
+async def post_shutdown(application):
+    # Ultimo snapshot antes de salir
+    await snapshotter.stop()
+    await action_journal.stop()
+    await stop_metrics(application)
+
+
+def restore_games():
+    """Restaura las partidas (snapshot + journal) antes de recibir updates."""
+    start = time.perf_counter()
+    restored, replayed = snapshot.restore(registry, snapshotter.path, action_journal, chat_commands)
+    chat_commands.reconcile(registry)
+    if restored or replayed:
+        print(
+            f"Restauradas {restored} partidas y {replayed} acciones del journal "
+            f"en {time.perf_counter() - start:.2f}s"
+        )
 
 
-def main():
-    app = ApplicationBuilder().token(TOKEN).post_init(post_init).build()
+def build_application(updater: bool = True):
+    # Los updates se procesan en paralelo; el lock de cada chat los serializa
+    builder = (
+        ApplicationBuilder()
+        .token(TOKEN)
+        .post_init(post_init)
+        .post_stop(post_stop)
+        .post_shutdown(post_shutdown)
+        .concurrent_updates(True)
+        .rate_limiter(outbound)
+    )
+    if TELEGRAM_API_URL:
+        builder = builder.base_url(TELEGRAM_API_URL)
+    if not updater:
+        builder = builder.updater(None)
+    app = builder.build()
+
+    # Cada comando y cada boton se registra con su histograma de latencia
+    def comando(nombre, handler):
+        app.add_handler(CommandHandler(nombre, metrics.timed(f"/{nombre}", handler)))
+
+    def boton(accion, handler):
+        router.add(accion, metrics.timed(accion.name, handler))
 
     # Comandos generales
-    app.add_handler(CommandHandler("start", start))
-    app.add_handler(CommandHandler("ayuda", ayuda))
-    app.add_handler(CommandHandler("help", ayuda))
+    comando("start", start)
+    comando("ayuda", por_chat(ayuda))
+    comando("help", por_chat(ayuda))
 
     # El Impostor
-    app.add_handler(CommandHandler("impostor", impostor_crear))
+    comando("impostor", por_chat(impostor_crear))
 
     # Hombres Lobo
-    app.add_handler(CommandHandler("lobos", lobos_crear))
-    app.add_handler(CommandHandler("werewolf", lobos_crear))
+    comando("lobos", por_chat(lobos_crear))
+    comando("werewolf", por_chat(lobos_crear))
 
     # Comandos compartidos
-    app.add_handler(CommandHandler("unirse", lobos_unirse))
-    app.add_handler(CommandHandler("salir", lobos_salir))
-    app.add_handler(CommandHandler("iniciar", lobos_iniciar))
-    app.add_handler(CommandHandler("rol", lobos_rol))
-    app.add_handler(CommandHandler("votar", lobos_votar))
-    app.add_handler(CommandHandler("jugadores", lobos_jugadores))
-    app.add_handler(CommandHandler("vivos", lobos_vivos))
-    app.add_handler(CommandHandler("cancelar", cancelar_partida))
+    comando("unirse", por_chat(lobos_unirse))
+    comando("salir", por_chat(lobos_salir))
+    comando("iniciar", por_chat(lobos_iniciar))
+    comando("rol", por_chat(lobos_rol))
+    comando("votar", por_chat(lobos_votar))
+    comando("jugadores", por_chat(lobos_jugadores))
+    comando("vivos", por_chat(lobos_vivos))
+    comando("cancelar", por_chat(cancelar_partida))
+
+    # Botones: un solo handler que despacha por el codigo de accion del callback_data
+    router = callbacks.CallbackRouter(expired=metrics.timed("CADUCADO", boton_caducado))
 
     # Callbacks menu
-    app.add_handler(CallbackQueryHandler(menu_callback, pattern="^menu_"))
+    boton(Accion.MENU_IMPOSTOR, functools.partial(menu_callback, juego="impostor"))
+    boton(Accion.MENU_LOBOS, functools.partial(menu_callback, juego="lobos"))
 
     # Callbacks El Impostor
-    app.add_handler(CallbackQueryHandler(impostor_rol_callback, pattern="^imp_rol_"))
-    app.add_handler(CallbackQueryHandler(impostor_vote_callback, pattern="^imp_vote_"))
+    boton(Accion.IMP_ROL, por_chat(impostor_rol_callback))
+    boton(Accion.IMP_VOTO, por_chat(impostor_vote_callback))
 
     # Callbacks Hombres Lobo - Acciones nocturnas
-    app.add_handler(CallbackQueryHandler(cupido_callback, pattern="^cupido_"))
-    app.add_handler(CallbackQueryHandler(protector_callback, pattern="^protector_"))
-    app.add_handler(CallbackQueryHandler(lobo_callback, pattern="^lobo_"))
-    app.add_handler(CallbackQueryHandler(vidente_callback, pattern="^vidente_"))
-    app.add_handler(CallbackQueryHandler(bruja_callback, pattern="^bruja_"))
+    boton(Accion.CUPIDO, por_chat(cupido_callback, _chat_de_accion))
+    boton(Accion.CUPIDO_CONFIRMAR, por_chat(cupido_callback, _chat_de_accion))
+    boton(Accion.PROTECTOR, por_chat(protector_callback, _chat_de_accion))
+    boton(Accion.LOBO, por_chat(lobo_callback, _chat_de_accion))
+    boton(Accion.VIDENTE, por_chat(vidente_callback, _chat_de_accion))
+    boton(Accion.FLAUTISTA, por_chat(flautista_callback, _chat_de_accion))
+    for accion, action in ((Accion.BRUJA_CURAR, "heal"), (Accion.BRUJA_MATAR, "kill"),
+                           (Accion.BRUJA_OBJETIVO, "target"), (Accion.BRUJA_NADA, "skip")):
+        boton(accion, por_chat(functools.partial(bruja_callback, action=action), _chat_de_accion))
 
     # Callbacks Hombres Lobo - Votacion diurna
-    app.add_handler(CallbackQueryHandler(wolf_day_vote_callback, pattern="^wolf_vote_"))
+    boton(Accion.VOTO_DIA, por_chat(wolf_day_vote_callback, _chat_de_accion))
+    boton(Accion.CAZADOR, por_chat(cazador_callback, _chat_de_accion))
+
+    app.add_handler(CallbackQueryHandler(router.handle))
+
+    return app
+
+
+def _chat_de_update(update: Update) -> int:
+    """Chat por el que se reparte un update entre los workers."""
+    query = update.callback_query
+    if query and query.message and query.message.chat.type == ChatType.PRIVATE:
+        # Acciones privadas: el chat del grupo va en el callback_data
+        return _chat_de_callback(update)
+    if update.effective_chat:
+        return update.effective_chat.id
+    if update.effective_user:
+        return update.effective_user.id
+    return 0
+
+
+def _shard_worker(index: int, workers: int, updates):
+    """Proceso worker del modo SHARD_WORKERS: atiende solo los chats que le tocan."""
+    # Cada worker guarda su propio journal y snapshot y usa su parte del limite global
+    action_journal.directory = os.path.join(JOURNAL_DIR, f"worker-{index}")
+    snapshotter.path = f"{SNAPSHOT_PATH}.{index}"
+    outbound.global_rate /= workers
+    sweeper.max_games = -(-sweeper.max_games // workers)
+    if metrics_server.port:
+        metrics_server.port += 1 + index
+    restore_games()
+    sharding.run_worker(build_application(updater=False), updates)
+
+
+def run(app):
+    """Recibe los updates por polling o, si hay WEBHOOK_URL, por webhook."""
+    if WEBHOOK_URL:
+        asyncio.run(webhook.serve_webhook(
+            app, WEBHOOK_URL, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_SECRET, WEBHOOK_MAX_INFLIGHT,
+            metrics_server.metrics,
+        ))
+    else:
+        app.run_polling()
+
+
+def main():
+    if SHARD_WORKERS > 1:
+        # Un proceso recibe los updates y los reparte por chat entre los workers
+        router = sharding.ShardRouter(_shard_worker, SHARD_WORKERS, _chat_de_update)
+        # El ingress no tiene partidas ni handlers: solo exporta el reparto
+        metrics_server.metrics = Metrics()
+        metrics_server.metrics.add_collector(router.collect)
+        builder = ApplicationBuilder().token(TOKEN).post_init(start_metrics).post_shutdown(stop_metrics)
+        if TELEGRAM_API_URL:
+            builder = builder.base_url(TELEGRAM_API_URL)
+        if WEBHOOK_URL:
+            builder = builder.updater(None)
+        app = builder.build()
+        app.add_handler(TypeHandler(Update, router.handle))
+        router.start()
+        print(f"Bot MultiGame iniciado con {SHARD_WORKERS} workers...")
+        try:
+            run(app)
+        finally:
+            router.stop()
+        return
 
+    restore_games()
+    app = build_application(updater=not WEBHOOK_URL)
     print("Bot MultiGame iniciado...")
-    app.run_polling()
+    run(app)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,2 @@
+# Infraestructura compartida del bot
+from .registry import GameRegistry
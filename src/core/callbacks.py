@@ -0,0 +1,127 @@
+import binascii
+from enum import IntEnum
+from typing import Awaitable, Callable, Optional
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+# Formato del callback_data (base64 url-safe sin relleno):
+#   [version][accion]([longitud][id con signo, big-endian])...
+# Un chat_id de supergrupo ocupa 1+6 bytes y un user_id 1+4, asi que un boton
+# con chat y jugador queda en 19 caracteres de los 64 que permite Telegram.
+VERSION = 1
+MAX_LEN = 64
+
+_A_URLSAFE = bytes.maketrans(b"+/", b"-_")
+_DE_URLSAFE = bytes.maketrans(b"-_", b"+/")
+
+
+class Accion(IntEnum):
+    """Codigo de accion de cada boton (primer byte tras la version)."""
+    MENU_IMPOSTOR = 1
+    MENU_LOBOS = 2
+    IMP_ROL = 3
+    IMP_VOTO = 4
+    CUPIDO = 5
+    CUPIDO_CONFIRMAR = 6
+    PROTECTOR = 7
+    LOBO = 8
+    VIDENTE = 9
+    BRUJA_CURAR = 10
+    BRUJA_MATAR = 11
+    BRUJA_OBJETIVO = 12
+    BRUJA_NADA = 13
+    VOTO_DIA = 14
+    CAZADOR = 15
+    FLAUTISTA = 16
+
+
+# Ids que lleva el callback_data de cada accion (chat del grupo y/o jugador)
+IDS = {
+    Accion.MENU_IMPOSTOR: 0,
+    Accion.MENU_LOBOS: 0,
+    Accion.IMP_ROL: 1,
+    Accion.IMP_VOTO: 1,
+    Accion.CUPIDO: 2,
+    Accion.CUPIDO_CONFIRMAR: 1,
+    Accion.PROTECTOR: 2,
+    Accion.LOBO: 2,
+    Accion.VIDENTE: 2,
+    Accion.BRUJA_CURAR: 1,
+    Accion.BRUJA_MATAR: 1,
+    Accion.BRUJA_OBJETIVO: 2,
+    Accion.BRUJA_NADA: 1,
+    Accion.VOTO_DIA: 2,
+    Accion.CAZADOR: 2,
+    Accion.FLAUTISTA: 2,
+}
+
+
+class CallbackDataError(ValueError):
+    """callback_data que no es de esta version o esta mal formado."""
+
+
+def encode(accion: int, *ids: int) -> str:
+    data = bytearray((VERSION, accion))
+    for n in ids:
+        packed = n.to_bytes(n.bit_length() // 8 + 1, "big", signed=True)
+        data.append(len(packed))
+        data += packed
+    text = binascii.b2a_base64(data, newline=False).translate(_A_URLSAFE).rstrip(b"=").decode("ascii")
+    if len(text) > MAX_LEN:
+        raise CallbackDataError(f"callback_data de {len(text)} bytes (maximo {MAX_LEN})")
+    return text
+
+
+def decode(text: str) -> tuple[int, tuple[int, ...]]:
+    """Devuelve (accion, ids). Lanza CallbackDataError si no se puede leer."""
+    try:
+        data = binascii.a2b_base64(text.encode("ascii").translate(_DE_URLSAFE) + b"=" * (-len(text) % 4))
+    except ValueError:
+        raise CallbackDataError(f"callback_data no es base64: {text!r}") from None
+    if len(data) < 2 or data[0] != VERSION:
+        raise CallbackDataError(f"callback_data de otra version: {text!r}")
+
+    ids = []
+    i, end = 2, len(data)
+    while i < end:
+        n = data[i]
+        if i + 1 + n > end:
+            raise CallbackDataError(f"callback_data truncado: {text!r}")
+        ids.append(int.from_bytes(data[i + 1:i + 1 + n], "big", signed=True))
+        i += 1 + n
+    return data[1], tuple(ids)
+
+
+Handler = Callable[..., Awaitable]
+
+
+class CallbackRouter:
+    """Un solo CallbackQueryHandler para todos los botones.
+
+    Decodifica el callback_data una vez y llama al handler de su accion con
+    los ids como argumentos: handler(update, context, *ids). Si el numero de
+    ids no es el de la accion (IDS) el boton se trata como caducado.
+    """
+
+    def __init__(self, expired: Optional[Handler] = None):
+        self._handlers: dict[int, Handler] = {}
+        # Botones de otra version (p. ej. enviados antes de actualizar el bot)
+        self._expired = expired
+
+    def add(self, accion: Accion, handler: Handler):
+        if accion in self._handlers:
+            raise ValueError(f"La accion {accion.name} ya tiene handler")
+        self._handlers[accion] = handler
+
+    async def handle(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        try:
+            accion, ids = decode(update.callback_query.data)
+            handler = self._handlers[accion]
+            if len(ids) != IDS[accion]:
+                raise CallbackDataError(f"callback_data con {len(ids)} ids para {Accion(accion).name}")
+        except (CallbackDataError, KeyError):
+            if self._expired is not None:
+                await self._expired(update, context)
+            return
+        return await handler(update, context, *ids)
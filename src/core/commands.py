@@ -0,0 +1,110 @@
+import asyncio
+from typing import Optional
+
+from telegram import BotCommand, BotCommandScopeChat
+
+from .registry import GameRegistry
+
+# Comandos del chat desconocidos (fallo al aplicarlos): la siguiente peticion se aplica siempre
+_UNKNOWN = object()
+
+
+class ChatCommands:
+    """Comandos de cada chat, sin llamadas repetidas a la Bot API.
+
+    Guarda el juego cuyos comandos se aplicaron por ultima vez a cada chat y
+    no vuelve a aplicar el mismo. Los cambios de un chat se aplican tras
+    `delay` segundos: si en ese tiempo llegan varios (crear y cancelar una
+    partida), solo se aplica el ultimo, y ninguno si deja el chat como estaba.
+    Un chat sin registro tiene los comandos por defecto, asi que solo se
+    guardan los chats con partida (o con comandos desconocidos).
+    """
+
+    def __init__(self, command_sets: dict[Optional[str], list[BotCommand]], delay: float = 1.0):
+        # Juego -> comandos (None = sin partida)
+        self.command_sets = command_sets
+        self.delay = delay
+        self._applied: dict[int, object] = {}
+        # chat_id -> (juego pedido, peticiones agrupadas)
+        self._pending: dict[int, tuple[Optional[str], int]] = {}
+        self._timers: dict[int, asyncio.Task] = {}
+        # Estadisticas
+        self.calls = 0
+        self.saved = 0
+
+    async def request(self, bot, chat_id: int, game_type: Optional[str]):
+        if game_type not in self.command_sets:
+            game_type = None
+        pending = self._pending.get(chat_id)
+        if pending is not None:
+            self._pending[chat_id] = (game_type, pending[1] + 1)
+            return
+        if self._applied.get(chat_id) == game_type:
+            self.saved += 1
+            return
+
+        self._pending[chat_id] = (game_type, 1)
+        if self.delay <= 0:
+            await self._apply(bot, chat_id)
+        else:
+            self._timers[chat_id] = asyncio.create_task(self._apply_later(bot, chat_id))
+
+    async def _apply_later(self, bot, chat_id: int):
+        await asyncio.sleep(self.delay)
+        self._timers.pop(chat_id, None)
+        await self._apply(bot, chat_id)
+
+    async def _apply(self, bot, chat_id: int):
+        game_type, requests = self._pending.pop(chat_id)
+        if self._applied.get(chat_id) == game_type:
+            self.saved += requests
+            return
+        self.saved += requests - 1
+        self.calls += 1
+        try:
+            scope = BotCommandScopeChat(chat_id=chat_id)
+            await bot.set_my_commands(self.command_sets[game_type], scope=scope)
+            if game_type is None:
+                self._applied.pop(chat_id, None)
+            else:
+                self._applied[chat_id] = game_type
+        except Exception as e:
+            self._applied[chat_id] = _UNKNOWN
+            print(f"Error actualizando comandos del chat {chat_id}: {e}")
+
+    async def flush(self, bot):
+        """Aplica ya los cambios pendientes (antes de parar el bot)."""
+        for task in self._timers.values():
+            task.cancel()
+        self._timers.clear()
+        for chat_id in list(self._pending):
+            await self._apply(bot, chat_id)
+
+    # Persistencia (va en el snapshot)
+    def export_state(self) -> dict:
+        return {chat_id: game_type for chat_id, game_type in self._applied.items() if game_type is not _UNKNOWN}
+
+    def load_state(self, state: dict):
+        # Los snapshots antiguos guardaban tambien los chats sin partida
+        self._applied = {chat_id: game_type for chat_id, game_type in state.items() if game_type is not None}
+
+    def reconcile(self, registry: GameRegistry) -> int:
+        """Marca como desconocidos los chats cuyo registro no cuadra con las partidas restauradas.
+
+        Tras una caida el snapshot puede ser anterior a los ultimos cambios de
+        comandos; en esos chats la siguiente peticion se aplica siempre.
+        Devuelve cuantos chats se marcaron.
+        """
+        stale = []
+        for chat_id, game_type in self._applied.items():
+            if registry.get_werewolf(chat_id):
+                expected = "lobos"
+            elif registry.get_impostor(chat_id):
+                expected = "impostor"
+            else:
+                expected = None
+            if game_type != expected:
+                stale.append(chat_id)
+        for chat_id in stale:
+            self._applied[chat_id] = _UNKNOWN
+        return len(stale)
@@ -0,0 +1,118 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+Callback = Callable[[Hashable, Any], Awaitable]
+
+
+class DeadlineScheduler:
+    """Plazos de todas las partidas en un solo heap con un solo temporizador.
+
+    Cada clave (un chat) tiene como mucho un plazo: programar otro sustituye
+    al anterior. Las entradas sustituidas o canceladas se quedan en el heap y
+    se descartan al salir (o al compactar), asi que programar y cancelar
+    cuestan O(log n) y O(1). Solo hay un TimerHandle del bucle, para el plazo
+    mas proximo; al vencer se llama callback(clave, stamp) en una tarea.
+    """
+
+    def __init__(self, callback: Optional[Callback] = None):
+        self.callback = callback
+        self._heap: list[tuple[float, int, Hashable, Any]] = []
+        # clave -> (seq, vencimiento) del plazo vigente
+        self._current: dict[Hashable, tuple[int, float]] = {}
+        self._seq = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at = float("inf")
+        self._tasks: set[asyncio.Task] = set()
+        # Estadisticas
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._current)
+
+    def keys(self):
+        """Claves con un plazo programado."""
+        return self._current.keys()
+
+    def start(self, callback: Optional[Callback] = None):
+        if callback is not None:
+            self.callback = callback
+        self._loop = asyncio.get_running_loop()
+        self._arm()
+
+    def schedule(self, key: Hashable, delay: float, stamp: Any = None):
+        """Vence dentro de `delay` segundos. `stamp` se devuelve al callback."""
+        when = time.monotonic() + delay
+        seq = next(self._seq)
+        self._current[key] = (seq, when)
+        heapq.heappush(self._heap, (when, seq, key, stamp))
+        if len(self._heap) > 2 * len(self._current) + 1024:
+            self._compact()
+        if when < self._timer_at:
+            self._arm()
+
+    def cancel(self, key: Hashable):
+        self._current.pop(key, None)
+
+    def remaining(self, key: Hashable) -> float:
+        """Segundos que le quedan al plazo de la clave (0 si no tiene)."""
+        entry = self._current.get(key)
+        if entry is None:
+            return 0.0
+        return max(0.0, entry[1] - time.monotonic())
+
+    def _live(self, entry) -> bool:
+        current = self._current.get(entry[2])
+        return current is not None and current[0] == entry[1]
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if self._live(entry)]
+        heapq.heapify(self._heap)
+
+    def _arm(self):
+        if self._loop is None:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        heap = self._heap
+        while heap and not self._live(heap[0]):
+            heapq.heappop(heap)
+        if not heap:
+            self._timer_at = float("inf")
+            return
+        self._timer_at = heap[0][0]
+        self._timer = self._loop.call_later(max(0.0, self._timer_at - time.monotonic()), self._fire)
+
+    def _fire(self):
+        self._timer = None
+        now = time.monotonic()
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            when, seq, key, stamp = heapq.heappop(heap)
+            if self._current.get(key, (None,))[0] != seq:
+                continue
+            del self._current[key]
+            self.expired += 1
+            task = asyncio.create_task(self.callback(key, stamp))
+            self._tasks.add(task)
+            task.add_done_callback(self._done)
+        self._arm()
+
+    def _done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Error al vencer un plazo: {task.exception()}")
+
+    async def stop(self):
+        """Deja de vencer plazos y espera a los callbacks en curso."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._timer_at = float("inf")
+        self._loop = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,43 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+from .metrics import Histogram
+
+# Duracion de cada envio en paralelo y mensajes enviados, por fase (se
+# exportan en las metricas)
+phase_stats: dict[str, Histogram] = {}
+phase_messages: dict[str, int] = {}
+
+
+async def fan_out(
+    jobs: list[Callable[[], Awaitable]],
+    limit: int,
+    phase: str = "",
+) -> list[Optional[Exception]]:
+    """Ejecuta los envios en paralelo con como mucho `limit` a la vez.
+
+    Devuelve, en el mismo orden que `jobs`, None si el envio funciono o la
+    excepcion que lanzo. Un fallo no cancela el resto.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(job):
+        async with semaphore:
+            try:
+                await job()
+            except Exception as e:
+                return e
+        return None
+
+    start = time.perf_counter()
+    errors = await asyncio.gather(*(run(job) for job in jobs))
+
+    if phase:
+        histogram = phase_stats.get(phase)
+        if histogram is None:
+            histogram = phase_stats[phase] = Histogram()
+        histogram.observe(time.perf_counter() - start)
+        phase_messages[phase] = phase_messages.get(phase, 0) + len(jobs)
+
+    return errors
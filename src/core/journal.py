@@ -0,0 +1,240 @@
+"""Journal de acciones de las partidas (append-only, con group commit).
+
+Cada entrada es (seq, chat_id, op, payload):
+
+- "new":   (tipo, estado) al registrar una partida (estado = game.to_state())
+- "call":  (metodo, args, kwargs) por cada accion marcada con @accion
+- "map":   user_ids que se asocian al chat
+- "unmap": user_id que deja el chat
+- "end":   None al eliminar la partida
+
+Las entradas se acumulan en memoria y una tarea las escribe por lotes: un
+frame (longitud + pickle) y un solo fsync por lote. Los ficheros se parten
+en segmentos (journal-<primer seq>.log) que se rotan en cada snapshot y se
+borran cuando el snapshot ya los cubre.
+
+Uso para depurar: python -m core.journal <directorio> [--chat CHAT_ID]
+"""
+import asyncio
+import os
+import pickle
+import struct
+import time
+from typing import Iterator, Optional
+
+from games.impostor import ImpostorGame
+from games.hombres_lobo import WerewolfGame
+
+_FRAME = struct.Struct("<I")
+_ROTATE = object()
+
+GAME_TYPES = {"lobos": WerewolfGame, "impostor": ImpostorGame}
+
+
+def game_type(game) -> str:
+    return "lobos" if isinstance(game, WerewolfGame) else "impostor"
+
+
+class Journal:
+    def __init__(self, directory: str, flush_interval: float = 0.05, max_batch: int = 2000):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.seq = 0
+        self._buffer: list = []
+        self._file = None
+        self._task = None
+        self._wake: Optional[asyncio.Event] = None
+        # Estadisticas de group commit
+        self.batches = 0
+        self.entries = 0
+        self.write_time = 0.0
+
+    # Registro (sincrono, sin I/O)
+    def record(self, chat_id: int, op: str, payload=None):
+        self.seq += 1
+        self._buffer.append((self.seq, chat_id, op, payload))
+        if len(self._buffer) >= self.max_batch and self._wake:
+            self._wake.set()
+
+    def observe(self, game, name: str, args: tuple, kwargs: dict):
+        """Observer para games.acciones: registra la llamada."""
+        self.record(game.chat_id, "call", (name, args, kwargs))
+
+    def record_new(self, game):
+        self.record(game.chat_id, "new", (game_type(game), game.to_state()))
+
+    # Escritura
+    def _segment_path(self, first_seq: int) -> str:
+        return os.path.join(self.directory, f"journal-{first_seq:012d}.log")
+
+    def _write(self, chunk: list):
+        """Escribe las entradas como un frame con un solo fsync (en un hilo)."""
+        if not chunk:
+            return
+        start = time.perf_counter()
+        if self._file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._file = open(self._segment_path(chunk[0][0]), "ab")
+        data = pickle.dumps(chunk, protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.write(_FRAME.pack(len(data)) + data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.batches += 1
+        self.entries += len(chunk)
+        self.write_time += time.perf_counter() - start
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        await asyncio.to_thread(self._write_batch, batch)
+
+    def _write_batch(self, batch: list):
+        # Cada marca de rotacion cierra el segmento actual
+        start = 0
+        for i, item in enumerate(batch):
+            if item is _ROTATE:
+                self._write(batch[start:i])
+                self._close_segment()
+                start = i + 1
+        self._write(batch[start:])
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error escribiendo journal: {e}")
+
+    def start(self):
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        self._close_segment()
+
+    # Rotacion (en cada snapshot)
+    def rotate(self) -> int:
+        """Cierra el segmento actual tras lo ya registrado. Devuelve el ultimo seq."""
+        self._buffer.append(_ROTATE)
+        return self.seq
+
+    def prune(self, upto_seq: int):
+        """Borra los segmentos que solo contienen entradas <= upto_seq."""
+        for first_seq, path in segments(self.directory):
+            if first_seq <= upto_seq:
+                os.remove(path)
+
+
+# Lectura y replay
+def segments(directory: str) -> list[tuple[int, str]]:
+    if not os.path.isdir(directory):
+        return []
+    result = []
+    for name in os.listdir(directory):
+        if name.startswith("journal-") and name.endswith(".log"):
+            result.append((int(name[8:-4]), os.path.join(directory, name)))
+    return sorted(result)
+
+
+def read(directory: str, after_seq: int = 0) -> Iterator[tuple]:
+    """Entradas con seq > after_seq, en orden. Ignora un frame final truncado."""
+    for _, path in segments(directory):
+        with open(path, "rb") as f:
+            data = f.read()
+        pos = 0
+        while pos + _FRAME.size <= len(data):
+            (size,) = _FRAME.unpack_from(data, pos)
+            pos += _FRAME.size
+            if pos + size > len(data):
+                break
+            for entry in pickle.loads(data[pos:pos + size]):
+                if entry[0] > after_seq:
+                    yield entry
+            pos += size
+
+
+def apply(registry, entry: tuple):
+    """Aplica una entrada del journal sobre el registro."""
+    seq, chat_id, op, payload = entry
+    if op == "call":
+        game = registry.get(chat_id)
+        if game is not None:
+            name, args, kwargs = payload
+            getattr(game, name)(*args, **kwargs)
+    elif op == "new":
+        kind, state = payload
+        registry.evict(chat_id)
+        registry.create(chat_id, GAME_TYPES[kind].from_state(state))
+    elif op == "map":
+        registry.map_users(chat_id, payload)
+    elif op == "unmap":
+        registry.unmap_user(payload, chat_id)
+    elif op == "end":
+        registry.evict(chat_id)
+
+
+def replay(registry, directory: str, after_seq: int = 0) -> tuple[int, int]:
+    """Repite el journal sobre el registro. Devuelve (entradas, ultimo seq).
+
+    Mientras dura no se registra nada: ni las partidas nuevas ni las acciones
+    de las que ya estaban (p. ej. las del snapshot). Al terminar se vuelve a
+    conectar el journal que tuviera el registro, que sigue tras el ultimo seq.
+    """
+    journal = registry.journal
+    # No volver a registrar lo que se repite
+    registry.journal = None
+    for _, game in registry.games():
+        game.observer = None
+    count = 0
+    last_seq = after_seq
+    try:
+        for entry in read(directory, after_seq):
+            apply(registry, entry)
+            count += 1
+            last_seq = entry[0]
+    finally:
+        registry.journal = journal
+    if journal is not None:
+        journal.seq = max(journal.seq, last_seq)
+        registry.attach_journal(journal)
+    return count, last_seq
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .registry import GameRegistry
+
+    parser = argparse.ArgumentParser(description="Repite un journal y muestra las partidas.")
+    parser.add_argument("directory")
+    parser.add_argument("--chat", type=int, help="Mostrar solo las acciones de este chat")
+    args = parser.parse_args()
+
+    if args.chat is not None:
+        for entry in read(args.directory):
+            if entry[1] == args.chat:
+                print(entry[0], entry[2], entry[3])
+
+    registry = GameRegistry()
+    registry.journal = None
+    count, last_seq = replay(registry, args.directory)
+    print(f"{count} entradas repetidas (ultimo seq {last_seq}), {len(registry)} partidas vivas")
+    for chat_id, game in registry.games():
+        if args.chat is None or chat_id == args.chat:
+            print(game.get_players_list() if args.chat is not None else f"{chat_id}: {game_type(game)}")
@@ -0,0 +1,77 @@
+from typing import Optional
+
+from games.hombres_lobo import WerewolfGame
+from games.hombres_lobo.game import GamePhase
+
+from .commands import ChatCommands
+from .registry import Game, GameRegistry
+from .tally_board import TallyBoards
+
+
+def game_type(game: Optional[Game]) -> Optional[str]:
+    """Juego de la partida tal como lo usan los comandos del chat (None = sin partida)."""
+    if game is None:
+        return None
+    return "lobos" if isinstance(game, WerewolfGame) else "impostor"
+
+
+class GameLifecycle:
+    """Alta y baja de partidas y de sus jugadores.
+
+    Los handlers crean, empiezan y terminan partidas solo a traves de esta
+    clase: al terminar una se limpia todo lo que apunta a ella (usuarios,
+    selecciones de Cupido, plazo, actividad, recuento de la votacion) y el
+    chat vuelve a los comandos por defecto. leaks() lista lo que haya quedado
+    sin limpiar.
+    """
+
+    def __init__(self, registry: GameRegistry, chat_commands: ChatCommands,
+                 tally_boards: Optional[TallyBoards] = None):
+        self.registry = registry
+        self.chat_commands = chat_commands
+        self.tally_boards = tally_boards
+
+    async def create(self, bot, chat_id: int, game: Game) -> bool:
+        """Registra la partida y pone los comandos de su juego. Devuelve si se creo."""
+        if not self.registry.create(chat_id, game):
+            return False
+        await self.chat_commands.request(bot, chat_id, game_type(game))
+        return True
+
+    def start(self, chat_id: int, game: Game) -> None:
+        """La partida empezo: sus jugadores pueden actuar por privado."""
+        self.registry.map_users(chat_id, game.players)
+
+    async def leave(self, bot, chat_id: int, game: Game, user_id: int) -> tuple[bool, str]:
+        """Saca al jugador de la partida; si se queda vacia (o su salida la decide), la termina."""
+        success, msg = game.remove_player(user_id)
+        if success:
+            self.registry.unmap_user(user_id, chat_id)
+        if msg == "GAME_EMPTY" or (isinstance(game, WerewolfGame) and game.phase == GamePhase.FINISHED):
+            await self.end(bot, chat_id)
+        return success, msg
+
+    async def end(self, bot, chat_id: int) -> Optional[Game]:
+        """Elimina la partida del chat y todo lo que apunta a ella."""
+        game = self.registry.evict(chat_id)
+        if self.tally_boards is not None:
+            self.tally_boards.discard(chat_id)
+        if game is not None:
+            await self.chat_commands.request(bot, chat_id, None)
+        return game
+
+    def leaks(self) -> dict[str, list]:
+        """Entradas de los indices que ya no corresponden a ninguna partida viva.
+
+        Con los cambios de comandos ya aplicados (ChatCommands.flush) y sin
+        handlers a medias, todas las listas deben estar vacias.
+        """
+        registry = self.registry
+        found = registry.leaks()
+        found["commands"] = [
+            chat_id for chat_id, applied in self.chat_commands.export_state().items()
+            if applied != game_type(registry.get(chat_id))
+        ]
+        if self.tally_boards is not None:
+            found["tally boards"] = [chat_id for chat_id in self.tally_boards.chats() if registry.get(chat_id) is None]
+        return found
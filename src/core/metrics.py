@@ -0,0 +1,211 @@
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+from games.impostor import ImpostorGame
+from games.impostor.game import GameState
+from games.hombres_lobo.game import GamePhase
+
+from .registry import GameRegistry
+
+# Limites (en segundos) de los histogramas de latencia
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Limites de los histogramas de jugadores por partida
+PLAYER_BUCKETS = (3, 4, 5, 6, 8, 10, 12, 16, 20, 30)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Collector = Callable[[], Iterable[str]]
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+def _le(bound: float) -> str:
+    return f"{bound:g}" if bound != float("inf") else "+Inf"
+
+
+class Histogram:
+    """Histograma acumulativo al estilo Prometheus.
+
+    observe() solo hace una busqueda binaria y dos sumas; los contadores
+    acumulados se calculan al exportar.
+    """
+
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def samples(self, name: str, labels: dict) -> Iterable[str]:
+        total = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            total += n
+            yield f"{name}_bucket{_labels({**labels, 'le': _le(bound)})} {total}"
+        yield f"{name}_sum{_labels(labels)} {self.sum:.6f}"
+        yield f"{name}_count{_labels(labels)} {total}"
+
+
+def _family(kind: str, name: str, help_text: str, values: Iterable[tuple[dict, float]]) -> Iterable[str]:
+    yield f"# HELP {name} {help_text}"
+    yield f"# TYPE {name} {kind}"
+    for labels, value in values:
+        yield f"{name}{_labels(labels)} {value:g}"
+
+
+def gauge(name: str, help_text: str, values: Iterable[tuple[dict, float]]) -> Iterable[str]:
+    """Lineas de un gauge con una muestra por cada (etiquetas, valor)."""
+    return _family("gauge", name, help_text, values)
+
+
+def counter(name: str, help_text: str, values: Iterable[tuple[dict, float]]) -> Iterable[str]:
+    return _family("counter", name, help_text, values)
+
+
+def histograms(name: str, help_text: str, label: str, series: dict[str, Histogram]) -> Iterable[str]:
+    yield f"# HELP {name} {help_text}"
+    yield f"# TYPE {name} histogram"
+    for key, histogram in sorted(series.items()):
+        yield from histogram.samples(name, {label: key})
+
+
+class Metrics:
+    """Metricas del proceso en formato de texto de Prometheus.
+
+    Los histogramas se actualizan en cada update (timed) y en cada llamada a
+    la Bot API (observe_api). Lo que se puede leer del estado (partidas,
+    colas) no se cuenta al vuelo: lo calculan los collectors al exportar.
+    """
+
+    def __init__(self):
+        self.handlers: dict[str, Histogram] = {}
+        self.handler_errors: dict[str, int] = {}
+        self.in_progress = 0
+        self.api: dict[str, Histogram] = {}
+        self.api_errors: dict[str, int] = {}
+        self._collectors: list[Collector] = []
+
+    def timed(self, name: str, handler):
+        """Envuelve un handler para medir su latencia (incluida la espera del lock del chat)."""
+        histogram = self.handlers[name] = Histogram()
+        self.handler_errors[name] = 0
+
+        async def medido(*args, **kwargs):
+            self.in_progress += 1
+            start = time.perf_counter()
+            try:
+                return await handler(*args, **kwargs)
+            except Exception:
+                self.handler_errors[name] += 1
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - start)
+                self.in_progress -= 1
+
+        return medido
+
+    def observe_api(self, endpoint: str, seconds: float, error: bool = False):
+        histogram = self.api.get(endpoint)
+        if histogram is None:
+            histogram = self.api[endpoint] = Histogram()
+            self.api_errors[endpoint] = 0
+        histogram.observe(seconds)
+        if error:
+            self.api_errors[endpoint] += 1
+
+    def add_collector(self, collector: Collector):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        lines += histograms("bot_handler_seconds", "Latencia de cada handler", "handler", self.handlers)
+        lines += counter("bot_handler_errors_total", "Excepciones en cada handler",
+                         (({"handler": k}, v) for k, v in sorted(self.handler_errors.items())))
+        lines += gauge("bot_handlers_in_progress", "Handlers ejecutandose ahora", [({}, self.in_progress)])
+        lines += histograms("bot_api_seconds", "Latencia de las llamadas a la Bot API", "method", self.api)
+        lines += counter("bot_api_errors_total", "Llamadas a la Bot API que fallaron",
+                         (({"method": k}, v) for k, v in sorted(self.api_errors.items())))
+        for collector in self._collectors:
+            lines += collector()
+        lines.append("")
+        return "\n".join(lines)
+
+
+def game_collector(registry: GameRegistry) -> Collector:
+    """Partidas por juego y fase, y jugadores por partida (se leen del registro)."""
+
+    def collect():
+        games = {("impostor", s.value): 0 for s in GameState}
+        games.update({("lobos", p.value): 0 for p in GamePhase})
+        players = {"impostor": Histogram(PLAYER_BUCKETS), "lobos": Histogram(PLAYER_BUCKETS)}
+        for _, game in registry.games():
+            if isinstance(game, ImpostorGame):
+                key = ("impostor", game.state.value)
+            else:
+                key = ("lobos", game.phase.value)
+            games[key] += 1
+            players[key[0]].observe(len(game.players))
+        yield from gauge(
+            "bot_games", "Partidas activas por juego y fase",
+            (({"game": g, "phase": p}, n) for (g, p), n in games.items()),
+        )
+        yield from histograms("bot_game_players", "Jugadores por partida activa", "game", players)
+
+    return collect
+
+
+class MetricsServer:
+    """Endpoint HTTP minimo para que Prometheus lea /metrics (port 0 = desactivado)."""
+
+    def __init__(self, metrics: Metrics, host: str = "127.0.0.1", port: int = 0, path: str = "/metrics"):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.path = path
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.split()
+            if len(parts) >= 2 and parts[0] == b"GET" and parts[1].decode().split("?")[0] == self.path:
+                status, body = b"200 OK", self.metrics.render().encode()
+            else:
+                status, body = b"404 Not Found", b""
+            writer.write(
+                b"HTTP/1.1 %s\r\nContent-Type: %s\r\nContent-Length: %d\r\nConnection: close\r\n\r\n"
+                % (status, CONTENT_TYPE.encode(), len(body)) + body
+            )
+            await writer.drain()
+        except (ConnectionError, UnicodeDecodeError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        if not self.port:
+            return
+        self._server = await asyncio.start_server(self._client, self.host, self.port)
+        print(f"Metricas en http://{self.host}:{self.port}{self.path}")
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Coroutine, Optional
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+
+# Endpoints que no cuentan para los limites de mensajes
+UNLIMITED_ENDPOINTS = frozenset({"answerCallbackQuery", "getMe", "deleteWebhook", "setWebhook"})
+
+
+class TokenBucket:
+    """Cubo de tokens con reserva: cada peticion toma un token y espera si debe."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now: float) -> float:
+        """Consume un token y devuelve cuantos segundos hay que esperar."""
+        self._refill(now)
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def pause(self, seconds: float, now: float):
+        """Vacia el cubo para que nadie envie durante `seconds`."""
+        self._refill(now)
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+    def is_idle(self, now: float) -> bool:
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+@dataclass
+class OutboundStats:
+    requests: int = 0
+    delayed: int = 0
+    retries: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+class OutboundScheduler(BaseRateLimiter):
+    """Planificador de salida hacia la Bot API.
+
+    Aplica un cubo de tokens global y otro por chat antes de cada peticion y,
+    si Telegram responde con RetryAfter, pausa el cubo afectado y reintenta.
+    Se instala con ApplicationBuilder().rate_limiter(...), asi que todo lo que
+    envia el bot (send_message, reply_text, edit_message_text,
+    set_my_commands...) pasa por aqui.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+        max_retries: int = 3,
+    ):
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self._global: Optional[TokenBucket] = None
+        self._chats: dict[int, TokenBucket] = {}
+        self.stats = OutboundStats()
+        # Latencia por metodo (core.metrics.Metrics, opcional)
+        self.metrics = None
+
+    async def initialize(self) -> None:
+        self._global = TokenBucket(self.global_rate, self.global_rate, time.monotonic())
+
+    async def shutdown(self) -> None:
+        self._chats.clear()
+
+    def _chat_bucket(self, chat_id: int, now: float) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # Limpiar cubos llenos de chats inactivos
+            if len(self._chats) >= 10_000:
+                self._chats = {c: b for c, b in self._chats.items() if not b.is_idle(now)}
+            bucket = self._chats[chat_id] = TokenBucket(self.chat_rate, self.chat_burst, now)
+        return bucket
+
+    async def _wait_turn(self, chat_id: Optional[int]):
+        now = time.monotonic()
+        wait = self._global.reserve(now)
+        if chat_id is not None:
+            wait = max(wait, self._chat_bucket(chat_id, now).reserve(now))
+        if wait <= 0:
+            return
+
+        stats = self.stats
+        stats.delayed += 1
+        stats.queue_depth += 1
+        if stats.queue_depth > stats.max_queue_depth:
+            stats.max_queue_depth = stats.queue_depth
+        try:
+            await asyncio.sleep(wait)
+        finally:
+            stats.queue_depth -= 1
+        stats.total_wait += wait
+        if wait > stats.max_wait:
+            stats.max_wait = wait
+
+    async def _call(self, callback, args, kwargs, endpoint: str):
+        if self.metrics is None:
+            return await callback(*args, **kwargs)
+        start = time.perf_counter()
+        error = True
+        try:
+            result = await callback(*args, **kwargs)
+            error = False
+            return result
+        finally:
+            self.metrics.observe_api(endpoint, time.perf_counter() - start, error)
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Any]],
+        args: Any,
+        kwargs: dict[str, Any],
+        endpoint: str,
+        data: dict[str, Any],
+        rate_limit_args: Optional[Any],
+    ):
+        self.stats.requests += 1
+        # Sin cubos, pero con los reintentos de RetryAfter: un 429 al responder a un
+        # boton no debe cortar el handler (y dejar sin comprobar si acabo la noche)
+        unlimited = endpoint in UNLIMITED_ENDPOINTS
+        chat_id = data.get("chat_id")
+        if unlimited or not isinstance(chat_id, int):
+            chat_id = None
+
+        for attempt in range(self.max_retries + 1):
+            if not unlimited:
+                await self._wait_turn(chat_id)
+            try:
+                return await self._call(callback, args, kwargs, endpoint)
+            except RetryAfter as e:
+                if attempt == self.max_retries:
+                    raise
+                retry_after = float(e.retry_after)
+                self.stats.retries += 1
+                print(f"RetryAfter en {endpoint} (chat {chat_id}): esperando {retry_after:.1f}s")
+                now = time.monotonic()
+                if unlimited:
+                    await asyncio.sleep(retry_after)
+                elif chat_id is not None:
+                    self._chat_bucket(chat_id, now).pause(retry_after, now)
+                else:
+                    self._global.pause(retry_after, now)
@@ -0,0 +1,230 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, Optional, Union
+
+from games.impostor import ImpostorGame
+from games.hombres_lobo import WerewolfGame
+
+Game = Union[ImpostorGame, WerewolfGame]
+
+
+class _ChatLock:
+    """Lock de un chat con contador de usuarios para poder liberarlo."""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+@dataclass
+class _Shard:
+    impostor: dict = field(default_factory=dict)
+    werewolf: dict = field(default_factory=dict)
+    locks: dict = field(default_factory=dict)
+
+
+class GameRegistry:
+    """Almacen de partidas activas repartido en shards por chat_id.
+
+    Cada chat tiene su propio asyncio.Lock: los handlers de un mismo chat se
+    ejecutan en serie y los de chats distintos en paralelo. Las operaciones
+    de crear, buscar y eliminar no hacen await, asi que son atomicas dentro
+    del event loop.
+    """
+
+    def __init__(self, num_shards: int = 16):
+        if num_shards < 1:
+            raise ValueError("num_shards debe ser al menos 1")
+        self.num_shards = num_shards
+        self._shards = [_Shard() for _ in range(num_shards)]
+        # Mapeo de user_id -> chat_id para acciones privadas
+        self._users: dict[int, int] = {}
+        # Seleccion temporal de Cupido (user_id -> [lover_id, ...])
+        self._selections: dict[int, list[int]] = {}
+        # Journal de acciones (opcional, ver core.journal)
+        self.journal = None
+        # Plazos de las partidas (opcional, ver core.deadlines)
+        self.deadlines = None
+        # chat_id -> ultima actividad (time.monotonic), de la menos a la mas reciente
+        self._activity: OrderedDict[int, float] = OrderedDict()
+
+    def _shard(self, chat_id: int) -> _Shard:
+        return self._shards[chat_id % self.num_shards]
+
+    # Locks por chat
+    @asynccontextmanager
+    async def lock(self, chat_id: int):
+        """Bloquea el chat mientras dura el contexto."""
+        locks = self._shard(chat_id).locks
+        entry = locks.get(chat_id)
+        if entry is None:
+            entry = locks[chat_id] = _ChatLock()
+        entry.users += 1
+        try:
+            async with entry.lock:
+                yield
+        finally:
+            entry.users -= 1
+            if entry.users == 0:
+                del locks[chat_id]
+
+    # Partidas
+    def get(self, chat_id: int) -> Optional[Game]:
+        shard = self._shard(chat_id)
+        return shard.werewolf.get(chat_id) or shard.impostor.get(chat_id)
+
+    def get_impostor(self, chat_id: int) -> Optional[ImpostorGame]:
+        return self._shard(chat_id).impostor.get(chat_id)
+
+    def get_werewolf(self, chat_id: int) -> Optional[WerewolfGame]:
+        return self._shard(chat_id).werewolf.get(chat_id)
+
+    def create(self, chat_id: int, game: Game) -> bool:
+        """Registra la partida si el chat no tiene otra. Devuelve si se creo."""
+        shard = self._shard(chat_id)
+        if chat_id in shard.werewolf or chat_id in shard.impostor:
+            return False
+        if isinstance(game, WerewolfGame):
+            shard.werewolf[chat_id] = game
+        else:
+            shard.impostor[chat_id] = game
+        self._activity[chat_id] = time.monotonic()
+        if self.journal is not None:
+            self.journal.record_new(game)
+            game.observer = self.journal.observe
+        return True
+
+    def evict(self, chat_id: int) -> Optional[Game]:
+        """Elimina la partida del chat y todo lo que apunta a ella."""
+        shard = self._shard(chat_id)
+        game = shard.werewolf.pop(chat_id, None) or shard.impostor.pop(chat_id, None)
+        if game is None:
+            return None
+        if self.journal is not None:
+            self.journal.record(chat_id, "end")
+            game.observer = None
+        if self.deadlines is not None:
+            self.deadlines.cancel(chat_id)
+        self._activity.pop(chat_id, None)
+        for user_id in game.players:
+            if self._users.get(user_id) == chat_id:
+                del self._users[user_id]
+            self._selections.pop(user_id, None)
+        return game
+
+    def games(self) -> Iterator[tuple[int, Game]]:
+        for shard in self._shards:
+            yield from shard.werewolf.items()
+            yield from shard.impostor.items()
+
+    def __len__(self) -> int:
+        return len(self._activity)
+
+    # Actividad
+    def touch(self, chat_id: int) -> None:
+        """Anota actividad de los jugadores en la partida del chat (si tiene)."""
+        activity = self._activity
+        if chat_id in activity:
+            activity[chat_id] = time.monotonic()
+            activity.move_to_end(chat_id)
+
+    def last_activity(self, chat_id: int) -> Optional[float]:
+        return self._activity.get(chat_id)
+
+    def by_activity(self) -> Iterator[tuple[int, float]]:
+        """(chat_id, ultima actividad) de la partida menos reciente a la mas reciente.
+
+        No se puede crear ni eliminar partidas mientras se recorre.
+        """
+        return iter(self._activity.items())
+
+    # Usuarios
+    def map_users(self, chat_id: int, user_ids) -> None:
+        user_ids = tuple(user_ids)
+        for user_id in user_ids:
+            self._users[user_id] = chat_id
+        if self.journal is not None:
+            self.journal.record(chat_id, "map", user_ids)
+
+    def unmap_user(self, user_id: int, chat_id: int) -> None:
+        """Desvincula al usuario de la partida del chat (si es la suya)."""
+        if self._users.get(user_id) != chat_id:
+            return
+        del self._users[user_id]
+        self._selections.pop(user_id, None)
+        if self.journal is not None:
+            self.journal.record(chat_id, "unmap", user_id)
+
+    def chat_for_user(self, user_id: int) -> Optional[int]:
+        return self._users.get(user_id)
+
+    # Seleccion de Cupido
+    def selection(self, user_id: int) -> list[int]:
+        selections = self._selections.get(user_id)
+        if selections is None:
+            selections = self._selections[user_id] = []
+        return selections
+
+    def drop_selection(self, user_id: int) -> None:
+        self._selections.pop(user_id, None)
+
+    # Deteccion de fugas
+    def leaks(self) -> dict[str, list]:
+        """Entradas de los indices que no apuntan a una partida viva (ver GameLifecycle.leaks)."""
+        live = dict(self.games())
+
+        def orphan(user_id: int) -> bool:
+            game = live.get(self._users.get(user_id))
+            return game is None or user_id not in game.players
+
+        found = {
+            "users": [user_id for user_id in self._users if orphan(user_id)],
+            "selections": [user_id for user_id in self._selections if orphan(user_id)],
+            "locks": [chat_id for shard in self._shards for chat_id, entry in shard.locks.items()
+                      if entry.users == 0],
+            "activity": [chat_id for chat_id in self._activity if chat_id not in live]
+                        + [chat_id for chat_id in live if chat_id not in self._activity],
+        }
+        if self.deadlines is not None:
+            found["deadlines"] = [chat_id for chat_id in self.deadlines.keys()
+                                  if not isinstance(live.get(chat_id), WerewolfGame)]
+        return found
+
+    # Estado para snapshots
+    def export_state(self) -> dict:
+        shards = self._shards
+        return {
+            "werewolf": [g.to_state() for s in shards for g in s.werewolf.values()],
+            "impostor": [g.to_state() for s in shards for g in s.impostor.values()],
+            "users": self._users.copy(),
+            "selections": {u: list(sel) for u, sel in self._selections.items()},
+        }
+
+    def load_state(self, state: dict) -> int:
+        """Sustituye las partidas por las del snapshot. Devuelve cuantas cargo."""
+        self._shards = [_Shard() for _ in range(self.num_shards)]
+        for game_state in state["werewolf"]:
+            game = WerewolfGame.from_state(game_state)
+            self._shard(game.chat_id).werewolf[game.chat_id] = game
+        for game_state in state["impostor"]:
+            game = ImpostorGame.from_state(game_state)
+            self._shard(game.chat_id).impostor[game.chat_id] = game
+        self._users = dict(state["users"])
+        self._selections = {u: list(sel) for u, sel in state["selections"].items()}
+        # La actividad no se guarda: las partidas restauradas cuentan desde ahora
+        now = time.monotonic()
+        self._activity = OrderedDict((chat_id, now) for chat_id, _ in self.games())
+        if self.journal is not None:
+            self.attach_journal(self.journal)
+        return len(state["werewolf"]) + len(state["impostor"])
+
+    def attach_journal(self, journal) -> None:
+        """Conecta el journal y empieza a registrar las acciones de todas las partidas."""
+        self.journal = journal
+        for _, game in self.games():
+            game.observer = journal.observe
@@ -0,0 +1,114 @@
+import asyncio
+import multiprocessing
+import signal
+import threading
+from typing import Callable
+
+from telegram import Update
+from telegram.ext import Application, ContextTypes
+
+from .metrics import counter, gauge
+
+# Constante del hash multiplicativo (Fibonacci, 64 bits)
+_HASH = 0x9E3779B97F4A7C15
+_MASK = (1 << 64) - 1
+
+
+def worker_for(chat_id: int, workers: int) -> int:
+    """Worker que atiende un chat.
+
+    Se mezclan los bits del chat_id antes del modulo: el registro de cada
+    worker ya reparte por chat_id % NUM_SHARDS, y con un modulo directo
+    muchos shards de cada worker se quedarian vacios.
+    """
+    return (((chat_id * _HASH) & _MASK) >> 32) % workers
+
+
+class ShardRouter:
+    """Ingress del modo multiproceso: reparte los updates entre N workers.
+
+    Cada worker es un proceso con su propia Application, su registro de
+    partidas, su journal y su snapshot. Todos los updates de un chat van
+    siempre al mismo worker y en el orden en que llegan.
+    """
+
+    def __init__(self, target: Callable, workers: int, chat_de: Callable[[Update], int]):
+        ctx = multiprocessing.get_context("spawn")
+        self.chat_de = chat_de
+        self.queues = [ctx.Queue() for _ in range(workers)]
+        self.processes = [
+            ctx.Process(target=target, args=(i, workers, queue), name=f"worker-{i}")
+            for i, queue in enumerate(self.queues)
+        ]
+        # Updates enviados a cada worker
+        self.routed = [0] * workers
+
+    def start(self):
+        for process in self.processes:
+            process.start()
+
+    async def handle(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        i = worker_for(self.chat_de(update), len(self.queues))
+        self.queues[i].put(update.to_dict())
+        self.routed[i] += 1
+
+    def collect(self):
+        """Collector de core.metrics para el proceso ingress."""
+        yield from counter("bot_shard_routed_total", "Updates enviados a cada worker",
+                           (({"worker": str(i)}, n) for i, n in enumerate(self.routed)))
+        yield from gauge("bot_shard_queue_depth", "Updates pendientes en la cola de cada worker",
+                         (({"worker": str(i)}, q.qsize()) for i, q in enumerate(self.queues)))
+
+    def stop(self, timeout: float = 30.0):
+        """Pide a los workers que terminen (tras procesar su cola) y los espera."""
+        for queue in self.queues:
+            queue.put(None)
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                print(f"{process.name} no termino en {timeout:.0f}s; se fuerza la salida")
+                process.terminate()
+                process.join()
+
+
+async def serve_worker(app: Application, updates: "multiprocessing.Queue"):
+    """Procesa los updates que manda el ingress hasta recibir None.
+
+    La Application no tiene Updater: un hilo lee la cola del proceso y pasa
+    cada update al update_queue del bucle. Los post_* se llaman igual que
+    en run_polling.
+    """
+    loop = asyncio.get_running_loop()
+    done = asyncio.Event()
+
+    def entregar(data):
+        if data is None:
+            done.set()
+        else:
+            app.update_queue.put_nowait(Update.de_json(data, app.bot))
+
+    def leer():
+        while True:
+            data = updates.get()
+            loop.call_soon_threadsafe(entregar, data)
+            if data is None:
+                return
+
+    async with app:
+        if app.post_init:
+            await app.post_init(app)
+        await app.start()
+        threading.Thread(target=leer, name="ingress", daemon=True).start()
+        await done.wait()
+        # stop() espera a que se procesen los updates ya encolados
+        await app.stop()
+        if app.post_stop:
+            await app.post_stop(app)
+    if app.post_shutdown:
+        await app.post_shutdown(app)
+
+
+def run_worker(app: Application, updates: "multiprocessing.Queue"):
+    # Ctrl+C llega a todo el grupo de procesos; el ingress decide cuando parar
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(serve_worker(app, updates))
@@ -0,0 +1,123 @@
+import asyncio
+import gc
+import os
+import pickle
+import time
+import zlib
+
+from .journal import replay
+from .registry import GameRegistry
+
+MAGIC = b"BMGS"
+SNAPSHOT_VERSION = 1
+
+
+def dump_bytes(registry: GameRegistry, journal_seq: int = 0, chat_commands=None) -> bytes:
+    """Serializa todas las partidas: cabecera + pickle de tuplas basicas comprimido."""
+    state = registry.export_state()
+    # Ultima entrada del journal incluida en este snapshot
+    state["journal_seq"] = journal_seq
+    # Comandos aplicados a cada chat (ChatCommands)
+    state["commands"] = chat_commands.export_state() if chat_commands is not None else {}
+    payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+    return MAGIC + bytes([SNAPSHOT_VERSION]) + zlib.compress(payload, 1)
+
+
+def write_atomic(path: str, data: bytes):
+    """Escribe en un temporal, hace fsync y lo renombra sobre `path`."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def load(registry: GameRegistry, path: str, chat_commands=None) -> tuple[int, int]:
+    """Restaura las partidas del snapshot si existe.
+
+    Devuelve (partidas cargadas, ultimo seq del journal que ya incluye).
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return 0, 0
+
+    if data[:5] != MAGIC + bytes([SNAPSHOT_VERSION]):
+        print(f"Snapshot {path} con formato desconocido, se ignora.")
+        return 0, 0
+
+    # Sin el GC la carga es ~30% mas rapida: solo se crean objetos, no hay ciclos
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        state = pickle.loads(zlib.decompress(data[5:]))
+        if chat_commands is not None:
+            chat_commands.load_state(state.get("commands", {}))
+        return registry.load_state(state), state["journal_seq"]
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def restore(registry: GameRegistry, path: str, journal, chat_commands=None) -> tuple[int, int]:
+    """Carga el snapshot, repite el journal posterior y conecta el journal.
+
+    El journal se conecta despues del replay (si no, lo repetido se volveria
+    a registrar) y sigue numerando tras lo que ya esta en el snapshot o en
+    disco. Devuelve (partidas del snapshot, entradas repetidas).
+    """
+    restored, journal_seq = load(registry, path, chat_commands)
+    journal.seq = journal_seq
+    replayed, last_seq = replay(registry, journal.directory, after_seq=journal_seq)
+    journal.seq = max(journal.seq, last_seq)
+    registry.attach_journal(journal)
+    return restored, replayed
+
+
+class Snapshotter:
+    """Guarda periodicamente todas las partidas en disco."""
+
+    def __init__(self, registry: GameRegistry, path: str, interval: float = 30.0, journal=None,
+                 chat_commands=None):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.journal = journal
+        self.chat_commands = chat_commands
+        self._task = None
+
+    async def save(self):
+        # Serializar en el event loop (estado consistente) y escribir en un hilo
+        start = time.perf_counter()
+        seq = self.journal.rotate() if self.journal else 0
+        data = dump_bytes(self.registry, seq, self.chat_commands)
+        await asyncio.to_thread(write_atomic, self.path, data)
+        # Lo anterior al snapshot ya no hace falta para recuperar
+        if self.journal:
+            await asyncio.to_thread(self.journal.prune, seq)
+        return time.perf_counter() - start
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.save()
+            except Exception as e:
+                print(f"Error guardando snapshot: {e}")
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.save()
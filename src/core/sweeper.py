@@ -0,0 +1,124 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+from games.hombres_lobo import WerewolfGame
+
+from .registry import Game, GameRegistry
+
+# Motivos de expulsion
+IDLE = "idle"
+CAP = "cap"
+
+OnEvict = Callable[[int, str], Awaitable[Optional[Game]]]
+
+
+def phase_of(game: Game) -> str:
+    return game.phase.value if isinstance(game, WerewolfGame) else game.state.value
+
+
+class IdleSweeper:
+    """Expulsa las partidas abandonadas.
+
+    Cada `interval` segundos recorre las partidas de la menos a la mas
+    reciente (GameRegistry.by_activity) y elimina las que llevan mas del TTL
+    de su fase sin actividad de los jugadores. Si hay tope (`max_games`) y
+    se supera, elimina ademas las menos recientes. Cada partida se elimina
+    con on_evict(chat_id, motivo), con el lock del chat tomado, que devuelve
+    la partida eliminada (None si ya no estaba). Por defecto solo se quita
+    del registro; el bot la termina con GameLifecycle.end y avisa al grupo.
+    """
+
+    def __init__(self, registry: GameRegistry, ttls: dict[str, float], default_ttl: float,
+                 max_games: int = 0, interval: float = 60.0):
+        self.registry = registry
+        # Fase (GameState / GamePhase .value) -> segundos sin actividad
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.max_games = max_games
+        self.interval = interval
+        self.on_evict: OnEvict = self._evict
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # Estadisticas
+        self.evicted = {IDLE: 0, CAP: 0}
+
+    def start(self, on_evict: Optional[OnEvict] = None):
+        if on_evict is not None:
+            self.on_evict = on_evict
+        self._task = asyncio.create_task(self._run())
+
+    async def _evict(self, chat_id: int, reason: str) -> Optional[Game]:
+        return self.registry.evict(chat_id)
+
+    def check_cap(self):
+        """Llamar tras crear una partida: si se supera el tope, barre ya."""
+        if self.max_games and len(self.registry) > self.max_games:
+            self._wakeup.set()
+
+    def _ttl(self, game: Game) -> float:
+        return self.ttls.get(phase_of(game), self.default_ttl)
+
+    def _idle(self, chat_id: int, now: float) -> bool:
+        game = self.registry.get(chat_id)
+        last = self.registry.last_activity(chat_id)
+        return game is not None and last is not None and now - last > self._ttl(game)
+
+    def candidates(self, now: float) -> list[tuple[int, str]]:
+        """Partidas a expulsar, sin tocar el registro."""
+        registry = self.registry
+        min_ttl = min([self.default_ttl, *self.ttls.values()])
+        excess = len(registry) - self.max_games if self.max_games else 0
+
+        victims = []
+        for chat_id, last in registry.by_activity():
+            if excess > 0:
+                victims.append((chat_id, CAP))
+                excess -= 1
+            elif now - last <= min_ttl:
+                # El resto es aun mas reciente
+                break
+            elif now - last > self._ttl(registry.get(chat_id)):
+                victims.append((chat_id, IDLE))
+        return victims
+
+    async def sweep(self) -> int:
+        """Un barrido. Devuelve cuantas partidas se eliminaron."""
+        count = 0
+        for chat_id, reason in self.candidates(time.monotonic()):
+            async with self.registry.lock(chat_id):
+                # Mientras se esperaba el lock la partida pudo terminar o recibir actividad
+                if reason == IDLE and not self._idle(chat_id, time.monotonic()):
+                    continue
+                if reason == CAP and len(self.registry) <= self.max_games:
+                    continue
+                try:
+                    game = await self.on_evict(chat_id, reason)
+                except Exception as e:
+                    print(f"Error eliminando la partida inactiva de {chat_id}: {e}")
+                    continue
+                if game is not None:
+                    self.evicted[reason] += 1
+                    count += 1
+        return count
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"Error barriendo partidas inactivas: {e}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,109 @@
+import asyncio
+from typing import Callable
+
+# Texto del recuento (se genera al editar, con los votos de ese momento)
+Render = Callable[[], str]
+
+
+class TallyBoards:
+    """Mensaje de recuento de cada votacion, editado segun llegan los votos.
+
+    Al abrir la votacion se envia un mensaje con el recuento; cada voto pide
+    editarlo. Las peticiones de un chat se agrupan: la primera programa una
+    edicion dentro de `delay` segundos y las que llegan mientras tanto solo
+    se cuentan, asi que como mucho hay una edicion por chat y ventana. El
+    texto se genera al editar y no se edita si no ha cambiado.
+    """
+
+    def __init__(self, delay: float = 1.5):
+        self.delay = delay
+        # chat_id -> [message_id, ultimo texto enviado]
+        self._boards: dict[int, list] = {}
+        # chat_id -> (render, peticiones agrupadas)
+        self._pending: dict[int, tuple[Render, int]] = {}
+        self._timers: dict[int, asyncio.Task] = {}
+        # Estadisticas
+        self.edits = 0
+        self.saved = 0
+
+    def __contains__(self, chat_id: int) -> bool:
+        return chat_id in self._boards
+
+    def chats(self):
+        """Chats con un recuento abierto."""
+        return self._boards.keys()
+
+    async def open(self, bot, chat_id: int, text: str):
+        """Envia el recuento de una votacion nueva (sustituye al anterior del chat)."""
+        self.discard(chat_id)
+        try:
+            message = await bot.send_message(chat_id=chat_id, text=text)
+        except Exception as e:
+            print(f"Error enviando el recuento de {chat_id}: {e}")
+            return
+        self._boards[chat_id] = [message.message_id, text]
+
+    async def request(self, bot, chat_id: int, render: Render):
+        """Pide actualizar el recuento del chat (no hace nada si no tiene)."""
+        if chat_id not in self._boards:
+            return
+        pending = self._pending.get(chat_id)
+        if pending is not None:
+            self._pending[chat_id] = (render, pending[1] + 1)
+            return
+
+        self._pending[chat_id] = (render, 1)
+        if self.delay <= 0:
+            await self._apply(bot, chat_id)
+        else:
+            self._timers[chat_id] = asyncio.create_task(self._apply_later(bot, chat_id))
+
+    async def _apply_later(self, bot, chat_id: int):
+        await asyncio.sleep(self.delay)
+        self._timers.pop(chat_id, None)
+        await self._apply(bot, chat_id)
+
+    async def _apply(self, bot, chat_id: int):
+        render, requests = self._pending.pop(chat_id)
+        board = self._boards.get(chat_id)
+        if board is None:
+            self.saved += requests
+            return
+        text = render()
+        if text == board[1]:
+            self.saved += requests
+            return
+        self.saved += requests - 1
+        self.edits += 1
+        try:
+            await bot.edit_message_text(chat_id=chat_id, message_id=board[0], text=text)
+            board[1] = text
+        except Exception as e:
+            # Mensaje borrado o inaccesible: no se vuelve a intentar en esta votacion
+            self._boards.pop(chat_id, None)
+            print(f"Error actualizando el recuento de {chat_id}: {e}")
+
+    async def close(self, bot, chat_id: int):
+        """Termina la votacion: aplica ya la edicion pendiente y olvida el recuento."""
+        timer = self._timers.pop(chat_id, None)
+        if timer is not None:
+            timer.cancel()
+        if chat_id in self._pending:
+            await self._apply(bot, chat_id)
+        self._boards.pop(chat_id, None)
+
+    def discard(self, chat_id: int):
+        """Olvida el recuento sin llamar a la API (la partida termino)."""
+        timer = self._timers.pop(chat_id, None)
+        if timer is not None:
+            timer.cancel()
+        self._pending.pop(chat_id, None)
+        self._boards.pop(chat_id, None)
+
+    async def flush(self, bot):
+        """Aplica ya las ediciones pendientes (antes de parar el bot)."""
+        for task in self._timers.values():
+            task.cancel()
+        self._timers.clear()
+        for chat_id in list(self._pending):
+            await self._apply(bot, chat_id)
@@ -0,0 +1,192 @@
+import asyncio
+import hmac
+import json
+import secrets
+import signal
+from typing import Optional
+from urllib.parse import urlparse
+
+from telegram import Update
+from telegram.ext import Application
+
+from .metrics import Metrics, gauge
+
+_STATUS = {
+    200: b"OK", 400: b"Bad Request", 403: b"Forbidden", 404: b"Not Found",
+    405: b"Method Not Allowed", 413: b"Payload Too Large",
+}
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+# Tamano maximo del cuerpo de un update (los de Telegram ocupan unos pocos KB)
+MAX_BODY = 256 * 1024
+MAX_HEADERS = 100
+
+
+class WebhookServer:
+    """Servidor HTTP minimo (asyncio) que recibe los updates del webhook.
+
+    Cada POST al path del webhook lleva un update en JSON. Se comprueba la
+    cabecera del secret_token (obligatorio: sin el cualquiera que llegue al
+    puerto podria enviar updates falsos), se responde 200 y el update se
+    procesa en una tarea. Como mucho hay `max_inflight` updates procesandose a la vez: si se
+    llega al limite, la respuesta espera a que quede un hueco y Telegram deja
+    de enviar por esa conexion hasta entonces.
+    """
+
+    def __init__(self, app: Application, secret_token: str, path: str = "/", max_inflight: int = 64):
+        if not secret_token:
+            raise ValueError("El webhook necesita un secret_token")
+        self.app = app
+        self.path = path or "/"
+        self.secret_token = secret_token
+        self._secret = secret_token.encode()
+        self.max_inflight = max_inflight
+        self._slots = asyncio.Semaphore(max(1, max_inflight))
+        self._tasks: set[asyncio.Task] = set()
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        # Estadisticas
+        self.received = 0
+        self.rejected = 0
+
+    @property
+    def inflight(self) -> int:
+        return len(self._tasks)
+
+    async def _process(self, update: Update):
+        try:
+            await self.app.process_update(update)
+        except Exception as e:
+            print(f"Error procesando el update {update.update_id}: {e}")
+        finally:
+            self._slots.release()
+
+    def _check(self, method: bytes, path: bytes, headers: dict) -> tuple[int, int]:
+        """(estado, longitud del cuerpo) antes de leer el cuerpo: 200 si se puede leer."""
+        if path.split(b"?")[0] != self.path.encode():
+            return 404, 0
+        if method != b"POST":
+            return 405, 0
+        # Las cabeceras se decodifican como latin-1: se comparan los mismos bytes que llegaron
+        if not hmac.compare_digest(headers.get(SECRET_HEADER, "").encode("latin-1"), self._secret):
+            self.rejected += 1
+            return 403, 0
+        try:
+            length = int(headers.get("content-length", ""))
+        except ValueError:
+            return 400, 0
+        if length < 0:
+            return 400, 0
+        if length > MAX_BODY:
+            return 413, 0
+        return 200, length
+
+    async def _accept(self, body: bytes) -> int:
+        try:
+            data = json.loads(body)
+            # Cualquier cuerpo que no sea un update valido es un 400
+            update = Update.de_json(data, self.app.bot) if isinstance(data, dict) else None
+        except Exception:
+            return 400
+        if update is None:
+            return 400
+
+        # Las tareas se crean en el orden de llegada: el lock de cada chat las serializa en ese orden
+        await self._slots.acquire()
+        self.received += 1
+        task = asyncio.create_task(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return 200
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path = request_line.split()[:2]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    if len(headers) >= MAX_HEADERS:
+                        raise ValueError("Demasiadas cabeceras")
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                # Se autentica y se mira el tamano antes de leer el cuerpo
+                status, length = self._check(method, path, headers)
+                if status == 200:
+                    status = await self._accept(await reader.readexactly(length))
+                    close = False
+                else:
+                    # El cuerpo se queda sin leer: no se puede seguir usando la conexion
+                    close = True
+                writer.write(
+                    b"HTTP/1.1 %d %s\r\nContent-Length: 0\r\n%s\r\n"
+                    % (status, _STATUS[status], b"Connection: close\r\n" if close else b"")
+                )
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> asyncio.AbstractServer:
+        self._server = await asyncio.start_server(self._client, host, port)
+        return self._server
+
+    async def close(self):
+        """Deja de aceptar updates y espera a los que se estan procesando."""
+        if self._server is not None:
+            self._server.close()
+            # Las conexiones keep-alive siguen abiertas: wait_closed() las esperaria
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+async def serve_webhook(app: Application, url: str, listen: str, port: int,
+                        secret_token: Optional[str] = None, max_inflight: int = 64,
+                        metrics: Optional[Metrics] = None):
+    """Equivalente a run_polling, pero recibiendo los updates por webhook.
+
+    La Application se construye sin Updater. Los post_* se llaman igual que
+    en run_polling. Termina con SIGINT o SIGTERM. Sin secret_token se genera
+    uno al azar: se registra con set_webhook, asi que solo Telegram lo conoce.
+    """
+    if not secret_token:
+        secret_token = secrets.token_urlsafe(32)
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    server = WebhookServer(app, secret_token, urlparse(url).path, max_inflight)
+    if metrics is not None:
+        metrics.add_collector(lambda: gauge(
+            "bot_webhook_inflight", "Updates del webhook procesandose ahora", [({}, server.inflight)]
+        ))
+    async with app:
+        if app.post_init:
+            await app.post_init(app)
+        await app.start()
+        await server.serve(listen, port)
+        # Telegram admite de 1 a 100 conexiones simultaneas
+        await app.bot.set_webhook(url, secret_token=secret_token,
+                                  max_connections=min(100, max(1, max_inflight)))
+        print(f"Webhook escuchando en {listen}:{port}{server.path}")
+        await stop.wait()
+        await server.close()
+        await app.stop()
+        if app.post_stop:
+            await app.post_stop(app)
+    if app.post_shutdown:
+        await app.post_shutdown(app)
@@ -0,0 +1,25 @@
+import functools
+
+
+def accion(method=None, *, name=None):
+    """Marca un metodo que cambia el estado de la partida.
+
+    Despues de ejecutarlo, si la partida tiene `observer`, se le pasa
+    (partida, nombre, args, kwargs). Asi se puede registrar cada accion en
+    un journal y repetirla despues llamando al metodo con los mismos
+    argumentos.
+    """
+    def decorator(func):
+        action_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            result = func(self, *args, **kwargs)
+            if self.observer is not None:
+                self.observer(self, action_name, args, kwargs)
+            return result
+        return wrapper
+
+    if method is not None:
+        return decorator(method)
+    return decorator
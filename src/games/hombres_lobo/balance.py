@@ -0,0 +1,351 @@
+"""Monte Carlo vectorizado para equilibrar get_roles_for_players.
+
+Juega millones de partidas simplificadas de Hombres Lobo a la vez con NumPy:
+cada fila de los arrays es una partida y cada columna un jugador. Para cada
+numero de jugadores y mezcla de roles da el porcentaje de victorias de los
+aldeanos, los lobos y el Flautista.
+
+Reglas simplificadas (todas las decisiones al azar, como en games.simulador):
+- Cupido enamora a dos jugadores la primera noche.
+- El Protector protege a un vivo distinto del de la noche anterior.
+- Los lobos eligen una victima entre los vivos que no son lobos.
+- La Vidente investiga a alguien; si descubre un lobo, el pueblo le hace
+  caso con probabilidad --influencia en cada votacion.
+- La Bruja usa cada pocion con probabilidad --prob-pocion.
+- El Flautista hechiza a 2 jugadores cada noche.
+- De dia cada vivo vota a otro al azar (los lobos solo a no lobos) o a no
+  linchar; se aplican las mismas reglas de empate y mayoria que el motor. Si
+  linchan al Cazador, dispara a alguien.
+
+Uso: python -m games.hombres_lobo.balance [--jugadores 6 16] [--partidas 100000]
+                                          [--flautista] [--mezcla lobo=2,vidente,bruja]
+"""
+import argparse
+import time
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:  # Solo lo usa esta herramienta (requirements-dev.txt)
+    raise SystemExit("Hace falta numpy: pip install -r requirements-dev.txt")
+
+from .roles import Role, Team, get_roles_for_players
+
+# Resultados por partida
+EN_CURSO, ALDEANOS, LOBOS, FLAUTISTA = 0, 1, 2, 3
+MAX_DIAS = 100
+
+ABREVIATURAS = {
+    Role.HOMBRE_LOBO: "L", Role.VIDENTE: "V", Role.BRUJA: "B", Role.CAZADOR: "Cz",
+    Role.PROTECTOR: "P", Role.CUPIDO: "Cu", Role.FLAUTISTA: "F", Role.ALDEANO: "A",
+}
+
+
+def describir(roles: list[Role]) -> str:
+    """Mezcla en forma compacta, p. ej. '2L V B 5A'."""
+    partes = []
+    for role in ABREVIATURAS:
+        n = roles.count(role)
+        if n:
+            partes.append(f"{n if n > 1 else ''}{ABREVIATURAS[role]}")
+    return " ".join(partes)
+
+
+def _candidatos(candidatos: np.ndarray):
+    """Indices planos de los candidatos (ordenados por fila) y cuantos hay antes de cada fila."""
+    nz = np.flatnonzero(candidatos)
+    cuantos = candidatos.sum(axis=1, dtype=np.int32)
+    base = np.cumsum(cuantos, dtype=np.int64) - cuantos
+    return nz, base, cuantos
+
+
+def _elegir(rng, candidatos: np.ndarray) -> np.ndarray:
+    """Una columna al azar entre las True de cada fila (-1 si no hay ninguna).
+
+    Basta un numero aleatorio por fila: el k-esimo candidato de la fila es
+    nz[base + k], porque flatnonzero devuelve los indices en orden de fila.
+    """
+    G, N = candidatos.shape
+    nz, base, cuantos = _candidatos(candidatos)
+    if not len(nz):
+        return np.full(G, -1)
+    k = (rng.random(G) * cuantos).astype(np.int64)
+    idx = nz[np.minimum(base + k, len(nz) - 1)]
+    return np.where(cuantos > 0, idx - np.arange(G) * N, -1)
+
+
+def _votar(rng, candidatos: np.ndarray) -> np.ndarray:
+    """Para cada (partida, votante), un candidato al azar distinto del votante."""
+    G, N = candidatos.shape
+    nz, base, cuantos = _candidatos(candidatos)
+    if not len(nz):
+        return np.full((G, N), -1)
+    propio = candidatos.cumsum(axis=1, dtype=np.int16) - 1
+    disponibles = cuantos[:, None] - candidatos
+    k = (rng.random((G, N), dtype=np.float32) * disponibles).astype(np.int32)
+    k = np.minimum(k, np.maximum(disponibles - 1, 0))
+    # Saltarse a si mismo: los candidatos desde su posicion se corren uno
+    k += candidatos & (k >= propio)
+    idx = nz[np.minimum(base[:, None] + k, len(nz) - 1)]
+    return np.where(disponibles > 0, idx - np.arange(G)[:, None] * N, -1)
+
+
+class _Partidas:
+    """Estado de un lote de partidas (una fila por partida)."""
+
+    def __init__(self, roles: list[Role], partidas: int):
+        G, N = partidas, len(roles)
+        self.ids = np.arange(G)
+        self.alive = np.ones((G, N), dtype=bool)
+        self.enchanted = np.zeros((G, N), dtype=bool)
+        self.heal_left = np.ones(G, dtype=bool)
+        self.kill_left = np.ones(G, dtype=bool)
+        self.last_protected = np.full(G, -1)
+        self.lover_a = np.full(G, -1)
+        self.lover_b = np.full(G, -1)
+        self.known_wolf = np.full(G, -1)
+
+    def filtrar(self, keep: np.ndarray):
+        for name in ("ids", "alive", "enchanted", "heal_left", "kill_left", "last_protected",
+                     "lover_a", "lover_b", "known_wolf"):
+            setattr(self, name, getattr(self, name)[keep])
+
+
+def simular_mezcla(roles: list[Role], partidas: int, rng=None, prob_pocion: float = 0.3,
+                   influencia: float = 0.5, prob_no_linchar: float = 0.05) -> dict:
+    """Juega `partidas` partidas con la mezcla dada y devuelve las tasas de victoria."""
+    rng = rng or np.random.default_rng()
+    N = len(roles)
+    role = np.array([list(Role).index(r) for r in roles])
+    is_wolf = role == list(Role).index(Role.HOMBRE_LOBO)
+    cols = np.arange(N)
+
+    def columna(r: Role) -> Optional[int]:
+        found = np.flatnonzero(role == list(Role).index(r))
+        return int(found[0]) if len(found) else None
+
+    cupido, protector, vidente = columna(Role.CUPIDO), columna(Role.PROTECTOR), columna(Role.VIDENTE)
+    bruja, cazador, flautista = columna(Role.BRUJA), columna(Role.CAZADOR), columna(Role.FLAUTISTA)
+
+    resultado = np.zeros(partidas, dtype=np.int8)
+    dias = np.zeros(partidas, dtype=np.int32)
+    s = _Partidas(roles, partidas)
+
+    def matar(rows: np.ndarray, victimas: np.ndarray, muertes: np.ndarray):
+        ok = victimas >= 0
+        muertes[rows[ok], victimas[ok]] = True
+
+    def enamorados(muertes: np.ndarray):
+        """El enamorado vivo de un muerto muere tambien."""
+        rows = np.flatnonzero(s.lover_a >= 0)
+        a, b = s.lover_a[rows], s.lover_b[rows]
+        muere = muertes[rows, a] | muertes[rows, b]
+        muertes[rows[muere], a[muere]] = True
+        muertes[rows[muere], b[muere]] = True
+
+    def estado() -> np.ndarray:
+        """Resultado de cada partida (mismo orden que _check_winner)."""
+        alive = s.alive
+        wolves = (alive & is_wolf).sum(axis=1)
+        vivos = alive.sum(axis=1)
+        fin = np.where(wolves == 0, ALDEANOS, np.where(wolves >= vivos - wolves, LOBOS, EN_CURSO))
+        if flautista is not None:
+            hechizados = (alive & s.enchanted).sum(axis=1) - (alive[:, flautista] & s.enchanted[:, flautista])
+            gana = alive[:, flautista] & (hechizados == vivos - 1)
+            fin = np.where((fin == EN_CURSO) & gana, FLAUTISTA, fin)
+        return fin
+
+    def retirar(fin: np.ndarray, dia: int):
+        """Apunta las partidas terminadas y las quita del lote."""
+        terminadas = fin != EN_CURSO
+        resultado[s.ids[terminadas]] = fin[terminadas]
+        dias[s.ids[terminadas]] = dia
+        s.filtrar(~terminadas)
+
+    for dia in range(1, MAX_DIAS + 1):
+        G = len(s.ids)
+        if not G:
+            break
+        rows = np.arange(G)
+        alive = s.alive
+
+        # NOCHE
+        if dia == 1 and cupido is not None:
+            s.lover_a = _elegir(rng, alive)
+            s.lover_b = _elegir(rng, alive & (cols != s.lover_a[:, None]))
+
+        protegido = np.full(G, -1)
+        if protector is not None:
+            vivo = alive[:, protector]
+            elegido = _elegir(rng, alive & (cols != s.last_protected[:, None]))
+            protegido = np.where(vivo, elegido, -1)
+            s.last_protected = protegido
+
+        victima = _elegir(rng, alive & ~is_wolf)
+
+        if vidente is not None:
+            vivo = alive[:, vidente]
+            mirado = _elegir(rng, alive & (cols != vidente))
+            descubre = vivo & (mirado >= 0) & is_wolf[np.maximum(mirado, 0)]
+            s.known_wolf = np.where(descubre, mirado, s.known_wolf)
+
+        salvado = np.zeros(G, dtype=bool)
+        envenenado = np.full(G, -1)
+        if bruja is not None:
+            vivo = alive[:, bruja]
+            salvado = vivo & s.heal_left & (rng.random(G) < prob_pocion)
+            s.heal_left &= ~salvado
+            mata = vivo & s.kill_left & (rng.random(G) < prob_pocion)
+            s.kill_left &= ~mata
+            envenenado = np.where(mata, _elegir(rng, alive & (cols != bruja)), -1)
+
+        if flautista is not None:
+            vivo = alive[:, flautista]
+            for _ in range(2):
+                hechizo = _elegir(rng, alive & ~s.enchanted & (cols != flautista))
+                ok = vivo & (hechizo >= 0)
+                s.enchanted[rows[ok], hechizo[ok]] = True
+
+        muertes = np.zeros_like(alive)
+        matar(rows, np.where((victima != protegido) & ~salvado, victima, -1), muertes)
+        matar(rows, envenenado, muertes)
+        enamorados(muertes)
+        s.alive &= ~muertes
+        retirar(estado(), dia)
+
+        # DIA
+        G = len(s.ids)
+        if not G:
+            break
+        rows = np.arange(G)
+        alive = s.alive
+        N1 = N + 1  # columna N = no linchar
+
+        votos = np.where(is_wolf, _votar(rng, alive & ~is_wolf), _votar(rng, alive))
+        votos = np.where(rng.random((G, N)) < prob_no_linchar, N, votos)
+        # El pueblo sigue a la Vidente si sabe quien es lobo
+        sabe = (s.known_wolf >= 0) & alive[rows, np.maximum(s.known_wolf, 0)]
+        sabe &= alive[:, vidente] if vidente is not None else False
+        convence = sabe & (rng.random(G) < influencia)
+        votos = np.where(convence[:, None] & ~is_wolf, s.known_wolf[:, None], votos)
+
+        valido = alive & (votos >= 0)
+        flat = (rows[:, None] * N1 + votos)[valido]
+        cuenta = np.bincount(flat, minlength=G * N1).reshape(G, N1)
+        maximo = cuenta.max(axis=1)
+        empate = (cuenta == maximo[:, None]).sum(axis=1) > 1
+        ganador = cuenta.argmax(axis=1)
+        mayoria_no = cuenta[:, N] > alive.sum(axis=1) // 2
+        lincha = (maximo > 0) & ~empate & ~mayoria_no & (ganador != N)
+
+        muertes = np.zeros_like(alive)
+        matar(rows, np.where(lincha, ganador, -1), muertes)
+        enamorados(muertes)
+        s.alive &= ~muertes
+        fin = estado()
+
+        # Si linchan al Cazador y la partida sigue, dispara a alguien
+        if cazador is not None:
+            dispara = (fin == EN_CURSO) & lincha & (ganador == cazador)
+            objetivo = np.where(dispara, _elegir(rng, s.alive), -1)
+            ok = objetivo >= 0
+            s.alive[rows[ok], objetivo[ok]] = False
+            fin = estado()
+        retirar(fin, dia)
+
+    # Las que siguen en el lote no han terminado en MAX_DIAS
+    resultado[s.ids] = EN_CURSO
+
+    total = max(partidas, 1)
+    return {
+        Team.ALDEANOS: float((resultado == ALDEANOS).sum()) / total,
+        Team.LOBOS: float((resultado == LOBOS).sum()) / total,
+        Role.FLAUTISTA: float((resultado == FLAUTISTA).sum()) / total,
+        "sin_terminar": float((resultado == EN_CURSO).sum()) / total,
+        "dias": float(dias[resultado != EN_CURSO].mean()) if (resultado != EN_CURSO).any() else 0.0,
+    }
+
+
+def mezclas(n: int, flautista: bool) -> list[tuple[list[Role], bool]]:
+    """Mezcla actual de get_roles_for_players y variantes con un lobo mas o menos.
+
+    Devuelve (roles, es_la_actual).
+    """
+    actual = get_roles_for_players(n)
+    lobos = actual.count(Role.HOMBRE_LOBO)
+    result = []
+    for delta in (-1, 0, 1):
+        if lobos + delta < 1 or actual.count(Role.ALDEANO) < delta:
+            continue
+        roles = list(actual)
+        if delta < 0:
+            roles.remove(Role.HOMBRE_LOBO)
+            roles.append(Role.ALDEANO)
+        elif delta > 0:
+            roles.remove(Role.ALDEANO)
+            roles.append(Role.HOMBRE_LOBO)
+        result.append((roles, delta == 0))
+        if flautista and Role.ALDEANO in roles:
+            con_flautista = list(roles)
+            con_flautista.remove(Role.ALDEANO)
+            con_flautista.append(Role.FLAUTISTA)
+            result.append((con_flautista, False))
+    return result
+
+
+def parse_mezcla(texto: str) -> list[Role]:
+    """'hombre_lobo=2,vidente,bruja' -> roles (el resto hasta N se rellena con aldeanos)."""
+    roles = []
+    for parte in texto.split(","):
+        nombre, _, cantidad = parte.strip().partition("=")
+        roles.extend([Role(nombre)] * int(cantidad or 1))
+    return roles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jugadores", type=int, nargs=2, default=[6, 16], metavar=("MIN", "MAX"))
+    parser.add_argument("--partidas", type=int, default=100000, help="Partidas por mezcla")
+    parser.add_argument("--flautista", action="store_true", help="Probar tambien cada mezcla con Flautista")
+    parser.add_argument("--mezcla", help="Mezcla fija, p. ej. hombre_lobo=2,vidente,bruja")
+    parser.add_argument("--prob-pocion", type=float, default=0.3)
+    parser.add_argument("--influencia", type=float, default=0.5,
+                        help="Probabilidad de que el pueblo siga a la Vidente")
+    parser.add_argument("--prob-no-linchar", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    lo, hi = args.jugadores
+    print(f"{'jug':>4}  {'mezcla':<26}{'aldeanos':>10}{'lobos':>9}{'flautista':>11}{'dias':>7}")
+    start = time.perf_counter()
+    total = 0
+    for n in range(lo, hi + 1):
+        if args.mezcla:
+            roles = parse_mezcla(args.mezcla)
+            candidatas = [(roles + [Role.ALDEANO] * (n - len(roles)), False)] if len(roles) <= n else []
+        else:
+            candidatas = mezclas(n, args.flautista)
+
+        filas = []
+        for roles, es_actual in candidatas:
+            r = simular_mezcla(roles, args.partidas, rng, args.prob_pocion, args.influencia,
+                               args.prob_no_linchar)
+            total += args.partidas
+            filas.append((roles, es_actual, r))
+
+        # La mas equilibrada es la que deja a los lobos mas cerca del 50%
+        mejor = min(filas, key=lambda f: abs(f[2][Team.LOBOS] - 0.5), default=None)
+        for roles, es_actual, r in filas:
+            marca = (" *" if es_actual else "  ") + (" <- mas equilibrada" if len(filas) > 1 and mejor[0] is roles else "")
+            print(
+                f"{n:>4}  {describir(roles):<26}{r[Team.ALDEANOS]:>10.1%}{r[Team.LOBOS]:>9.1%}"
+                f"{r[Role.FLAUTISTA]:>11.1%}{r['dias']:>7.2f}{marca}"
+            )
+    elapsed = time.perf_counter() - start
+    print(f"\n* = mezcla actual de get_roles_for_players. {total:,} partidas en {elapsed:.1f} s "
+          f"({total / elapsed:,.0f} partidas/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 import random
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
-from .roles import Role, Team, ROLES_INFO, get_roles_for_players
+from typing import Callable, Optional
+from .roles import Role, Team, get_roles_for_players
+from . import night
+from ..tally import VoteTally, NO_LYNCH
+from ..acciones import accion
+from .. import textos
 
 
 class GamePhase(Enum):
@@ -11,6 +15,7 @@ class GamePhase(Enum):
     DAY_ANNOUNCEMENT = "day_announcement"
     DAY_DISCUSSION = "day_discussion"
     DAY_VOTING = "day_voting"
+    HUNTER = "hunter"  # Cazador linchado, esperando su disparo
     FINISHED = "finished"
 
 
@@ -24,7 +29,11 @@ class NightPhase(Enum):
     DONE = "done"
 
 
-@dataclass
+# Busqueda rapida de roles por valor (Role(valor) es lento al restaurar miles de partidas)
+_ROLE_BY_VALUE = {role.value: role for role in Role}
+
+
+@dataclass(slots=True)
 class Player:
     user_id: int
     name: str
@@ -42,7 +51,7 @@ class Player:
     night_action_done: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class WerewolfGame:
     chat_id: int
     creator_id: int
@@ -62,46 +71,94 @@ class WerewolfGame:
     # Resultados de la noche
     night_deaths: list = field(default_factory=list)
     night_messages: list = field(default_factory=list)
-
+    # Jugadores que el Flautista hechiza al amanecer
+    enchant_targets: list = field(default_factory=list, init=False, repr=False)
+    # Indices de jugadores vivos (se actualizan en cada muerte)
+    _alive: dict = field(default_factory=dict, init=False, repr=False)
+    _alive_wolves: dict = field(default_factory=dict, init=False, repr=False)
+    _alive_non_wolves: dict = field(default_factory=dict, init=False, repr=False)
+    # Rol -> {user_id: jugador} de los vivos que lo tienen (el de los lobos es _alive_wolves)
+    _holders: dict = field(default_factory=dict, init=False, repr=False)
+    _enchanted_alive: int = field(default=0, init=False, repr=False)
+    _flautista_id: Optional[int] = field(default=None, init=False, repr=False)
+    # Acciones nocturnas pendientes y avisos listos para enviar
+    pending_actions: set = field(default_factory=set, init=False, repr=False)
+    ready_prompts: list = field(default_factory=list, init=False, repr=False)
+    # Recuentos de votos
+    wolf_tally: VoteTally = field(default_factory=VoteTally, init=False, repr=False)
+    day_tally: VoteTally = field(default_factory=VoteTally, init=False, repr=False)
+    # Callback que recibe cada accion (ver games.acciones)
+    observer: Optional[Callable] = field(default=None, init=False, repr=False, compare=False)
+
+    @accion
     def add_player(self, user_id: int, name: str, username: Optional[str] = None) -> tuple[bool, str]:
         if self.phase != GamePhase.LOBBY:
-            return False, "El juego ya ha comenzado."
+            return False, textos.YA_COMENZADO
         if user_id in self.players:
-            return False, "Ya estas en la partida."
+            return False, textos.YA_EN_PARTIDA
 
-        self.players[user_id] = Player(user_id=user_id, name=name, username=username)
-        return True, f"{name} se ha unido! ({len(self.players)} jugadores)"
+        player = Player(user_id=user_id, name=name, username=username)
+        self.players[user_id] = player
+        self._alive[user_id] = player
+        self._alive_non_wolves[user_id] = player
+        return True, textos.unido(name, len(self.players))
 
+    @accion
     def remove_player(self, user_id: int) -> tuple[bool, str]:
         if user_id not in self.players:
-            return False, "No estas en la partida."
+            return False, textos.NO_EN_PARTIDA
 
-        name = self.players[user_id].name
+        player = self.players[user_id]
+        name = player.name
+        if self.phase != GamePhase.LOBBY:
+            # Empezada: queda como muerto, los votos, enamorados y acciones lo siguen nombrando.
+            # _kill retira sus votos y cierra su accion nocturna si era el ultimo con su rol
+            self._kill(player)
+            # Quien le habia votado de dia tiene que volver a votar
+            for voter_id in self.day_tally.retract_target(user_id):
+                self.players[voter_id].vote = None
+            if self.num_alive() == 0:
+                return True, "GAME_EMPTY"
+            winner = self._check_winner()
+            if winner:
+                self.phase = GamePhase.FINISHED
+                return True, textos.ha_salido_y_gana(name, winner)
+            return True, textos.ha_salido(name, self.num_alive())
+
+        self._kill(player)
         del self.players[user_id]
 
         if len(self.players) == 0:
             return True, "GAME_EMPTY"
 
-        return True, f"{name} ha salido. ({len(self.players)} jugadores)"
+        return True, textos.ha_salido(name, len(self.players))
+
+    def start_game(self, user_id: int, seed: Optional[int] = None) -> tuple[bool, str]:
+        # La semilla queda en el journal para poder repetir el reparto
+        if seed is None:
+            seed = random.getrandbits(64)
+        return self._start_game(user_id, seed)
 
-    def start_game(self, user_id: int) -> tuple[bool, str]:
+    @accion(name="start_game")
+    def _start_game(self, user_id: int, seed: int) -> tuple[bool, str]:
         if user_id != self.creator_id:
-            return False, "Solo el creador puede iniciar la partida."
+            return False, textos.SOLO_CREADOR_INICIA
         if len(self.players) < self.min_players:
-            return False, f"Se necesitan al menos {self.min_players} jugadores."
+            return False, textos.minimo_jugadores(self.min_players)
 
         # Asignar roles
         roles = get_roles_for_players(len(self.players))
-        random.shuffle(roles)
+        random.Random(seed).shuffle(roles)
 
         for player, role in zip(self.players.values(), roles):
             player.role = role
+        self._rebuild_indexes()
 
         self.phase = GamePhase.NIGHT
         self.day_number = 1
         self._reset_night_phase()
 
-        return True, self._get_night_start_message()
+        return True, textos.noche(self.day_number)
 
     def _reset_night_phase(self):
         self.night_phase = NightPhase.CUPIDO
@@ -109,328 +166,456 @@ class WerewolfGame:
         self.protected_player = None
         self.witch_heal_target = None
         self.witch_kill_target = None
+        self.enchant_targets = []
         self.night_deaths = []
         self.night_messages = []
+        self.wolf_tally.clear()
+        self.day_tally.clear()
         for player in self.players.values():
             player.is_protected = False
             player.night_action_done = False
             player.vote = None
 
-    def _get_night_start_message(self) -> str:
-        return f"NOCHE {self.day_number}\n\nLa aldea duerme... Los roles con acciones nocturnas seran contactados."
-
+        # Roles que tienen que actuar esta noche
+        self.pending_actions = {
+            role for role in night.NIGHT_ORDER
+            if self._holders[role] and night.NIGHT_ROLES[role].acts_tonight(self)
+        }
+        self.ready_prompts = []
+
+    def _complete_action(self, role: Role):
+        """Marca la accion del rol como hecha y libera a los que dependian de ella."""
+        if role not in self.pending_actions:
+            return
+        self.pending_actions.discard(role)
+        for dependent, prerequisite in night.NIGHT_PREREQUISITES.items():
+            if prerequisite == role and dependent in self.pending_actions:
+                self.ready_prompts.append(dependent)
+
+    def awake_roles(self) -> list[Role]:
+        """Roles pendientes a los que ya se puede pedir su accion, por prioridad."""
+        pending = self.pending_actions
+        return [
+            role for role in night.NIGHT_ORDER
+            if role in pending and night.NIGHT_PREREQUISITES.get(role) not in pending
+        ]
+
+    def night_targets(self, player: Player) -> list[Player]:
+        """Jugadores que puede elegir el jugador con su accion nocturna."""
+        plugin = night.NIGHT_ROLES.get(player.role)
+        return plugin.targets(self, player) if plugin else []
+
+    @accion
+    def pop_ready_prompts(self) -> list[Role]:
+        """Devuelve (y vacia) los roles a los que ya se puede pedir su accion.
+
+        Solo los que siguen pendientes: si el ultimo con el rol murio o se fue
+        despues de quedar listo, ya no hay a quien avisar.
+        """
+        pending = self.pending_actions
+        prompts = [role for role in self.ready_prompts if role in pending]
+        self.ready_prompts = []
+        return prompts
+
+    def night_complete(self) -> bool:
+        return self.phase == GamePhase.NIGHT and not self.pending_actions
+
+    @accion
+    def expire_night(self) -> tuple[bool, str]:
+        """Se acabo el tiempo: los roles que faltan no hacen nada.
+
+        Si los lobos no llegaron a votar todos, atacan al mas votado. Los
+        roles que esperaban a otro (la Bruja) no se cierran todavia: se les
+        avisa ahora y tienen su propio plazo.
+        """
+        if self.phase != GamePhase.NIGHT:
+            return False, textos.NO_ES_DE_NOCHE
+        waiting = {
+            dependent for dependent, prerequisite in night.NIGHT_PREREQUISITES.items()
+            if prerequisite in self.pending_actions
+        }
+        if Role.HOMBRE_LOBO in self.pending_actions and self.wolf_tally:
+            self.wolf_target = self.wolf_tally.leaders()[0]
+        for role in list(self.pending_actions):
+            if role not in waiting:
+                self._complete_action(role)
+        return True, textos.NOCHE_SIN_TIEMPO
+
+    @accion
     def get_player_role(self, user_id: int) -> tuple[bool, str]:
         if user_id not in self.players:
-            return False, "No estas en esta partida."
+            return False, textos.NO_EN_ESTA_PARTIDA
 
         player = self.players[user_id]
         player.has_seen_role = True
-
-        role_info = ROLES_INFO[player.role]
-        return True, f"{role_info.emoji} Eres: {role_info.name}\n\n{role_info.description}"
+        return True, textos.ERES[player.role]
+
+    def _rebuild_indexes(self):
+        """Reconstruye los indices de vivos a partir de self.players."""
+        self._alive = {}
+        self._holders = {role: {} for role in Role}
+        self._alive_wolves = self._holders[Role.HOMBRE_LOBO]
+        self._alive_non_wolves = {}
+        self._enchanted_alive = 0
+        self._flautista_id = None
+        for user_id, player in self.players.items():
+            if player.role == Role.FLAUTISTA:
+                self._flautista_id = user_id
+            if not player.is_alive:
+                continue
+            self._alive[user_id] = player
+            if player.role is not None:
+                self._holders[player.role][user_id] = player
+            if player.role != Role.HOMBRE_LOBO:
+                self._alive_non_wolves[user_id] = player
+            if player.is_enchanted:
+                self._enchanted_alive += 1
+
+    def _kill(self, player: Player):
+        """Marca al jugador como muerto y lo saca de los indices."""
+        if not player.is_alive:
+            return
+        player.is_alive = False
+        del self._alive[player.user_id]
+        if player.role is not None:
+            del self._holders[player.role][player.user_id]
+        if player.role != Role.HOMBRE_LOBO:
+            del self._alive_non_wolves[player.user_id]
+        if player.is_enchanted:
+            self._enchanted_alive -= 1
+        # Solo cuentan los votos de los vivos
+        self.day_tally.retract(player.user_id)
+        if self.wolf_tally.retract(player.user_id) is not None or player.role == Role.HOMBRE_LOBO:
+            # Puede que ya hayan votado todos los lobos que quedan
+            if Role.HOMBRE_LOBO in self.pending_actions:
+                self._check_wolf_votes()
+        # No queda nadie con el rol para hacer su accion de esta noche
+        if player.role in self.pending_actions and not self._holders[player.role]:
+            self._complete_action(player.role)
+
+    def _check_wolf_votes(self) -> bool:
+        """Si ya han votado todos los lobos vivos, elige la victima y cierra su accion."""
+        if not self.wolf_tally or len(self.wolf_tally) < len(self._alive_wolves):
+            return False
+        self.wolf_target = self.wolf_tally.leaders()[0]
+        self._complete_action(Role.HOMBRE_LOBO)
+        return True
+
+    def _enchant(self, player: Player):
+        """Hechiza a un jugador vivo (Flautista)."""
+        if player.is_alive and not player.is_enchanted:
+            player.is_enchanted = True
+            self._enchanted_alive += 1
+
+    def num_alive(self) -> int:
+        return len(self._alive)
 
     def get_wolves(self) -> list[Player]:
-        return [p for p in self.players.values() if p.role == Role.HOMBRE_LOBO and p.is_alive]
+        return list(self._alive_wolves.values())
 
     def get_alive_players(self) -> list[Player]:
-        return [p for p in self.players.values() if p.is_alive]
+        return list(self._alive.values())
 
     def get_alive_non_wolves(self) -> list[Player]:
-        return [p for p in self.players.values() if p.is_alive and p.role != Role.HOMBRE_LOBO]
+        return list(self._alive_non_wolves.values())
 
-    # Acciones nocturnas
-    def cupido_action(self, cupido_id: int, lover1_id: int, lover2_id: int) -> tuple[bool, str]:
-        if self.day_number != 1:
-            return False, "Cupido solo actua la primera noche."
+    def holders(self, role: Role) -> list[Player]:
+        """Jugadores vivos con el rol."""
+        return list(self._holders.get(role, {}).values())
 
-        player = self.players.get(cupido_id)
-        if not player or player.role != Role.CUPIDO:
-            return False, "No eres Cupido."
+    def holder(self, role: Role) -> Optional[Player]:
+        """El jugador vivo con el rol (el primero, si hay varios)."""
+        return next(iter(self._holders.get(role, {}).values()), None)
 
-        if lover1_id not in self.players or lover2_id not in self.players:
-            return False, "Jugadores invalidos."
+    # Acciones nocturnas (la logica de cada rol esta en night.py)
+    def _night_act(self, role: Role, user_id: int, *args) -> tuple[bool, str]:
+        player = self.players.get(user_id)
+        if not player or player.role != role:
+            return False, textos.NO_ERES[role]
+        if not player.is_alive:
+            return False, textos.MUERTO_NO_ACTUA
 
-        self.players[lover1_id].is_in_love = True
-        self.players[lover1_id].lover_id = lover2_id
-        self.players[lover2_id].is_in_love = True
-        self.players[lover2_id].lover_id = lover1_id
-        player.night_action_done = True
+        return night.NIGHT_ROLES[role].act(self, player, *args)
 
-        return True, f"Has enamorado a {self.players[lover1_id].name} y {self.players[lover2_id].name}!"
+    @accion
+    def cupido_action(self, cupido_id: int, lover1_id: int, lover2_id: int) -> tuple[bool, str]:
+        return self._night_act(Role.CUPIDO, cupido_id, lover1_id, lover2_id)
 
+    @accion
     def protector_action(self, protector_id: int, target_id: int) -> tuple[bool, str]:
-        player = self.players.get(protector_id)
-        if not player or player.role != Role.PROTECTOR:
-            return False, "No eres el Protector."
-
-        if target_id == self.last_protected:
-            return False, "No puedes proteger al mismo jugador dos noches seguidas."
-
-        if target_id not in self.players or not self.players[target_id].is_alive:
-            return False, "Jugador invalido."
-
-        self.protected_player = target_id
-        self.players[target_id].is_protected = True
-        player.night_action_done = True
-
-        return True, f"Proteges a {self.players[target_id].name} esta noche."
+        return self._night_act(Role.PROTECTOR, protector_id, target_id)
 
+    @accion
     def wolf_vote(self, wolf_id: int, target_id: int) -> tuple[bool, str]:
-        player = self.players.get(wolf_id)
-        if not player or player.role != Role.HOMBRE_LOBO:
-            return False, "No eres un Hombre Lobo."
-
-        target = self.players.get(target_id)
-        if not target or not target.is_alive or target.role == Role.HOMBRE_LOBO:
-            return False, "Objetivo invalido."
-
-        player.vote = target_id
-        player.night_action_done = True
-
-        # Contar votos de lobos
-        wolves = self.get_wolves()
-        votes = [w.vote for w in wolves if w.vote]
-
-        if len(votes) == len(wolves):
-            # Todos votaron, elegir victima
-            from collections import Counter
-            vote_count = Counter(votes)
-            self.wolf_target = vote_count.most_common(1)[0][0]
-            return True, f"Los lobos han elegido a {self.players[self.wolf_target].name}."
-
-        return True, f"Voto registrado. ({len(votes)}/{len(wolves)} lobos han votado)"
+        return self._night_act(Role.HOMBRE_LOBO, wolf_id, target_id)
 
+    @accion
     def vidente_action(self, vidente_id: int, target_id: int) -> tuple[bool, str]:
-        player = self.players.get(vidente_id)
-        if not player or player.role != Role.VIDENTE:
-            return False, "No eres la Vidente."
-
-        target = self.players.get(target_id)
-        if not target or not target.is_alive:
-            return False, "Jugador invalido."
-
-        player.night_action_done = True
-        role_info = ROLES_INFO[target.role]
-
-        if target.role == Role.HOMBRE_LOBO:
-            return True, f"{target.name} es un {role_info.emoji} HOMBRE LOBO!"
-        else:
-            return True, f"{target.name} es {role_info.emoji} {role_info.name}."
+        return self._night_act(Role.VIDENTE, vidente_id, target_id)
 
+    @accion
     def bruja_action(self, bruja_id: int, heal: bool = False, kill_target: Optional[int] = None) -> tuple[bool, str]:
-        player = self.players.get(bruja_id)
-        if not player or player.role != Role.BRUJA:
-            return False, "No eres la Bruja."
-
-        messages = []
-
-        if heal and not self.witch_heal_used and self.wolf_target:
-            self.witch_heal_target = self.wolf_target
-            self.witch_heal_used = True
-            messages.append(f"Usas la pocion de vida para salvar a {self.players[self.wolf_target].name}.")
-
-        if kill_target and not self.witch_kill_used:
-            if kill_target in self.players and self.players[kill_target].is_alive:
-                self.witch_kill_target = kill_target
-                self.witch_kill_used = True
-                messages.append(f"Usas la pocion de muerte en {self.players[kill_target].name}.")
+        return self._night_act(Role.BRUJA, bruja_id, heal, kill_target)
 
-        player.night_action_done = True
-
-        if not messages:
-            return True, "No usas ninguna pocion esta noche."
-        return True, "\n".join(messages)
+    @accion
+    def flautista_action(self, flautista_id: int, target_id: int) -> tuple[bool, str]:
+        return self._night_act(Role.FLAUTISTA, flautista_id, target_id)
 
+    @accion
     def resolve_night(self) -> tuple[bool, str]:
         """Resuelve la noche y devuelve el resultado."""
         deaths = []
 
-        # Victima de los lobos
-        if self.wolf_target:
-            target = self.players[self.wolf_target]
-            # Verificar proteccion y curacion
-            if not target.is_protected and self.witch_heal_target != self.wolf_target:
-                deaths.append(self.wolf_target)
-
-        # Victima de la bruja
-        if self.witch_kill_target:
-            if self.witch_kill_target not in deaths:
-                deaths.append(self.witch_kill_target)
+        # Paso de cada rol, por prioridad (lobos, Bruja, Flautista...), con lo anotado esta noche
+        for role, resolve in night.RESOLUTION:
+            resolve(self, deaths)
 
         # Procesar muertes
         for death_id in deaths:
-            self.players[death_id].is_alive = False
+            self._kill(self.players[death_id])
             # Verificar enamorados
             if self.players[death_id].is_in_love:
                 lover_id = self.players[death_id].lover_id
                 if lover_id and self.players[lover_id].is_alive:
-                    self.players[lover_id].is_alive = False
+                    self._kill(self.players[lover_id])
                     deaths.append(lover_id)
 
         self.night_deaths = deaths
         self.last_protected = self.protected_player
 
-        # Mensaje de amanecer
-        if not deaths:
-            msg = f"DIA {self.day_number}\n\nAmanece en la aldea. Nadie ha muerto esta noche."
-        else:
-            dead_names = [self.players[d].name for d in deaths]
-            msg = f"DIA {self.day_number}\n\nAmanece en la aldea.\n\nHan muerto: {', '.join(dead_names)}"
-
         # Verificar fin de juego
         winner = self._check_winner()
         if winner:
             self.phase = GamePhase.FINISHED
-            return True, msg + f"\n\n{winner}"
-
-        self.phase = GamePhase.DAY_DISCUSSION
-        return True, msg + "\n\nEs hora de debatir. Usen /votar cuando esten listos."
+        else:
+            self.phase = GamePhase.DAY_DISCUSSION
+        return True, textos.amanecer(self.day_number, [self.players[d].name for d in deaths], winner or textos.A_DEBATIR)
 
+    @accion
     def start_voting(self) -> tuple[bool, str]:
         if self.phase != GamePhase.DAY_DISCUSSION:
-            return False, "No es momento de votar."
+            return False, textos.NO_ES_MOMENTO_VOTAR
 
         self.phase = GamePhase.DAY_VOTING
+        self.day_tally.clear()
         for player in self.players.values():
             player.vote = None
 
-        alive = self.get_alive_players()
-        return True, f"VOTACION\n\nVoten por quien quieren linchar. ({len(alive)} jugadores vivos)"
+        return True, textos.votacion(len(self._alive))
 
+    @accion
     def day_vote(self, voter_id: int, target_id: int) -> tuple[bool, str]:
         if self.phase != GamePhase.DAY_VOTING:
-            return False, "No es momento de votar."
+            return False, textos.NO_ES_MOMENTO_VOTAR
 
         voter = self.players.get(voter_id)
         if not voter or not voter.is_alive:
-            return False, "No puedes votar."
+            return False, textos.NO_PUEDES_VOTAR
 
-        target = self.players.get(target_id)
-        if not target or not target.is_alive:
-            return False, "Objetivo invalido."
+        if target_id != NO_LYNCH:
+            target = self.players.get(target_id)
+            if not target or not target.is_alive:
+                return False, textos.OBJETIVO_INVALIDO
 
         voter.vote = target_id
+        self.day_tally.cast(voter_id, target_id)
 
-        alive = self.get_alive_players()
-        votes = sum(1 for p in alive if p.vote)
+        votes = len(self.day_tally)
+        alive = len(self._alive)
 
-        if votes == len(alive):
+        if votes >= alive:
             return self._resolve_voting()
 
-        return True, f"Voto registrado. ({votes}/{len(alive)})"
+        if target_id == NO_LYNCH:
+            return True, textos.voto_no_linchar(votes, alive)
+        return True, textos.voto_dia(votes, alive)
 
     def _resolve_voting(self) -> tuple[bool, str]:
-        from collections import Counter
-
-        alive = self.get_alive_players()
-        votes = [p.vote for p in alive if p.vote]
-        vote_count = Counter(votes)
+        tally = self.day_tally
 
-        if not vote_count:
-            self.phase = GamePhase.NIGHT
-            self.day_number += 1
-            self._reset_night_phase()
-            return True, "Nadie fue linchado.\n\n" + self._get_night_start_message()
+        if not tally:
+            return True, self._no_lynch(textos.NADIE_LINCHADO)
 
-        most_voted_id, max_votes = vote_count.most_common(1)[0]
+        # Mayoria absoluta por no linchar
+        if tally.count(NO_LYNCH) > len(self._alive) // 2:
+            return True, self._no_lynch(textos.PUEBLO_NO_LINCHA)
 
         # Verificar empate
-        tied = [uid for uid, v in vote_count.items() if v == max_votes]
-        if len(tied) > 1:
-            self.phase = GamePhase.NIGHT
-            self.day_number += 1
-            self._reset_night_phase()
-            return True, "Empate en la votacion. Nadie fue linchado.\n\n" + self._get_night_start_message()
+        most_voted_id = tally.winner()
+        if most_voted_id is None:
+            return True, self._no_lynch(textos.EMPATE)
+
+        if most_voted_id == NO_LYNCH:
+            return True, self._no_lynch(textos.PUEBLO_NO_LINCHA)
 
         # Linchar
         lynched = self.players[most_voted_id]
-        lynched.is_alive = False
-        role_info = ROLES_INFO[lynched.role]
-
-        msg = f"El pueblo ha decidido linchar a {lynched.name}.\n"
-        msg += f"Era: {role_info.emoji} {role_info.name}\n"
+        self._kill(lynched)
+        msg = textos.linchado(lynched.name, lynched.role)
 
         # Verificar enamorado
         if lynched.is_in_love and lynched.lover_id:
             lover = self.players[lynched.lover_id]
             if lover.is_alive:
-                lover.is_alive = False
-                lover_role = ROLES_INFO[lover.role]
-                msg += f"\n{lover.name} muere de amor. Era: {lover_role.emoji} {lover_role.name}\n"
+                self._kill(lover)
+                msg += textos.muere_de_amor(lover.name, lover.role)
 
         # Verificar fin de juego
         winner = self._check_winner()
         if winner:
             self.phase = GamePhase.FINISHED
-            return True, msg + f"\n{winner}"
+            return True, f"{msg}\n{winner}"
 
         # Cazador
         if lynched.role == Role.CAZADOR:
-            msg += "\nEl Cazador puede elegir a quien llevarse con el! Usa /disparar"
-            return True, msg
+            self.phase = GamePhase.HUNTER
+            return True, f"{msg}\n{textos.CAZADOR_PUEDE_DISPARAR}"
+
+        return True, f"{msg}\n{self._next_night()}"
 
+    @accion
+    def close_voting(self) -> tuple[bool, str]:
+        """Se acabo el tiempo de votar: cuenta los votos emitidos."""
+        if self.phase != GamePhase.DAY_VOTING:
+            return False, textos.NO_ES_MOMENTO_VOTAR
+        return self._resolve_voting()
+
+    def voting_complete(self) -> bool:
+        """Han votado todos los vivos (tras salir alguien que no habia votado, por ejemplo)."""
+        return self.phase == GamePhase.DAY_VOTING and len(self.day_tally) >= len(self._alive)
+
+    def _no_lynch(self, motivo: str) -> str:
+        """Nadie muere en la votacion: empieza la noche siguiente."""
+        self._next_night()
+        return textos.sin_linchamiento(motivo, self.day_number)
+
+    def _next_night(self) -> str:
         self.phase = GamePhase.NIGHT
         self.day_number += 1
         self._reset_night_phase()
-        return True, msg + "\n" + self._get_night_start_message()
+        return textos.noche(self.day_number)
 
+    @accion
     def hunter_shot(self, hunter_id: int, target_id: int) -> tuple[bool, str]:
         hunter = self.players.get(hunter_id)
         if not hunter or hunter.role != Role.CAZADOR:
-            return False, "No eres el Cazador."
-        if hunter.is_alive:
-            return False, "El Cazador solo dispara al morir."
+            return False, textos.NO_ERES[Role.CAZADOR]
+        if hunter.is_alive or self.phase != GamePhase.HUNTER:
+            return False, textos.CAZADOR_SOLO_AL_MORIR
 
         target = self.players.get(target_id)
         if not target or not target.is_alive:
-            return False, "Objetivo invalido."
+            return False, textos.OBJETIVO_INVALIDO
 
-        target.is_alive = False
-        role_info = ROLES_INFO[target.role]
-
-        msg = f"El Cazador dispara a {target.name}!\nEra: {role_info.emoji} {role_info.name}\n"
+        self._kill(target)
+        msg = textos.cazador_dispara(target.name, target.role)
 
         winner = self._check_winner()
         if winner:
             self.phase = GamePhase.FINISHED
-            return True, msg + f"\n{winner}"
+            return True, f"{msg}\n{winner}"
 
-        self.phase = GamePhase.NIGHT
-        self.day_number += 1
-        self._reset_night_phase()
-        return True, msg + "\n" + self._get_night_start_message()
+        return True, f"{msg}\n{self._next_night()}"
+
+    @accion
+    def skip_hunter(self) -> tuple[bool, str]:
+        """Se acabo el tiempo del Cazador: no dispara."""
+        if self.phase != GamePhase.HUNTER:
+            return False, textos.CAZADOR_SOLO_AL_MORIR
+        return True, textos.cazador_no_dispara(self._next_night())
+
+    def get_hunter(self) -> Optional[Player]:
+        """Cazador que tiene que disparar (fase HUNTER)."""
+        if self.phase != GamePhase.HUNTER:
+            return None
+        return next((p for p in self.players.values() if p.role == Role.CAZADOR and not p.is_alive), None)
 
     def _check_winner(self) -> Optional[str]:
-        alive = self.get_alive_players()
-        wolves_alive = [p for p in alive if p.role == Role.HOMBRE_LOBO]
-        villagers_alive = [p for p in alive if p.role != Role.HOMBRE_LOBO]
+        wolves_alive = len(self._alive_wolves)
 
         if not wolves_alive:
-            return "GANAN LOS ALDEANOS! Todos los lobos han sido eliminados."
+            return textos.GANAN_ALDEANOS
 
-        if len(wolves_alive) >= len(villagers_alive):
-            return "GANAN LOS HOMBRES LOBO! Han igualado o superado a los aldeanos."
+        if wolves_alive >= len(self._alive_non_wolves):
+            return textos.GANAN_LOBOS
 
         # Verificar flautista
-        flautista = next((p for p in alive if p.role == Role.FLAUTISTA), None)
+        flautista = self._alive.get(self._flautista_id)
         if flautista:
-            others = [p for p in alive if p.user_id != flautista.user_id]
-            if all(p.is_enchanted for p in others):
-                return f"GANA EL FLAUTISTA ({flautista.name})! Todos estan hechizados."
+            enchanted_others = self._enchanted_alive - (1 if flautista.is_enchanted else 0)
+            if enchanted_others == len(self._alive) - 1:
+                return textos.gana_flautista(flautista.name)
 
         return None
 
     def get_players_list(self) -> str:
-        lines = ["Jugadores:"]
+        lines = [textos.JUGADORES]
         for i, player in enumerate(self.players.values(), 1):
-            status = "" if player.is_alive else " (muerto)"
-            creator = " (creador)" if player.user_id == self.creator_id else ""
-            lines.append(f"{i}. {player.name}{status}{creator}")
+            status = "" if player.is_alive else textos.MARCA_MUERTO
+            creator = textos.MARCA_CREADOR if player.user_id == self.creator_id else ""
+            lines.append(f"{i}. {player.name}{status + creator}")
         return "\n".join(lines)
 
     def get_alive_list(self) -> str:
         alive = self.get_alive_players()
-        lines = [f"Jugadores vivos ({len(alive)}):"]
+        lines = [textos.vivos(len(alive))]
         for i, player in enumerate(alive, 1):
             lines.append(f"{i}. {player.name}")
         return "\n".join(lines)
+
+    def get_tally_board(self) -> str:
+        """Recuento de la votacion del pueblo en curso."""
+        tally = self.day_tally
+        lines = [textos.recuento(len(tally), len(self._alive)), ""]
+        for target_id, count in tally.ranking():
+            name = textos.RECUENTO_NO_LINCHAR if target_id == NO_LYNCH else self.players[target_id].name
+            lines.append(f"{name}: {count}")
+        if not tally:
+            lines.append(textos.RECUENTO_SIN_VOTOS)
+        return "\n".join(lines)
+
+    # Estado serializable (solo tipos basicos, para snapshots)
+    def to_state(self) -> tuple:
+        players = tuple(
+            (p.user_id, p.name, p.username, p.role.value if p.role else None, p.is_alive,
+             p.has_seen_role, p.is_protected, p.is_in_love, p.lover_id, p.is_enchanted,
+             p.vote, p.night_action_done)
+            for p in self.players.values()
+        )
+        return (
+            self.chat_id, self.creator_id, self.phase.value, self.night_phase.value,
+            self.day_number, self.min_players, self.wolf_target, self.protected_player,
+            self.last_protected, self.witch_heal_used, self.witch_kill_used,
+            self.witch_heal_target, self.witch_kill_target,
+            tuple(self.night_deaths), tuple(self.night_messages), players,
+            tuple(r.value for r in self.pending_actions),
+            tuple(r.value for r in self.ready_prompts),
+            tuple(self.wolf_tally.votes.items()), tuple(self.day_tally.votes.items()),
+            tuple(self.enchant_targets),
+        )
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "WerewolfGame":
+        (chat_id, creator_id, phase, night_phase, day_number, min_players, wolf_target,
+         protected_player, last_protected, witch_heal_used, witch_kill_used,
+         witch_heal_target, witch_kill_target, night_deaths, night_messages, players,
+         pending, ready, wolf_votes, day_votes, *rest) = state
+
+        game = cls(
+            chat_id, creator_id, GamePhase(phase), NightPhase(night_phase), {}, day_number,
+            min_players, wolf_target, protected_player, last_protected, witch_heal_used,
+            witch_kill_used, witch_heal_target, witch_kill_target, list(night_deaths),
+            list(night_messages),
+        )
+        for p in players:
+            game.players[p[0]] = Player(p[0], p[1], p[2], _ROLE_BY_VALUE.get(p[3]), *p[4:])
+        game._rebuild_indexes()
+        game.pending_actions = {_ROLE_BY_VALUE[r] for r in pending}
+        game.ready_prompts = [_ROLE_BY_VALUE[r] for r in ready]
+        for voter, target in wolf_votes:
+            game.wolf_tally.cast(voter, target)
+        for voter, target in day_votes:
+            game.day_tally.cast(voter, target)
+        # Los snapshots anteriores al Flautista no lo llevan
+        game.enchant_targets = list(rest[0]) if rest else []
+        return game
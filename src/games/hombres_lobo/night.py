@@ -0,0 +1,241 @@
+"""Acciones nocturnas de cada rol.
+
+Cada rol que actua de noche es un plugin (subclase de NightRole registrada
+con @night_role) que declara cuando actua, a quien puede elegir, como se
+valida y anota su accion y, si la tiene, su paso en la resolucion de la
+noche. WerewolfGame solo despacha a los plugins: los pasos de resolucion
+se ordenan por ROLES_INFO[rol].priority al registrarlos (al importar).
+Cada paso trabaja con lo que quedo anotado durante la noche, asi que la
+accion de un rol cuenta aunque quien la hizo haya muerto o se haya ido
+antes del amanecer.
+"""
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+from .roles import Role, ROLES_INFO
+from .. import textos
+
+# Rol -> plugin
+NIGHT_ROLES: dict[Role, "NightRole"] = {}
+# Roles con accion nocturna por prioridad (menor = primero)
+NIGHT_ORDER: tuple[Role, ...] = ()
+# Rol -> rol al que tiene que esperar para que se le pida su accion
+NIGHT_PREREQUISITES: dict[Role, Role] = {}
+# (rol, paso) de la resolucion de la noche por prioridad
+RESOLUTION: tuple[tuple[Role, Callable], ...] = ()
+
+
+class NightRole(ABC):
+    """Accion nocturna de un rol.
+
+    act() recibe al jugador ya comprobado (vivo y con el rol), marca
+    player.night_action_done cuando ha terminado y llama a
+    game._complete_action(rol) cuando la accion del rol esta hecha.
+    resolve(game, deaths) anade o quita muertes de la noche.
+    """
+
+    role: Role
+    requires: Optional[Role] = None
+    resolve: Optional[Callable] = None
+
+    def acts_tonight(self, game) -> bool:
+        return True
+
+    def targets(self, game, player) -> list:
+        """Jugadores que puede elegir (los botones de su mensaje)."""
+        return game.get_alive_players()
+
+    @abstractmethod
+    def act(self, game, player, *args) -> tuple[bool, str]:
+        ...
+
+
+def night_role(cls):
+    """Registra el plugin y vuelve a ordenar la resolucion.
+
+    Instanciarlo falla ya aqui (TypeError) si el plugin no define act().
+    """
+    global NIGHT_ORDER, RESOLUTION
+    plugin = cls()
+    NIGHT_ROLES[plugin.role] = plugin
+    if plugin.requires is not None:
+        NIGHT_PREREQUISITES[plugin.role] = plugin.requires
+    NIGHT_ORDER = tuple(sorted(NIGHT_ROLES, key=lambda role: ROLES_INFO[role].priority))
+    RESOLUTION = tuple(
+        (role, NIGHT_ROLES[role].resolve) for role in NIGHT_ORDER if NIGHT_ROLES[role].resolve is not None
+    )
+    return cls
+
+
+@night_role
+class Cupido(NightRole):
+    role = Role.CUPIDO
+
+    def acts_tonight(self, game) -> bool:
+        return game.day_number == 1
+
+    def act(self, game, player, lover1_id: int, lover2_id: int) -> tuple[bool, str]:
+        if game.day_number != 1:
+            return False, textos.CUPIDO_SOLO_PRIMERA_NOCHE
+
+        players = game.players
+        if lover1_id not in players or lover2_id not in players:
+            return False, textos.JUGADORES_INVALIDOS
+
+        players[lover1_id].is_in_love = True
+        players[lover1_id].lover_id = lover2_id
+        players[lover2_id].is_in_love = True
+        players[lover2_id].lover_id = lover1_id
+        player.night_action_done = True
+        game._complete_action(self.role)
+        return True, textos.enamorados(players[lover1_id].name, players[lover2_id].name)
+
+
+@night_role
+class Protector(NightRole):
+    role = Role.PROTECTOR
+
+    def targets(self, game, player) -> list:
+        return [p for p in game.get_alive_players() if p.user_id != game.last_protected]
+
+    def act(self, game, player, target_id: int) -> tuple[bool, str]:
+        if target_id == game.last_protected:
+            return False, textos.PROTECTOR_NO_REPITE
+
+        target = game.players.get(target_id)
+        if not target or not target.is_alive:
+            return False, textos.JUGADOR_INVALIDO
+
+        game.protected_player = target_id
+        target.is_protected = True
+        player.night_action_done = True
+        game._complete_action(self.role)
+        return True, textos.proteges(target.name)
+
+
+@night_role
+class HombreLobo(NightRole):
+    role = Role.HOMBRE_LOBO
+
+    def targets(self, game, player) -> list:
+        return game.get_alive_non_wolves()
+
+    def act(self, game, player, target_id: int) -> tuple[bool, str]:
+        target = game.players.get(target_id)
+        if not target or not target.is_alive or target.role == Role.HOMBRE_LOBO:
+            return False, textos.OBJETIVO_INVALIDO
+
+        player.vote = target_id
+        player.night_action_done = True
+
+        # Contar votos de lobos: cuando han votado todos se elige la victima
+        game.wolf_tally.cast(player.user_id, target_id)
+        if game._check_wolf_votes():
+            return True, textos.lobos_eligen(game.players[game.wolf_target].name)
+
+        return True, textos.voto_lobo(len(game.wolf_tally), len(game._alive_wolves))
+
+    def resolve(self, game, deaths: list):
+        # La victima muere salvo que este protegida (la Bruja puede curarla despues)
+        # o que se haya ido de la partida
+        target = game.players.get(game.wolf_target)
+        if target and target.is_alive and not target.is_protected:
+            deaths.append(game.wolf_target)
+
+
+@night_role
+class Vidente(NightRole):
+    role = Role.VIDENTE
+
+    def targets(self, game, player) -> list:
+        return [p for p in game.get_alive_players() if p is not player]
+
+    def act(self, game, player, target_id: int) -> tuple[bool, str]:
+        target = game.players.get(target_id)
+        if not target or not target.is_alive:
+            return False, textos.JUGADOR_INVALIDO
+
+        player.night_action_done = True
+        game._complete_action(self.role)
+        return True, target.name + textos.VIDENTE_VE[target.role]
+
+
+@night_role
+class Bruja(NightRole):
+    role = Role.BRUJA
+    # Se le pide su accion cuando los lobos ya han elegido
+    requires = Role.HOMBRE_LOBO
+
+    def targets(self, game, player) -> list:
+        return [p for p in game.get_alive_players() if p is not player]
+
+    def act(self, game, player, heal: bool = False, kill_target: Optional[int] = None) -> tuple[bool, str]:
+        # Las pociones se gastan: un boton pulsado tras vencer el plazo no cuenta
+        if Role.BRUJA not in game.pending_actions:
+            return False, textos.FUERA_DE_TIEMPO
+        if Role.HOMBRE_LOBO in game.pending_actions:
+            return False, textos.BRUJA_ESPERA_LOBOS
+
+        messages = []
+
+        if heal and not game.witch_heal_used and game.wolf_target:
+            game.witch_heal_target = game.wolf_target
+            game.witch_heal_used = True
+            messages.append(textos.bruja_salva(game.players[game.wolf_target].name))
+
+        if kill_target and not game.witch_kill_used:
+            target = game.players.get(kill_target)
+            if target and target.is_alive:
+                game.witch_kill_target = kill_target
+                game.witch_kill_used = True
+                messages.append(textos.bruja_mata(target.name))
+
+        player.night_action_done = True
+        game._complete_action(self.role)
+
+        if not messages:
+            return True, textos.BRUJA_NADA
+        return True, "\n".join(messages)
+
+    def resolve(self, game, deaths: list):
+        if game.witch_heal_target in deaths:
+            deaths.remove(game.witch_heal_target)
+        target = game.players.get(game.witch_kill_target)
+        if target and target.is_alive and game.witch_kill_target not in deaths:
+            deaths.append(game.witch_kill_target)
+
+
+@night_role
+class Flautista(NightRole):
+    role = Role.FLAUTISTA
+    # Jugadores que hechiza cada noche
+    per_night = 2
+
+    def targets(self, game, player) -> list:
+        return [
+            p for p in game.get_alive_players()
+            if p is not player and not p.is_enchanted and p.user_id not in game.enchant_targets
+        ]
+
+    def acts_tonight(self, game) -> bool:
+        flautista = game.holder(Role.FLAUTISTA)
+        return flautista is not None and bool(self.targets(game, flautista))
+
+    def act(self, game, player, target_id: int) -> tuple[bool, str]:
+        if player.night_action_done:
+            return False, textos.FLAUTISTA_YA_HECHIZO
+        target = game.players.get(target_id)
+        if not target or target not in self.targets(game, player):
+            return False, textos.JUGADOR_INVALIDO
+
+        game.enchant_targets.append(target_id)
+        chosen = len(game.enchant_targets)
+        if chosen >= self.per_night or not self.targets(game, player):
+            player.night_action_done = True
+            game._complete_action(self.role)
+        return True, textos.hechizas(target.name, chosen, self.per_night)
+
+    def resolve(self, game, deaths: list):
+        # Se hechiza al amanecer; los que mueren esta noche dejan de contar al morir
+        for user_id in game.enchant_targets:
+            game._enchant(game.players[user_id])
@@ -1,8 +1,11 @@
 import random
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
+from typing import Callable, Optional
 from .words import PALABRAS
+from ..tally import VoteTally
+from ..acciones import accion
+from .. import textos
 
 
 class GameState(Enum):
@@ -12,7 +15,7 @@ class GameState(Enum):
     FINISHED = "finished"
 
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     user_id: int
     name: str
@@ -22,7 +25,7 @@ class Player:
     vote: Optional[int] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ImpostorGame:
     chat_id: int
     creator_id: int
@@ -31,125 +34,158 @@ class ImpostorGame:
     word: str = ""
     impostor_id: Optional[int] = None
     min_players: int = 3
+    tally: VoteTally = field(default_factory=VoteTally, init=False, repr=False)
+    # Callback que recibe cada accion (ver games.acciones)
+    observer: Optional[Callable] = field(default=None, init=False, repr=False, compare=False)
 
+    @accion
     def add_player(self, user_id: int, name: str, username: Optional[str] = None) -> tuple[bool, str]:
         if self.state != GameState.LOBBY:
-            return False, "El juego ya ha comenzado."
+            return False, textos.YA_COMENZADO
         if user_id in self.players:
-            return False, "Ya estas en la partida."
+            return False, textos.YA_EN_PARTIDA
 
         self.players[user_id] = Player(user_id=user_id, name=name, username=username)
-        return True, f"{name} se ha unido! ({len(self.players)} jugadores)"
+        return True, textos.unido(name, len(self.players))
 
+    @accion
     def remove_player(self, user_id: int) -> tuple[bool, str]:
         if user_id not in self.players:
-            return False, "No estas en la partida."
+            return False, textos.NO_EN_PARTIDA
 
         name = self.players[user_id].name
         del self.players[user_id]
+        self.tally.retract(user_id)
 
         if len(self.players) == 0:
             return True, "GAME_EMPTY"
 
-        return True, f"{name} ha salido. ({len(self.players)} jugadores)"
+        return True, textos.ha_salido(name, len(self.players))
 
-    def start_game(self, user_id: int) -> tuple[bool, str]:
+    def start_game(self, user_id: int, seed: Optional[int] = None) -> tuple[bool, str]:
+        # La semilla queda en el journal para poder repetir el sorteo
+        if seed is None:
+            seed = random.getrandbits(64)
+        return self._start_game(user_id, seed)
+
+    @accion(name="start_game")
+    def _start_game(self, user_id: int, seed: int) -> tuple[bool, str]:
         if user_id != self.creator_id:
-            return False, "Solo el creador puede iniciar la partida."
+            return False, textos.SOLO_CREADOR_INICIA
         if len(self.players) < self.min_players:
-            return False, f"Se necesitan al menos {self.min_players} jugadores."
+            return False, textos.minimo_jugadores(self.min_players)
 
         # Elegir palabra e impostor
-        self.word = random.choice(PALABRAS)
-        self.impostor_id = random.choice(list(self.players.keys()))
+        rng = random.Random(seed)
+        self.word = rng.choice(PALABRAS)
+        self.impostor_id = rng.choice(list(self.players.keys()))
         self.players[self.impostor_id].is_impostor = True
         self.state = GameState.PLAYING
 
-        return True, "El juego ha comenzado!"
+        return True, textos.IMP_COMENZADO
 
+    @accion
     def get_player_role(self, user_id: int) -> tuple[bool, str]:
         if user_id not in self.players:
-            return False, "No estas en esta partida."
+            return False, textos.NO_EN_ESTA_PARTIDA
         if self.state != GameState.PLAYING:
-            return False, "El juego no esta en curso."
+            return False, textos.IMP_NO_EN_CURSO
 
         player = self.players[user_id]
         player.has_seen_role = True
 
         if player.is_impostor:
-            return True, "Eres el IMPOSTOR! No conoces la palabra secreta. Intenta descubrirla sin que te descubran."
+            return True, textos.IMP_ERES_IMPOSTOR
         else:
-            return True, f"La palabra secreta es: {self.word}"
+            return True, textos.imp_palabra(self.word)
 
     def all_players_seen_role(self) -> bool:
         return all(p.has_seen_role for p in self.players.values())
 
+    @accion
     def start_voting(self) -> tuple[bool, str]:
         if self.state != GameState.PLAYING:
-            return False, "El juego no esta en curso."
+            return False, textos.IMP_NO_EN_CURSO
 
         self.state = GameState.VOTING
+        self.tally.clear()
         for player in self.players.values():
             player.vote = None
 
-        return True, "Votacion iniciada! Voten por quien creen que es el impostor."
+        return True, textos.IMP_VOTACION_INICIADA
 
+    @accion
     def vote(self, voter_id: int, target_id: int) -> tuple[bool, str]:
         if self.state != GameState.VOTING:
-            return False, "No es momento de votar."
+            return False, textos.NO_ES_MOMENTO_VOTAR
         if voter_id not in self.players:
-            return False, "No estas en la partida."
+            return False, textos.NO_EN_PARTIDA
         if target_id not in self.players:
-            return False, "Ese jugador no existe."
+            return False, textos.IMP_JUGADOR_NO_EXISTE
         if voter_id == target_id:
-            return False, "No puedes votar por ti mismo."
+            return False, textos.IMP_NO_VOTAR_A_TI
 
         self.players[voter_id].vote = target_id
-        votes_count = sum(1 for p in self.players.values() if p.vote is not None)
+        self.tally.cast(voter_id, target_id)
 
-        return True, f"Voto registrado! ({votes_count}/{len(self.players)})"
+        return True, textos.imp_voto(len(self.tally), len(self.players))
 
     def all_voted(self) -> bool:
-        return all(p.vote is not None for p in self.players.values())
+        return len(self.tally) == len(self.players)
 
     def get_results(self) -> tuple[str, bool]:
         """Devuelve (mensaje_resultado, ganaron_jugadores)"""
-        votes = {}
-        for player in self.players.values():
-            if player.vote:
-                votes[player.vote] = votes.get(player.vote, 0) + 1
-
-        if not votes:
-            return "Nadie voto!", False
-
-        max_votes = max(votes.values())
-        most_voted = [uid for uid, v in votes.items() if v == max_votes]
-
-        result = "RESULTADOS:\n\n"
-        for uid, player in self.players.items():
-            voted_for = self.players.get(player.vote)
-            voted_name = voted_for.name if voted_for else "Nadie"
-            result += f"{player.name} voto por: {voted_name}\n"
+        if not self.tally:
+            return textos.IMP_NADIE_VOTO, False
 
-        result += f"\nLa palabra era: {self.word}\n"
-        result += f"El impostor era: {self.players[self.impostor_id].name}\n\n"
-
-        if len(most_voted) == 1 and most_voted[0] == self.impostor_id:
-            result += "GANAN LOS JUGADORES! Encontraron al impostor!"
-            return result, True
-        else:
-            result += "GANA EL IMPOSTOR! No lo descubrieron!"
-            return result, False
+        players = self.players
+        players_won = self.tally.winner() == self.impostor_id
+        final = textos.IMP_GANAN_JUGADORES if players_won else textos.IMP_GANA_IMPOSTOR
+        return textos.imp_resultados(players, self.word, players[self.impostor_id].name, final), players_won
 
     def get_players_list(self) -> str:
         if not self.players:
-            return "No hay jugadores."
+            return textos.IMP_SIN_JUGADORES
 
-        lines = ["Jugadores:"]
+        lines = [textos.JUGADORES]
         for i, player in enumerate(self.players.values(), 1):
-            creator_mark = " (creador)" if player.user_id == self.creator_id else ""
-            lines.append(f"{i}. {player.name}{creator_mark}")
+            marcas = textos.MARCA_CREADOR if player.user_id == self.creator_id else ""
+            lines.append(f"{i}. {player.name}{marcas}")
+        return "\n".join(lines)
+
+    def get_tally_board(self) -> str:
+        """Recuento de la votacion en curso."""
+        tally = self.tally
+        players = self.players
+        lines = [textos.recuento(len(tally), len(players)), ""]
+        for target_id, count in tally.ranking():
+            # Los votos a un jugador que se fue siguen contando, pero ya no tiene nombre
+            if target_id in players:
+                lines.append(f"{players[target_id].name}: {count}")
+        if not tally:
+            lines.append(textos.RECUENTO_SIN_VOTOS)
         return "\n".join(lines)
 
     def get_voting_options(self) -> list[tuple[int, str]]:
         return [(p.user_id, p.name) for p in self.players.values()]
+
+    # Estado serializable (solo tipos basicos, para snapshots)
+    def to_state(self) -> tuple:
+        players = tuple(
+            (p.user_id, p.name, p.username, p.is_impostor, p.has_seen_role, p.vote)
+            for p in self.players.values()
+        )
+        return (
+            self.chat_id, self.creator_id, self.state.value, self.word, self.impostor_id,
+            self.min_players, players, tuple(self.tally.votes.items()),
+        )
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "ImpostorGame":
+        chat_id, creator_id, game_state, word, impostor_id, min_players, players, votes = state
+        game = cls(chat_id, creator_id, GameState(game_state), {}, word, impostor_id, min_players)
+        for p in players:
+            game.players[p[0]] = Player(*p)
+        for voter, target in votes:
+            game.tally.cast(voter, target)
+        return game
@@ -0,0 +1,298 @@
+"""Simulador de partidas sin Telegram.
+
+Juega partidas completas de Hombres Lobo (y de Impostor) llamando a los
+mismos metodos que usa el bot: cupido_action, wolf_vote, bruja_action,
+day_vote, hunter_shot... Los jugadores son agentes que eligen sus objetivos
+al azar o siguiendo un guion fijo.
+
+Mide partidas por segundo y el tiempo de cada metodo, y cuenta como acaba
+cada partida. Las acciones que el motor rechaza y las partidas que no
+terminan se cuentan como anomalias: si aparecen, alguna regla ha cambiado.
+
+Uso: python -m games.simulador [--partidas 100000] [--jugadores 6 14]
+                               [--agente aleatorio|guion] [--juego lobos|impostor]
+"""
+import argparse
+import random
+from abc import ABC, abstractmethod
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .hombres_lobo import WerewolfGame, Role
+from .hombres_lobo.game import GamePhase
+from .impostor import ImpostorGame
+from .tally import NO_LYNCH
+
+# Dias maximos antes de dar una partida por atascada
+MAX_DIAS = 100
+
+
+class Agente(ABC):
+    """Decide las acciones de los jugadores. Las subclases eligen como."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    @abstractmethod
+    def elegir(self, game, player, candidatos: list[int]) -> int:
+        """Objetivo de una accion nocturna o del disparo del Cazador."""
+        ...
+
+    @abstractmethod
+    def enamorados(self, game, player, candidatos: list[int]) -> tuple[int, int]:
+        ...
+
+    @abstractmethod
+    def pociones(self, game, player, candidatos: list[int]) -> tuple[bool, Optional[int]]:
+        """(curar, objetivo_a_matar) de la Bruja."""
+        ...
+
+    @abstractmethod
+    def voto(self, game, player, candidatos: list[int]) -> int:
+        """Voto de dia (puede ser NO_LYNCH)."""
+        ...
+
+
+class AgenteAleatorio(Agente):
+    def __init__(self, rng: random.Random, prob_pocion: float = 0.3, prob_no_linchar: float = 0.05):
+        super().__init__(rng)
+        self.prob_pocion = prob_pocion
+        self.prob_no_linchar = prob_no_linchar
+
+    def elegir(self, game, player, candidatos):
+        return self.rng.choice(candidatos)
+
+    def enamorados(self, game, player, candidatos):
+        a, b = self.rng.sample(candidatos, 2)
+        return a, b
+
+    def pociones(self, game, player, candidatos):
+        heal = self.rng.random() < self.prob_pocion
+        kill = None
+        if candidatos and self.rng.random() < self.prob_pocion:
+            kill = self.rng.choice(candidatos)
+        return heal, kill
+
+    def voto(self, game, player, candidatos):
+        if self.rng.random() < self.prob_no_linchar:
+            return NO_LYNCH
+        return self.rng.choice(candidatos)
+
+
+class AgenteGuion(Agente):
+    """Siempre elige el primer candidato: partidas reproducibles sin azar."""
+
+    def elegir(self, game, player, candidatos):
+        return candidatos[0]
+
+    def enamorados(self, game, player, candidatos):
+        return candidatos[0], candidatos[1]
+
+    def pociones(self, game, player, candidatos):
+        # Cura la primera noche y nunca mata
+        return game.day_number == 1, None
+
+    def voto(self, game, player, candidatos):
+        return candidatos[0]
+
+
+AGENTES = {"aleatorio": AgenteAleatorio, "guion": AgenteGuion}
+
+
+@dataclass
+class Resultados:
+    partidas: int = 0
+    segundos: float = 0.0
+    dias: int = 0
+    # metodo -> [llamadas, segundos]
+    tiempos: dict = field(default_factory=dict)
+    finales: Counter = field(default_factory=Counter)
+    anomalias: Counter = field(default_factory=Counter)
+
+    def partidas_por_segundo(self) -> float:
+        return self.partidas / self.segundos if self.segundos else 0.0
+
+    def informe(self) -> str:
+        resumen = f"{self.partidas} partidas en {self.segundos:.2f} s ({self.partidas_por_segundo():,.0f} partidas/s"
+        if self.dias:
+            resumen += f", {self.dias / max(self.partidas, 1):.2f} dias de media"
+        lines = [
+            resumen + ")",
+            "",
+            f"{'metodo':<20}{'llamadas':>12}{'total ms':>12}{'us/llamada':>12}",
+        ]
+        for name, (calls, total) in sorted(self.tiempos.items(), key=lambda kv: -kv[1][1]):
+            lines.append(f"{name:<20}{calls:>12,}{total * 1000:>12.1f}{total * 1e6 / calls:>12.2f}")
+        lines.append("")
+        lines.append("Finales:")
+        for final, count in self.finales.most_common():
+            lines.append(f"  {final:<12}{count:>10,}{100 * count / max(self.partidas, 1):>8.2f}%")
+        lines.append("Anomalias:" if self.anomalias else "Anomalias: ninguna")
+        for anomalia, count in self.anomalias.most_common():
+            lines.append(f"  {anomalia:<30}{count:>10,}")
+        return "\n".join(lines)
+
+
+class Simulador:
+    def __init__(self, agente: Agente, resultados: Optional[Resultados] = None):
+        self.agente = agente
+        self.rng = agente.rng
+        self.resultados = resultados or Resultados()
+
+    def _llamar(self, game, name: str, *args) -> tuple[bool, str]:
+        """Llama al metodo del motor midiendo su tiempo."""
+        start = time.perf_counter()
+        ok, msg = getattr(game, name)(*args)
+        elapsed = time.perf_counter() - start
+        stats = self.resultados.tiempos.get(name)
+        if stats is None:
+            stats = self.resultados.tiempos[name] = [0, 0.0]
+        stats[0] += 1
+        stats[1] += elapsed
+        if not ok:
+            self.resultados.anomalias[f"{name}: {msg}"] += 1
+        return ok, msg
+
+    # Hombres Lobo
+    def partida_lobos(self, jugadores: int, chat_id: int = -1) -> str:
+        """Juega una partida completa y devuelve quien gano."""
+        game = WerewolfGame(chat_id=chat_id, creator_id=1)
+        for user_id in range(1, jugadores + 1):
+            self._llamar(game, "add_player", user_id, f"Jugador {user_id}")
+        self._llamar(game, "start_game", 1, self.rng.getrandbits(64))
+
+        while game.phase != GamePhase.FINISHED:
+            if game.day_number > MAX_DIAS:
+                self.resultados.anomalias["partida atascada"] += 1
+                return "atascada"
+            if game.phase == GamePhase.NIGHT:
+                self._noche(game)
+            else:
+                self._dia(game)
+
+        self.resultados.dias += game.day_number
+        if not game.get_wolves():
+            return "aldeanos"
+        if len(game.get_wolves()) >= len(game.get_alive_non_wolves()):
+            return "lobos"
+        return "flautista"
+
+    def _noche(self, game: WerewolfGame):
+        agente = self.agente
+        alive = game.get_alive_players()
+        others = lambda p: [q.user_id for q in alive if q is not p]
+
+        for player in alive:
+            role = player.role
+            if role not in game.pending_actions or role == Role.BRUJA:
+                continue
+            if role == Role.CUPIDO:
+                a, b = agente.enamorados(game, player, [p.user_id for p in alive])
+                self._llamar(game, "cupido_action", player.user_id, a, b)
+            elif role == Role.PROTECTOR:
+                candidatos = [p.user_id for p in alive if p.user_id != game.last_protected]
+                self._llamar(game, "protector_action", player.user_id,
+                             agente.elegir(game, player, candidatos))
+            elif role == Role.HOMBRE_LOBO:
+                candidatos = [p.user_id for p in game.get_alive_non_wolves()]
+                self._llamar(game, "wolf_vote", player.user_id,
+                             agente.elegir(game, player, candidatos))
+            elif role == Role.VIDENTE:
+                self._llamar(game, "vidente_action", player.user_id,
+                             agente.elegir(game, player, others(player)))
+            elif role == Role.FLAUTISTA:
+                while Role.FLAUTISTA in game.pending_actions:
+                    candidatos = [p.user_id for p in game.night_targets(player)]
+                    self._llamar(game, "flautista_action", player.user_id,
+                                 agente.elegir(game, player, candidatos))
+
+        # La Bruja actua cuando los lobos ya han elegido
+        if Role.BRUJA in game.pending_actions:
+            for player in game.holders(Role.BRUJA):
+                heal, kill = agente.pociones(game, player, others(player))
+                self._llamar(game, "bruja_action", player.user_id, heal, kill)
+        game.pop_ready_prompts()
+
+        if not game.night_complete():
+            self.resultados.anomalias["noche sin completar"] += 1
+        self._llamar(game, "resolve_night")
+
+    def _dia(self, game: WerewolfGame):
+        agente = self.agente
+        self._llamar(game, "start_voting")
+        alive = game.get_alive_players()
+        for player in alive:
+            candidatos = [p.user_id for p in alive if p is not player]
+            self._llamar(game, "day_vote", player.user_id, agente.voto(game, player, candidatos))
+
+        if game.phase == GamePhase.DAY_VOTING:
+            self.resultados.anomalias["votacion sin resolver"] += 1
+            game.phase = GamePhase.FINISHED
+            return
+
+        # Cazador linchado: dispara antes de la noche
+        if game.phase == GamePhase.HUNTER:
+            hunter = game.get_hunter()
+            candidatos = [p.user_id for p in game.get_alive_players()]
+            self._llamar(game, "hunter_shot", hunter.user_id, agente.elegir(game, hunter, candidatos))
+
+    # Impostor
+    def partida_impostor(self, jugadores: int, chat_id: int = -1) -> str:
+        game = ImpostorGame(chat_id=chat_id, creator_id=1)
+        for user_id in range(1, jugadores + 1):
+            self._llamar(game, "add_player", user_id, f"Jugador {user_id}")
+        self._llamar(game, "start_game", 1, self.rng.getrandbits(64))
+        for user_id in game.players:
+            self._llamar(game, "get_player_role", user_id)
+        self._llamar(game, "start_voting")
+        for player in list(game.players.values()):
+            candidatos = [u for u in game.players if u != player.user_id]
+            # En el Impostor no hay voto en blanco (NO_LYNCH): siempre se vota a alguien
+            self._llamar(game, "vote", player.user_id, self.agente.elegir(game, player, candidatos))
+        if not game.all_voted():
+            self.resultados.anomalias["votacion sin resolver"] += 1
+        _, ganaron = game.get_results()
+        return "jugadores" if ganaron else "impostor"
+
+
+def simular(partidas: int, jugadores: tuple[int, int] = (6, 14), agente: str = "aleatorio",
+            juego: str = "lobos", seed: Optional[int] = None) -> Resultados:
+    rng = random.Random(seed)
+    simulador = Simulador(AGENTES[agente](rng))
+    resultados = simulador.resultados
+    jugar = simulador.partida_lobos if juego == "lobos" else simulador.partida_impostor
+    lo, hi = jugadores
+
+    start = time.perf_counter()
+    for i in range(partidas):
+        n = rng.randint(lo, hi)
+        try:
+            final = jugar(n, chat_id=-i - 1)
+        except Exception as e:
+            resultados.anomalias[f"{type(e).__name__}: {e}"] += 1
+            final = "error"
+        resultados.finales[final] += 1
+    resultados.segundos = time.perf_counter() - start
+    resultados.partidas = partidas
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--partidas", type=int, default=10000)
+    parser.add_argument("--jugadores", type=int, nargs=2, default=[6, 14], metavar=("MIN", "MAX"))
+    parser.add_argument("--agente", choices=sorted(AGENTES), default="aleatorio")
+    parser.add_argument("--juego", choices=["lobos", "impostor"], default="lobos")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    resultados = simular(args.partidas, tuple(args.jugadores), args.agente, args.juego, args.seed)
+    print(resultados.informe())
+    if resultados.anomalias:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+from typing import Optional
+
+
+# Voto especial para "no linchar a nadie"
+NO_LYNCH = -1
+
+
+class VoteTally:
+    """Recuento incremental de votos.
+
+    Cada voto cuesta O(1): si el votante ya habia votado se retira su voto
+    anterior, y se mantiene un indice cuenta -> objetivos para saber en todo
+    momento el maximo y si hay empate sin recorrer a todos los jugadores.
+    """
+
+    __slots__ = ("votes", "counts", "max_count", "_by_count")
+
+    def __init__(self):
+        self.votes: dict[int, int] = {}
+        self.counts: dict[int, int] = {}
+        self.max_count = 0
+        self._by_count: dict[int, dict[int, None]] = {}
+
+    def __len__(self) -> int:
+        """Numero de votantes."""
+        return len(self.votes)
+
+    def _move(self, target: int, old: int, new: int):
+        if old:
+            bucket = self._by_count[old]
+            del bucket[target]
+            if not bucket:
+                del self._by_count[old]
+        if new:
+            self.counts[target] = new
+            self._by_count.setdefault(new, {})[target] = None
+        else:
+            del self.counts[target]
+
+    def cast(self, voter: int, target: int):
+        """Registra el voto, sustituyendo el anterior del mismo votante."""
+        previous = self.votes.get(voter)
+        if previous == target:
+            return
+        if previous is not None:
+            self.retract(voter)
+
+        self.votes[voter] = target
+        count = self.counts.get(target, 0) + 1
+        self._move(target, count - 1, count)
+        if count > self.max_count:
+            self.max_count = count
+
+    def retract(self, voter: int) -> Optional[int]:
+        """Retira el voto del votante y devuelve a quien habia votado."""
+        target = self.votes.pop(voter, None)
+        if target is None:
+            return None
+
+        count = self.counts[target]
+        self._move(target, count, count - 1)
+        if count == self.max_count and count not in self._by_count:
+            self.max_count = count - 1
+        return target
+
+    def retract_target(self, target: int) -> list[int]:
+        """Retira los votos al objetivo y devuelve quien le habia votado."""
+        if target not in self.counts:
+            return []
+        voters = [voter for voter, voted in self.votes.items() if voted == target]
+        for voter in voters:
+            self.retract(voter)
+        return voters
+
+    def clear(self):
+        self.votes.clear()
+        self.counts.clear()
+        self._by_count.clear()
+        self.max_count = 0
+
+    def count(self, target: int) -> int:
+        return self.counts.get(target, 0)
+
+    def leaders(self) -> list[int]:
+        """Objetivos con mas votos, en el orden en que llegaron a ese maximo."""
+        if not self.max_count:
+            return []
+        return list(self._by_count[self.max_count])
+
+    def ranking(self) -> list[tuple[int, int]]:
+        """(objetivo, votos) de mas a menos votado."""
+        return [
+            (target, count)
+            for count in sorted(self._by_count, reverse=True)
+            for target in self._by_count[count]
+        ]
+
+    def is_tie(self) -> bool:
+        return self.max_count > 0 and len(self._by_count[self.max_count]) > 1
+
+    def winner(self) -> Optional[int]:
+        """Objetivo mas votado, o None si no hay votos o hay empate."""
+        if not self.max_count or self.is_tie():
+            return None
+        return next(iter(self._by_count[self.max_count]))
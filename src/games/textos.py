@@ -0,0 +1,424 @@
+"""Catalogo de los textos que ven los jugadores.
+
+Los textos fijos son constantes; los de cada rol salen de ROLES_INFO
+renderizados al importar el modulo en diccionarios por rol. Los mensajes con
+datos (nombres, recuentos, dias) son funciones pequenas que reciben los datos
+y devuelven el texto con un f-string, asi que todo el texto en castellano esta
+aqui y donde se envia solo se llama a la funcion. Un f-string es varias veces
+mas rapido que str.format y muchos de esos mensajes se generan por cada jugador.
+"""
+from typing import Optional
+
+from .hombres_lobo.roles import Role, ROLES_INFO
+
+# ==================== COMUNES ====================
+
+YA_COMENZADO = "El juego ya ha comenzado."
+YA_EN_PARTIDA = "Ya estas en la partida."
+NO_EN_PARTIDA = "No estas en la partida."
+NO_EN_ESTA_PARTIDA = "No estas en esta partida."
+SOLO_CREADOR_INICIA = "Solo el creador puede iniciar la partida."
+NO_ES_MOMENTO_VOTAR = "No es momento de votar."
+
+JUGADORES = "Jugadores:"
+MARCA_CREADOR = " (creador)"
+MARCA_MUERTO = " (muerto)"
+
+
+def unido(nombre: str, jugadores: int) -> str:
+    return f"{nombre} se ha unido! ({jugadores} jugadores)"
+
+
+def ha_salido(nombre: str, jugadores: int) -> str:
+    return f"{nombre} ha salido. ({jugadores} jugadores)"
+
+
+def minimo_jugadores(minimo: int) -> str:
+    return f"Se necesitan al menos {minimo} jugadores."
+
+
+def recuento(votos: int, votantes: int) -> str:
+    """Cabecera del recuento de una votacion."""
+    return f"Recuento ({votos}/{votantes} han votado)"
+
+# ==================== EL IMPOSTOR (motor) ====================
+
+IMP_COMENZADO = "El juego ha comenzado!"
+IMP_NO_EN_CURSO = "El juego no esta en curso."
+IMP_ERES_IMPOSTOR = "Eres el IMPOSTOR! No conoces la palabra secreta. Intenta descubrirla sin que te descubran."
+IMP_VOTACION_INICIADA = "Votacion iniciada! Voten por quien creen que es el impostor."
+IMP_JUGADOR_NO_EXISTE = "Ese jugador no existe."
+IMP_NO_VOTAR_A_TI = "No puedes votar por ti mismo."
+IMP_NADIE_VOTO = "Nadie voto!"
+IMP_SIN_JUGADORES = "No hay jugadores."
+IMP_NADIE = "Nadie"
+IMP_GANAN_JUGADORES = "GANAN LOS JUGADORES! Encontraron al impostor!"
+IMP_GANA_IMPOSTOR = "GANA EL IMPOSTOR! No lo descubrieron!"
+
+
+def imp_palabra(palabra: str) -> str:
+    return f"La palabra secreta es: {palabra}"
+
+
+def imp_voto(votos: int, jugadores: int) -> str:
+    return f"Voto registrado! ({votos}/{jugadores})"
+
+
+def imp_resultados(players: dict, palabra: str, impostor: str, final: str) -> str:
+    """`players` son los jugadores de la partida (user_id -> jugador), con su voto."""
+    votos = "".join([
+        f"{p.name} voto por: {players[p.vote].name if p.vote in players else IMP_NADIE}\n"
+        for p in players.values()
+    ])
+    return f"RESULTADOS:\n\n{votos}\nLa palabra era: {palabra}\nEl impostor era: {impostor}\n\n{final}"
+
+# ==================== HOMBRES LOBO (motor) ====================
+
+NOCHE_DUERME = "La aldea duerme... Los roles con acciones nocturnas seran contactados."
+
+# "No eres ..." de cada rol con accion
+NO_ERES = {
+    Role.CUPIDO: "No eres Cupido.",
+    Role.PROTECTOR: "No eres el Protector.",
+    Role.HOMBRE_LOBO: "No eres un Hombre Lobo.",
+    Role.VIDENTE: "No eres la Vidente.",
+    Role.BRUJA: "No eres la Bruja.",
+    Role.CAZADOR: "No eres el Cazador.",
+    Role.FLAUTISTA: "No eres el Flautista.",
+}
+MUERTO_NO_ACTUA = "Los muertos no actuan."
+JUGADOR_INVALIDO = "Jugador invalido."
+JUGADORES_INVALIDOS = "Jugadores invalidos."
+OBJETIVO_INVALIDO = "Objetivo invalido."
+
+CUPIDO_SOLO_PRIMERA_NOCHE = "Cupido solo actua la primera noche."
+PROTECTOR_NO_REPITE = "No puedes proteger al mismo jugador dos noches seguidas."
+BRUJA_ESPERA_LOBOS = "Espera a que los lobos elijan a su victima."
+BRUJA_NADA = "No usas ninguna pocion esta noche."
+FLAUTISTA_YA_HECHIZO = "Ya has hechizado esta noche."
+NO_ES_DE_NOCHE = "No es de noche."
+FUERA_DE_TIEMPO = "Se acabo el tiempo para actuar."
+NOCHE_SIN_TIEMPO = "Se acabo el tiempo de la noche."
+
+AMANECER_SIN_MUERTES = " Nadie ha muerto esta noche."
+A_DEBATIR = "Es hora de debatir. Usen /votar cuando esten listos."
+
+NO_PUEDES_VOTAR = "No puedes votar."
+
+NADIE_LINCHADO = "Nadie fue linchado."
+PUEBLO_NO_LINCHA = "El pueblo decide no linchar a nadie."
+EMPATE = "Empate en la votacion. Nadie fue linchado."
+# Muerte + como sigue la partida (ganador, disparo del Cazador o noche)
+CAZADOR_PUEDE_DISPARAR = "El Cazador puede elegir a quien llevarse con el! Le he enviado las opciones por privado."
+CAZADOR_SOLO_AL_MORIR = "El Cazador solo dispara al morir."
+
+GANAN_ALDEANOS = "GANAN LOS ALDEANOS! Todos los lobos han sido eliminados."
+GANAN_LOBOS = "GANAN LOS HOMBRES LOBO! Han igualado o superado a los aldeanos."
+
+
+RECUENTO_SIN_VOTOS = "Aun no ha votado nadie."
+RECUENTO_NO_LINCHAR = "No linchar"
+
+
+def ha_salido_y_gana(nombre: str, ganador: str) -> str:
+    return f"{nombre} ha salido.\n\n{ganador}"
+
+
+def noche(dia: int) -> str:
+    return f"NOCHE {dia}\n\n{NOCHE_DUERME}"
+
+
+def sin_linchamiento(motivo: str, dia: int) -> str:
+    """Nadie muere en la votacion y empieza la noche `dia`."""
+    return f"{motivo}\n\n{noche(dia)}"
+
+
+def amanecer(dia: int, muertos: list[str], cierre: str) -> str:
+    """Resultado de la noche; `cierre` es el ganador o la llamada al debate."""
+    muertes = f"\n\nHan muerto: {', '.join(muertos)}" if muertos else AMANECER_SIN_MUERTES
+    return f"DIA {dia}\n\nAmanece en la aldea.{muertes}\n\n{cierre}"
+
+
+def votacion(vivos: int) -> str:
+    return f"VOTACION\n\nVoten por quien quieren linchar. ({vivos} jugadores vivos)"
+
+
+def voto_no_linchar(votos: int, vivos: int) -> str:
+    return f"Votaste por no linchar. ({votos}/{vivos})"
+
+
+def voto_dia(votos: int, vivos: int) -> str:
+    return f"Voto registrado. ({votos}/{vivos})"
+
+
+def linchado(nombre: str, role: Role) -> str:
+    return f"El pueblo ha decidido linchar a {nombre}.\n{ERA[role]}"
+
+
+def muere_de_amor(nombre: str, role: Role) -> str:
+    """Lo que se anade a una muerte cuando muere tambien su enamorado."""
+    return f"\n{nombre} muere de amor. {ERA[role]}"
+
+
+def cazador_dispara(nombre: str, role: Role) -> str:
+    return f"El Cazador dispara a {nombre}!\n{ERA[role]}"
+
+
+def cazador_no_dispara(siguiente: str) -> str:
+    return f"El Cazador no dispara.\n{siguiente}"
+
+
+def gana_flautista(nombre: str) -> str:
+    return f"GANA EL FLAUTISTA ({nombre})! Todos estan hechizados."
+
+
+def vivos(jugadores: int) -> str:
+    """Cabecera de la lista de jugadores vivos."""
+    return f"Jugadores vivos ({jugadores}):"
+
+
+def enamorados(nombre1: str, nombre2: str) -> str:
+    return f"Has enamorado a {nombre1} y {nombre2}!"
+
+
+def proteges(nombre: str) -> str:
+    return f"Proteges a {nombre} esta noche."
+
+
+def lobos_eligen(nombre: str) -> str:
+    return f"Los lobos han elegido a {nombre}."
+
+
+def voto_lobo(votos: int, lobos: int) -> str:
+    return f"Voto registrado. ({votos}/{lobos} lobos han votado)"
+
+
+def bruja_salva(nombre: str) -> str:
+    return f"Usas la pocion de vida para salvar a {nombre}."
+
+
+def bruja_mata(nombre: str) -> str:
+    return f"Usas la pocion de muerte en {nombre}."
+
+
+def hechizas(nombre: str, elegidos: int, por_noche: int) -> str:
+    return f"Hechizas a {nombre}. ({elegidos}/{por_noche})"
+
+
+def _por_rol(plantilla: str, lobo: Optional[str] = None) -> dict:
+    """Renderiza `plantilla` con los datos de cada rol."""
+    textos = {}
+    for role, info in ROLES_INFO.items():
+        texto = lobo if lobo is not None and role == Role.HOMBRE_LOBO else plantilla
+        textos[role] = texto.replace("{emoji}", info.emoji).replace("{rol}", info.name).replace(
+            "{descripcion}", info.description
+        )
+    return textos
+
+
+# Textos fijos de cada rol
+ERES = _por_rol("{emoji} Eres: {rol}\n\n{descripcion}")
+ROL_PRIVADO = _por_rol("🐺 *Hombres Lobo - Tu rol:*\n\n{emoji} *{rol}*\n\n{descripcion}")
+ROL_FICHA = _por_rol("{emoji} *{rol}*\n\n{descripcion}")
+# Lo que sigue al nombre del jugador investigado o muerto
+VIDENTE_VE = _por_rol(" es {emoji} {rol}.", lobo=" es un {emoji} HOMBRE LOBO!")
+ERA = _por_rol("Era: {emoji} {rol}\n")
+
+# ==================== BOT ====================
+
+# Generales
+MENU = (
+    "🎮 *Bot MultiGame*\n\n"
+    "Bienvenido! Elige un juego:\n\n"
+    "🎭 *El Impostor* - 3+ jugadores\n"
+    "🐺 *Hombres Lobo* - 6+ jugadores"
+)
+BOTON_MENU_IMPOSTOR = "🎭 El Impostor"
+BOTON_MENU_LOBOS = "🐺 Hombres Lobo"
+MENU_IMPOSTOR = (
+    "🎭 *El Impostor*\n\n"
+    "Un jugador es el impostor y no conoce la palabra secreta.\n"
+    "Los demas deben descubrirlo!\n\n"
+    "Usa /impostor para crear una partida."
+)
+MENU_LOBOS = (
+    "🐺 *Hombres Lobo de Castronegro*\n\n"
+    "Aldeanos vs Hombres Lobo.\n"
+    "De noche los lobos cazan, de dia el pueblo vota.\n\n"
+    "Usa /lobos para crear una partida."
+)
+AYUDA_IMPOSTOR = (
+    "📖 *El Impostor - Comandos*\n\n"
+    "/unirse - Unirse a la partida\n"
+    "/salir - Salir de la partida\n"
+    "/iniciar - Iniciar el juego\n"
+    "/votar - Iniciar votacion\n"
+    "/cancelar - Cancelar la partida"
+)
+AYUDA_LOBOS = (
+    "📖 *Hombres Lobo - Comandos*\n\n"
+    "/unirse - Unirse a la partida\n"
+    "/salir - Salir de la partida\n"
+    "/iniciar - Iniciar el juego\n"
+    "/votar - Iniciar votacion\n"
+    "/vivos - Ver jugadores vivos\n"
+    "/rol - Ver tu rol\n"
+    "/cancelar - Cancelar la partida"
+)
+AYUDA = (
+    "📖 *Comandos disponibles*\n\n"
+    "/start - Menu principal\n"
+    "/ayuda - Ver comandos\n"
+    "/impostor - Crear partida El Impostor\n"
+    "/lobos - Crear partida Hombres Lobo"
+)
+BOTON_CADUCADO = "Este boton ya no es valido."
+
+# Partidas
+SIN_PARTIDA = "No hay partida activa."
+SIN_PARTIDA_IMPOSTOR = "No hay partida activa. Usa /impostor para crear una."
+SIN_PARTIDA_CREAR = "No hay partida activa. Usa /impostor o /lobos para crear una."
+SIN_PARTIDA_LOBOS = "No hay partida activa de Hombres Lobo."
+PARTIDA_NO_ENCONTRADA = "Partida no encontrada."
+YA_HAY_IMPOSTOR = "Ya hay una partida de El Impostor en este chat."
+YA_HAY_LOBOS = "Ya hay una partida de Hombres Lobo en este chat."
+PARTIDA_VACIA = "Partida cancelada (no quedan jugadores)."
+SOLO_CREADOR_CANCELA = "Solo el creador de la partida puede cancelarla."
+NOMBRE_IMPOSTOR = "El Impostor"
+NOMBRE_LOBOS = "Hombres Lobo"
+IMP_TITULO = "🎭 *El Impostor*"
+LOBOS_TITULO = "🐺 *Hombres Lobo de Castronegro*"
+COMO_UNIRSE = "Usen /unirse para entrar.\nEl creador usa /iniciar cuando esten listos."
+
+
+def partida_creada(titulo: str, creador: str, minimo: int) -> str:
+    return f"{titulo}\n\nPartida creada por {creador}!\n\n{COMO_UNIRSE}\n\nJugadores: 1/{minimo}+"
+
+
+def partida_cancelada(juego: str) -> str:
+    return f"❌ Partida de {juego} cancelada."
+
+
+def cancelada_inactiva(juego: str) -> str:
+    return f"⌛ Partida de {juego} cancelada por inactividad."
+
+
+def cancelada_por_tope(juego: str) -> str:
+    return f"⌛ Partida de {juego} cancelada: hay demasiadas partidas activas."
+
+# El Impostor
+IMP_EMPEZADO = (
+    "🎭 *El juego ha comenzado!*\n\n"
+    "Cada jugador debe hacer click en su nombre para ver su rol.\n\n"
+    "Recuerda: El impostor NO conoce la palabra secreta."
+)
+# Los botones con el nombre de un jugador llevan delante su *_BOTON
+IMP_BOTON_ROL = "👤 "
+IMP_BOTON_NO_ES_TUYO = "Este boton no es para ti!"
+IMP_TODOS_VIERON_ROL = (
+    "Todos han visto su rol!\n\n"
+    "Ahora discutan sobre la palabra. Pueden dar pistas o hacer preguntas.\n\n"
+    "Cuando esten listos para votar, usen /votar"
+)
+IMP_VOTACION = "🗳️ *VOTACION*\n\nVoten por quien creen que es el impostor!"
+BOTON_VOTO = "🗳️ "
+
+# Hombres Lobo: inicio y roles
+ROLES_SIN_PRIVADO = "(Deben iniciar chat conmigo primero)"
+ROL_POR_PRIVADO = "Te envie tu rol por privado."
+ROL_SIN_PRIVADO = "No pude enviarte el mensaje. Inicia una conversacion conmigo primero."
+
+
+def lobos_empezado(enviados: list[str], fallidos: list[str]) -> str:
+    """Aviso al grupo de a quien se le pudo mandar el rol por privado."""
+    msg = f"Roles enviados a: {', '.join(enviados)}" if enviados else ""
+    if fallidos:
+        msg += f"\n⚠️ No pude enviar a: {', '.join(fallidos)}\n{ROLES_SIN_PRIVADO}"
+    return f"🐺 *El juego ha comenzado!*\n\n{msg}"
+
+# Hombres Lobo: noche
+CUPIDO_PIDE = "💘 *CUPIDO*\n\nElige a 2 jugadores para enamorarlos.\n(Haz click en 2 nombres)"
+CUPIDO_BOTON = "💕 "
+CUPIDO_CONFIRMAR = "✅ Confirmar enamorados"
+CUPIDO_ELIGE_DOS = "Debes seleccionar exactamente 2 jugadores!"
+CUPIDO_TE_ELIGE = "💕 *Cupido te ha elegido!*"
+CUPIDO_AVISO = "Si uno muere, el otro tambien morira de amor."
+CUPIDO_HECHO = "💘 Has enamorado a los jugadores seleccionados!"
+CUPIDO_DESELECCIONADO = "Deseleccionado"
+CUPIDO_YA_DOS = "Ya seleccionaste 2 jugadores!"
+PROTECTOR_PIDE = "🛡️ *PROTECTOR*\n\n¿A quien proteges esta noche?"
+PROTECTOR_BOTON = "🛡️ "
+LOBO_BOTON = "🩸 "
+VIDENTE_PIDE = "🔮 *VIDENTE*\n\n¿A quien quieres investigar?"
+VIDENTE_BOTON = "🔮 "
+BRUJA_SIN_POCIONES = "\nNo te quedan pociones."
+POCION_VIDA = "💚 Vida"
+POCION_MUERTE = "💀 Muerte"
+BRUJA_BOTON_MATAR = "💀 Usar pocion de muerte"
+BRUJA_BOTON_NADA = "⏭️ No hacer nada"
+BRUJA_A_QUIEN = "🧙‍♀️ ¿A quien quieres matar con tu pocion?"
+BRUJA_BOTON_OBJETIVO = "💀 "
+BRUJA_BOTON_CANCELAR = "❌ Cancelar"
+FLAUTISTA_BOTON = "🪈 "
+
+
+def noche_grupo(dia: int) -> str:
+    return f"🌙 *NOCHE {dia}*\n\nLa aldea duerme... Los roles especiales estan actuando."
+
+
+def enamorado_de(nombre: str) -> str:
+    return f"{CUPIDO_TE_ELIGE}\n\nEstas enamorado/a de {nombre}.\n{CUPIDO_AVISO}"
+
+
+def cupido_seleccionado(elegidos: int) -> str:
+    return f"Seleccionado ({elegidos}/2)"
+
+
+def protector_hecho(nombre: str) -> str:
+    return f"🛡️ {proteges(nombre)}"
+
+
+def lobo_pide(otros: list[str]) -> str:
+    otros_lobos = f"\nOtros lobos: {', '.join(otros)}" if otros else ""
+    return f"🐺 *HOMBRE LOBO*{otros_lobos}\n\n¿A quien devoran esta noche?"
+
+
+def lobo_hecho(nombre: str, msg: str) -> str:
+    return f"🐺 Has votado por {nombre}.\n\n{msg}"
+
+
+def vidente_hecho(msg: str) -> str:
+    return f"🔮 Resultado de tu investigacion:\n\n{msg}"
+
+
+def bruja_boton_salvar(nombre: str) -> str:
+    return f"💚 Salvar a {nombre}"
+
+
+def bruja_pide(victima: Optional[str], pociones: list[str]) -> str:
+    """`victima` es a quien atacaron los lobos (None si nadie)."""
+    victima_msg = f"\n\nLos lobos atacaron a: {victima}" if victima else ""
+    pociones_msg = f"\nPociones disponibles: {', '.join(pociones)}" if pociones else BRUJA_SIN_POCIONES
+    return f"🧙‍♀️ *BRUJA*{victima_msg}{pociones_msg}\n\n¿Que quieres hacer?"
+
+
+def flautista_pide(por_noche: int) -> str:
+    return f"🪈 *FLAUTISTA*\n\nElige a quien hechizas esta noche (hasta {por_noche})."
+
+# Hombres Lobo: dia
+BOTON_NO_LINCHAR = "⏭️ No linchar a nadie"
+VOTO_REGISTRADO = "Voto registrado!"
+CAZADOR_PIDE = "🏹 *CAZADOR*\n\nHas muerto. ¿A quien te llevas contigo?"
+CAZADOR_BOTON = "🏹 "
+
+
+def votacion_pueblo(vivos: str) -> str:
+    """`vivos` es la lista de jugadores vivos ya montada."""
+    return f"🗳️ *VOTACION DEL PUEBLO*\n\n{vivos}\n\nVoten por quien quieren linchar!"
+
+
+def cazador_hecho(nombre: str) -> str:
+    return f"🏹 Has disparado a {nombre}."
+
+# Hombres Lobo: plazos (se aplica la accion por defecto al vencer)
+DEBATE_SIN_TIEMPO = "Se acabo el tiempo de debate."
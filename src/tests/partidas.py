@@ -0,0 +1,46 @@
+"""Partidas de ejemplo para los tests."""
+import random
+
+from core.registry import GameRegistry
+from games.hombres_lobo import WerewolfGame
+from games.hombres_lobo.game import GamePhase
+from games.simulador import AgenteAleatorio, Simulador
+
+CHAT = -100
+
+
+def estado_partida(game) -> list:
+    """Estado comparable de una partida (to_state sin depender del orden de los conjuntos)."""
+    state = list(game.to_state())
+    if isinstance(game, WerewolfGame):
+        # Las acciones pendientes son un conjunto: su orden no importa
+        state[16] = sorted(state[16])
+    return state
+
+
+def estado(registry: GameRegistry) -> dict:
+    """Estado comparable de las partidas del registro."""
+    return {chat_id: estado_partida(game) for chat_id, game in registry.games()}
+
+
+def partida(registry: GameRegistry, jugadores: int = 12, seed: int = 1, chat_id: int = CHAT) -> WerewolfGame:
+    """Partida de Hombres Lobo registrada y empezada (la primera noche)."""
+    game = WerewolfGame(chat_id=chat_id, creator_id=1)
+    registry.create(chat_id, game)
+    for user_id in range(1, jugadores + 1):
+        game.add_player(user_id, f"Jugador {user_id}")
+    registry.map_users(chat_id, game.players)
+    game.start_game(1, seed)
+    return game
+
+
+def jugar(game: WerewolfGame, fases: int, seed: int = 1):
+    """Juega `fases` noches o dias con agentes aleatorios."""
+    simulador = Simulador(AgenteAleatorio(random.Random(seed)))
+    for _ in range(fases):
+        if game.phase == GamePhase.FINISHED:
+            return
+        if game.phase == GamePhase.NIGHT:
+            simulador._noche(game)
+        else:
+            simulador._dia(game)
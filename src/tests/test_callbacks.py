@@ -0,0 +1,120 @@
+import asyncio
+import binascii
+from types import SimpleNamespace
+
+import pytest
+
+from core import callbacks
+from core.callbacks import Accion, CallbackDataError, CallbackRouter, decode, encode
+
+SUPERGRUPO = -1001234567890
+
+
+@pytest.mark.parametrize("ids", [
+    (),
+    (0,),
+    (SUPERGRUPO,),
+    (SUPERGRUPO, 123456789),
+    (SUPERGRUPO, -1),
+    (-1, 1, 127, 128, -128, -129, 2**31, -(2**40)),
+])
+def test_round_trip(ids):
+    for accion in Accion:
+        assert decode(encode(accion, *ids)) == (accion, ids)
+
+
+def test_encode_is_short_and_url_safe():
+    text = encode(Accion.VOTO_DIA, SUPERGRUPO, 2**32 - 1)
+    assert len(text) <= callbacks.MAX_LEN
+    assert set(text) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+
+def test_encode_too_long():
+    with pytest.raises(CallbackDataError):
+        encode(Accion.VOTO_DIA, *([SUPERGRUPO] * 10))
+
+
+def _b64(data: bytes) -> str:
+    return binascii.b2a_base64(data, newline=False).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "no es base64!",
+    "ñ",
+    # Botones de la version anterior ("accion:id")
+    "imp_vote:123",
+    _b64(bytes([callbacks.VERSION])),
+    _b64(bytes([callbacks.VERSION + 1, Accion.LOBO, 1, 5])),
+    # Longitud de un id mayor que los bytes que quedan
+    _b64(bytes([callbacks.VERSION, Accion.LOBO, 4, 1, 2])),
+    _b64(bytes([callbacks.VERSION, Accion.LOBO, 1, 5, 8])),
+])
+def test_decode_malformed(text):
+    with pytest.raises(CallbackDataError):
+        decode(text)
+
+
+def test_every_action_has_its_ids():
+    assert set(callbacks.IDS) == set(Accion)
+
+
+def _update(data: str):
+    return SimpleNamespace(callback_query=SimpleNamespace(data=data))
+
+
+class _Router:
+    """Router con un handler que apunta sus llamadas."""
+
+    def __init__(self):
+        self.calls = []
+        self.expired = []
+
+        async def handler(update, context, *ids):
+            self.calls.append(ids)
+            return "ok"
+
+        async def expired(update, context):
+            self.expired.append(update.callback_query.data)
+
+        self.router = CallbackRouter(expired=expired)
+        self.router.add(Accion.LOBO, handler)
+        self.router.add(Accion.CUPIDO_CONFIRMAR, handler)
+
+    def handle(self, data: str):
+        return asyncio.run(self.router.handle(_update(data), None))
+
+
+def test_router_dispatch():
+    r = _Router()
+    assert r.handle(encode(Accion.LOBO, SUPERGRUPO, 7)) == "ok"
+    assert r.handle(encode(Accion.CUPIDO_CONFIRMAR, SUPERGRUPO)) == "ok"
+    assert r.calls == [(SUPERGRUPO, 7), (SUPERGRUPO,)]
+    assert r.expired == []
+
+
+@pytest.mark.parametrize("data", [
+    "basura",
+    # Accion sin handler
+    encode(Accion.VIDENTE, SUPERGRUPO, 7),
+    # Numero de ids que no es el de la accion
+    encode(Accion.LOBO, SUPERGRUPO),
+    encode(Accion.LOBO, SUPERGRUPO, 7, 8),
+    encode(Accion.CUPIDO_CONFIRMAR),
+])
+def test_router_expired(data):
+    r = _Router()
+    assert r.handle(data) is None
+    assert r.calls == []
+    assert r.expired == [data]
+
+
+def test_router_without_expired_handler():
+    router = CallbackRouter()
+    assert asyncio.run(router.handle(_update("basura"), None)) is None
+
+
+def test_router_duplicate_action():
+    r = _Router()
+    with pytest.raises(ValueError):
+        r.router.add(Accion.LOBO, r.router.handle)
@@ -0,0 +1,157 @@
+import asyncio
+
+from core.deadlines import DeadlineScheduler
+
+# Margen para esperar un vencimiento: no es lo que tarda, solo el tope si no llega
+ESPERA = 5
+
+
+def _run(test):
+    """Ejecuta test(scheduler, vencidos) con un scheduler ya arrancado.
+
+    `vencidos` es una cola con (clave, stamp) de cada plazo vencido, en el orden
+    en que vencen; los tests esperan a lo que necesitan en vez de dormir.
+    """
+    async def main():
+        vencidos = asyncio.Queue()
+
+        async def callback(key, stamp):
+            vencidos.put_nowait((key, stamp))
+
+        scheduler = DeadlineScheduler(callback)
+        scheduler.start()
+        try:
+            await test(scheduler, vencidos)
+        finally:
+            await scheduler.stop()
+        return scheduler
+
+    return asyncio.run(main())
+
+
+async def _siguiente(vencidos: asyncio.Queue):
+    return await asyncio.wait_for(vencidos.get(), ESPERA)
+
+
+def test_expires():
+    async def test(scheduler, vencidos):
+        scheduler.schedule("a", 0.01, stamp=1)
+        assert len(scheduler) == 1
+        assert await _siguiente(vencidos) == ("a", 1)
+        assert len(scheduler) == 0
+
+    assert _run(test).expired == 1
+
+
+def test_expires_in_order():
+    async def test(scheduler, vencidos):
+        scheduler.schedule("b", 0.02, stamp="b")
+        scheduler.schedule("a", 0.01, stamp="a")
+        scheduler.schedule("c", 0.03, stamp="c")
+        assert [(await _siguiente(vencidos))[0] for _ in range(3)] == ["a", "b", "c"]
+
+    _run(test)
+
+
+def test_replace_later():
+    async def test(scheduler, vencidos):
+        scheduler.schedule("a", 0.01, stamp=1)
+        scheduler.schedule("a", 0.02, stamp=2)
+        assert len(scheduler) == 1
+        # El primer plazo se sustituyo: habria vencido antes que el segundo
+        assert await _siguiente(vencidos) == ("a", 2)
+        assert vencidos.empty()
+
+    assert _run(test).expired == 1
+
+
+def test_replace_earlier():
+    async def test(scheduler, vencidos):
+        scheduler.schedule("a", 10, stamp=1)
+        scheduler.schedule("a", 0.01, stamp=2)
+        assert await _siguiente(vencidos) == ("a", 2)
+        assert len(scheduler) == 0
+
+    assert _run(test).expired == 1
+
+
+def test_cancel():
+    async def test(scheduler, vencidos):
+        scheduler.schedule("a", 0.01)
+        scheduler.schedule("b", 0.01)
+        scheduler.cancel("a")
+        scheduler.cancel("a")
+        scheduler.cancel("no existe")
+        assert list(scheduler.keys()) == ["b"]
+        assert scheduler.remaining("a") == 0
+        # "a" vencia a la vez y se programo antes: si no se hubiera cancelado saldria primero
+        assert await _siguiente(vencidos) == ("b", None)
+        assert vencidos.empty()
+
+    assert _run(test).expired == 1
+
+
+def test_schedule_after_cancel():
+    async def test(scheduler, vencidos):
+        scheduler.schedule("a", 0.01, stamp=1)
+        scheduler.cancel("a")
+        scheduler.schedule("a", 0.02, stamp=2)
+        assert await _siguiente(vencidos) == ("a", 2)
+        assert vencidos.empty()
+
+    assert _run(test).expired == 1
+
+
+def test_remaining():
+    async def test(scheduler, vencidos):
+        scheduler.schedule("a", 10)
+        assert 9 < scheduler.remaining("a") <= 10
+        scheduler.schedule("a", 5)
+        assert 4 < scheduler.remaining("a") <= 5
+
+    _run(test)
+
+
+def test_replaced_entries_are_compacted():
+    async def test(scheduler, vencidos):
+        for i in range(5000):
+            scheduler.schedule("a", 10 + i)
+        assert len(scheduler) == 1
+        assert len(scheduler._heap) <= 2 * len(scheduler) + 1024 + 1
+
+    _run(test)
+
+
+def test_scheduled_before_start():
+    async def main():
+        vencidos = asyncio.Queue()
+
+        async def callback(key, stamp):
+            vencidos.put_nowait(key)
+
+        scheduler = DeadlineScheduler()
+        scheduler.schedule("a", 0)
+        # Sin arrancar no hay temporizador: no puede vencer
+        assert scheduler._timer is None
+        assert list(scheduler.keys()) == ["a"]
+        # Al arrancar se arma el temporizador de los plazos ya programados
+        scheduler.start(callback)
+        key = await _siguiente(vencidos)
+        await scheduler.stop()
+        return key
+
+    assert asyncio.run(main()) == "a"
+
+
+def test_stop():
+    async def test(scheduler, vencidos):
+        scheduler.schedule("a", 0)
+        await scheduler.stop()
+        # Parado no queda temporizador y programar no arma otro
+        assert scheduler._timer is None
+        scheduler.schedule("b", 0)
+        assert scheduler._timer is None
+        assert sorted(scheduler.keys()) == ["a", "b"]
+        assert vencidos.empty()
+
+    assert _run(test).expired == 0
@@ -0,0 +1,326 @@
+from games import textos
+from games.hombres_lobo import WerewolfGame
+from games.hombres_lobo import night
+from games.hombres_lobo.game import GamePhase
+from games.hombres_lobo.roles import Role
+from games.tally import NO_LYNCH
+
+# Reparto fijo de 12 jugadores: user_id -> rol
+LOBO_1, LOBO_2, VIDENTE, BRUJA, CAZADOR, PROTECTOR, CUPIDO = range(1, 8)
+ALDEANOS = list(range(8, 13))
+ROLES = {
+    LOBO_1: Role.HOMBRE_LOBO, LOBO_2: Role.HOMBRE_LOBO, VIDENTE: Role.VIDENTE, BRUJA: Role.BRUJA,
+    CAZADOR: Role.CAZADOR, PROTECTOR: Role.PROTECTOR, CUPIDO: Role.CUPIDO,
+    **{user_id: Role.ALDEANO for user_id in ALDEANOS},
+}
+
+
+def _partida(roles: dict = ROLES) -> WerewolfGame:
+    """Partida en la primera noche con los roles repartidos como `roles`."""
+    game = WerewolfGame(chat_id=-1, creator_id=1)
+    for user_id in roles:
+        game.add_player(user_id, f"Jugador {user_id}")
+    game.start_game(1, 0)
+    for user_id, role in roles.items():
+        game.players[user_id].role = role
+    game._rebuild_indexes()
+    game._reset_night_phase()
+    return game
+
+
+def _acciones_sin_lobos(game: WerewolfGame):
+    """Actuan Cupido, Protector y Vidente (si les toca)."""
+    if Role.CUPIDO in game.pending_actions:
+        assert game.cupido_action(CUPIDO, ALDEANOS[3], ALDEANOS[4])[0]
+    assert game.protector_action(PROTECTOR, ALDEANOS[2])[0]
+    assert game.vidente_action(VIDENTE, LOBO_1)[0]
+
+
+# Pipeline de la noche
+
+def test_prerequisites():
+    assert night.NIGHT_PREREQUISITES == {Role.BRUJA: Role.HOMBRE_LOBO}
+    # Los lobos resuelven antes que la Bruja (puede curar a su victima)
+    order = [role for role, _ in night.RESOLUTION]
+    assert order.index(Role.HOMBRE_LOBO) < order.index(Role.BRUJA)
+
+
+def test_first_night_pending_actions():
+    game = _partida()
+    assert game.pending_actions == {Role.CUPIDO, Role.PROTECTOR, Role.HOMBRE_LOBO, Role.VIDENTE, Role.BRUJA}
+    # La Bruja espera a los lobos
+    assert Role.BRUJA not in game.awake_roles()
+    assert game.awake_roles() == [role for role in night.NIGHT_ORDER if role in game.pending_actions - {Role.BRUJA}]
+    assert game.pop_ready_prompts() == []
+
+
+def test_cupido_only_first_night():
+    game = _partida()
+    game.day_number = 2
+    game._reset_night_phase()
+    assert Role.CUPIDO not in game.pending_actions
+
+
+def test_bruja_prompted_after_wolves():
+    game = _partida()
+    _acciones_sin_lobos(game)
+    assert game.pop_ready_prompts() == []
+
+    game.wolf_vote(LOBO_1, ALDEANOS[0])
+    assert game.wolf_target is None
+    assert game.pop_ready_prompts() == []
+    assert not game.night_complete()
+
+    game.wolf_vote(LOBO_2, ALDEANOS[0])
+    assert game.wolf_target == ALDEANOS[0]
+    assert game.awake_roles() == [Role.BRUJA]
+    assert game.pop_ready_prompts() == [Role.BRUJA]
+    # Solo se avisa una vez
+    assert game.pop_ready_prompts() == []
+    assert not game.night_complete()
+
+    assert game.bruja_action(BRUJA, heal=True)[0]
+    assert game.night_complete()
+    game.resolve_night()
+    # La Bruja salvo a la victima
+    assert game.night_deaths == []
+    assert game.phase == GamePhase.DAY_DISCUSSION
+
+
+def test_bruja_cannot_act_before_wolves():
+    game = _partida()
+    ok, _ = game.bruja_action(BRUJA)
+    assert not ok
+    assert Role.BRUJA in game.pending_actions
+
+
+def test_expire_night_with_partial_wolf_votes():
+    game = _partida()
+    game.wolf_vote(LOBO_1, ALDEANOS[0])
+
+    assert game.expire_night()[0]
+    # Atacan al mas votado; el resto de roles se cierran sin actuar
+    assert game.wolf_target == ALDEANOS[0]
+    assert game.pending_actions == {Role.BRUJA}
+    # La Bruja no se cierra: se le avisa ahora y tiene su propio plazo
+    assert game.pop_ready_prompts() == [Role.BRUJA]
+    assert not game.night_complete()
+
+    game.expire_night()
+    assert game.night_complete()
+    game.resolve_night()
+    assert game.night_deaths == [ALDEANOS[0]]
+
+
+def test_expire_night_without_wolf_votes():
+    game = _partida()
+    game.expire_night()
+    assert game.wolf_target is None
+    assert game.pop_ready_prompts() == [Role.BRUJA]
+    game.expire_night()
+    game.resolve_night()
+    assert game.night_deaths == []
+
+
+def test_expire_night_only_at_night():
+    game = _partida()
+    game.phase = GamePhase.DAY_DISCUSSION
+    assert not game.expire_night()[0]
+
+
+def test_bruja_leaving_after_wolves_is_not_prompted():
+    game = _partida()
+    _acciones_sin_lobos(game)
+    game.wolf_vote(LOBO_1, ALDEANOS[0])
+    game.wolf_vote(LOBO_2, ALDEANOS[0])
+    game.remove_player(BRUJA)
+
+    assert Role.BRUJA not in game.pending_actions
+    assert game.pop_ready_prompts() == []
+    assert game.night_complete()
+
+
+def test_resolution_uses_recorded_actions():
+    game = _partida()
+    _acciones_sin_lobos(game)
+    game.wolf_vote(LOBO_1, ALDEANOS[0])
+    game.wolf_vote(LOBO_2, ALDEANOS[0])
+    game.bruja_action(BRUJA, kill_target=ALDEANOS[1])
+    # La Bruja se va antes del amanecer: su pocion cuenta igual
+    game.remove_player(BRUJA)
+
+    game.resolve_night()
+    assert set(game.night_deaths) == {ALDEANOS[0], ALDEANOS[1]}
+
+
+def _noche(game: WerewolfGame, victima: int):
+    """Noche completa en la que los lobos atacan a `victima` y nadie la salva."""
+    _acciones_sin_lobos(game)
+    for wolf in game.get_wolves():
+        if wolf.is_alive:
+            game.wolf_vote(wolf.user_id, victima)
+    game.bruja_action(BRUJA)
+    assert game.night_complete()
+    return game.resolve_night()
+
+
+def _linchar(game: WerewolfGame, victima: int):
+    """Todos los vivos votan a `victima` (ella vota no linchar)."""
+    game.start_voting()
+    result = None
+    for player in game.get_alive_players():
+        target = victima if player.user_id != victima else NO_LYNCH
+        result = game.day_vote(player.user_id, target)
+    return result
+
+
+# Noche completa, enamorados y Cazador
+
+def test_night_completes_when_all_act():
+    game = _partida()
+    ok, msg = _noche(game, ALDEANOS[0])
+    assert ok
+    assert game.night_deaths == [ALDEANOS[0]]
+    assert not game.players[ALDEANOS[0]].is_alive
+    assert game.phase == GamePhase.DAY_DISCUSSION
+    assert game.players[ALDEANOS[0]].name in msg
+
+
+def test_lover_dies_with_night_victim():
+    game = _partida()
+    # _acciones_sin_lobos enamora a ALDEANOS[3] y ALDEANOS[4]
+    _noche(game, ALDEANOS[3])
+    assert game.players[ALDEANOS[3]].lover_id == ALDEANOS[4]
+    assert game.night_deaths == [ALDEANOS[3], ALDEANOS[4]]
+    assert not game.players[ALDEANOS[4]].is_alive
+
+
+def test_lover_dies_with_lynched():
+    game = _partida()
+    _noche(game, ALDEANOS[0])
+    ok, msg = _linchar(game, ALDEANOS[4])
+    assert ok
+    assert not game.players[ALDEANOS[4]].is_alive
+    assert not game.players[ALDEANOS[3]].is_alive
+    assert "muere de amor" in msg
+    assert game.phase == GamePhase.NIGHT
+    assert game.day_number == 2
+
+
+def test_hunter_shoots_when_lynched():
+    game = _partida()
+    _noche(game, ALDEANOS[0])
+    assert game.get_hunter() is None
+    _linchar(game, CAZADOR)
+
+    assert game.phase == GamePhase.HUNTER
+    assert game.get_hunter() is game.players[CAZADOR]
+    # Solo dispara el Cazador, y a un vivo
+    assert not game.hunter_shot(LOBO_1, LOBO_2)[0]
+    assert not game.hunter_shot(CAZADOR, ALDEANOS[0])[0]
+
+    ok, _ = game.hunter_shot(CAZADOR, LOBO_1)
+    assert ok
+    assert not game.players[LOBO_1].is_alive
+    assert game.phase == GamePhase.NIGHT
+    assert game.get_hunter() is None
+    # Ya disparo
+    assert not game.hunter_shot(CAZADOR, LOBO_2)[0]
+
+
+def test_hunter_shot_can_end_game():
+    game = _partida({LOBO_1: Role.HOMBRE_LOBO, CAZADOR: Role.CAZADOR,
+                     **{user_id: Role.ALDEANO for user_id in ALDEANOS[:3]}})
+    game.wolf_vote(LOBO_1, ALDEANOS[0])
+    game.resolve_night()
+    _linchar(game, CAZADOR)
+    assert game.phase == GamePhase.HUNTER
+
+    ok, msg = game.hunter_shot(CAZADOR, LOBO_1)
+    assert ok
+    assert game.phase == GamePhase.FINISHED
+    assert textos.GANAN_ALDEANOS in msg
+
+
+def test_skip_hunter():
+    game = _partida()
+    _noche(game, ALDEANOS[0])
+    _linchar(game, CAZADOR)
+    assert game.skip_hunter()[0]
+    assert game.phase == GamePhase.NIGHT
+    assert not game.skip_hunter()[0]
+
+
+# Jugadores que se van con la partida empezada
+
+def test_leaver_votes_are_retracted():
+    game = _partida()
+    _noche(game, ALDEANOS[0])
+    game.start_voting()
+    game.day_vote(ALDEANOS[1], ALDEANOS[2])
+    game.day_vote(ALDEANOS[2], LOBO_1)
+    game.day_vote(LOBO_1, ALDEANOS[2])
+
+    ok, _ = game.remove_player(ALDEANOS[2])
+    assert ok
+    # Sigue en la partida, como muerto
+    assert ALDEANOS[2] in game.players
+    assert not game.players[ALDEANOS[2]].is_alive
+    # Su voto no cuenta y quien le voto tiene que volver a votar
+    assert game.day_tally.count(LOBO_1) == 0
+    assert game.day_tally.count(ALDEANOS[2]) == 0
+    assert len(game.day_tally) == 0
+    assert game.players[ALDEANOS[1]].vote is None
+    assert game.players[LOBO_1].vote is None
+    assert game.phase == GamePhase.DAY_VOTING
+    # Ya no se le puede votar
+    assert not game.day_vote(ALDEANOS[1], ALDEANOS[2])[0]
+
+
+def test_leaver_completes_voting():
+    game = _partida()
+    _noche(game, ALDEANOS[0])
+    game.start_voting()
+    for player in game.get_alive_players():
+        if player.user_id != ALDEANOS[1]:
+            game.day_vote(player.user_id, NO_LYNCH)
+    assert not game.voting_complete()
+    game.remove_player(ALDEANOS[1])
+    assert game.voting_complete()
+
+
+def test_last_holder_leaving_completes_action():
+    game = _partida()
+    assert Role.PROTECTOR in game.pending_actions
+    game.remove_player(PROTECTOR)
+    assert Role.PROTECTOR not in game.pending_actions
+    assert game.players[PROTECTOR].role == Role.PROTECTOR
+
+
+def test_wolf_leaving_completes_wolf_vote():
+    game = _partida()
+    game.wolf_vote(LOBO_1, ALDEANOS[0])
+    assert Role.HOMBRE_LOBO in game.pending_actions
+    game.remove_player(LOBO_2)
+    # Ya han votado todos los lobos que quedan
+    assert Role.HOMBRE_LOBO not in game.pending_actions
+    assert game.wolf_target == ALDEANOS[0]
+    assert game.pop_ready_prompts() == [Role.BRUJA]
+
+
+def test_wolf_leaving_retracts_wolf_vote():
+    game = _partida()
+    game.wolf_vote(LOBO_1, ALDEANOS[0])
+    game.remove_player(LOBO_1)
+    assert Role.HOMBRE_LOBO in game.pending_actions
+    game.wolf_vote(LOBO_2, ALDEANOS[1])
+    assert game.wolf_target == ALDEANOS[1]
+
+
+def test_leaving_can_end_game():
+    game = _partida()
+    game.remove_player(LOBO_1)
+    ok, msg = game.remove_player(LOBO_2)
+    assert ok
+    assert game.phase == GamePhase.FINISHED
+    assert textos.GANAN_ALDEANOS in msg
@@ -0,0 +1,98 @@
+import asyncio
+
+from core import snapshot
+from core.journal import Journal, read, replay
+from core.registry import GameRegistry
+from games.hombres_lobo import WerewolfGame
+
+from .partidas import CHAT, estado, jugar, partida
+
+def _reiniciar(directory, path) -> tuple[GameRegistry, Journal, int]:
+    """Arranque del bot: registro nuevo restaurado del snapshot y el journal."""
+    registry = GameRegistry()
+    journal = Journal(str(directory))
+    _, replayed = snapshot.restore(registry, str(path), journal)
+    return registry, journal, replayed
+
+
+def _parar(journal: Journal):
+    asyncio.run(journal.stop())
+
+
+def test_replay_reproduces_game(tmp_path):
+    registry = GameRegistry()
+    journal = Journal(str(tmp_path))
+    registry.attach_journal(journal)
+    game = partida(registry)
+    jugar(game, 5)
+    _parar(journal)
+
+    copia = GameRegistry()
+    count, last_seq = replay(copia, str(tmp_path))
+    assert count == last_seq == journal.seq
+    assert estado(copia) == estado(registry)
+    assert copia.chat_for_user(1) == CHAT
+
+
+def test_replay_does_not_record_again(tmp_path):
+    registry = GameRegistry()
+    journal = Journal(str(tmp_path))
+    registry.attach_journal(journal)
+    game = partida(registry)
+    jugar(game, 2)
+    state, seq = registry.export_state(), journal.seq
+    jugar(game, 3, seed=2)
+    _parar(journal)
+
+    # Partidas ya cargadas y observadas por el journal antes del replay
+    copia = GameRegistry()
+    copia.load_state(state)
+    otro = Journal(str(tmp_path / "otro"))
+    copia.attach_journal(otro)
+
+    count, _ = replay(copia, str(tmp_path), after_seq=seq)
+    assert count == journal.seq - seq
+    assert otro._buffer == []
+    assert estado(copia) == estado(registry)
+    # Al terminar vuelven a registrar sus acciones
+    assert copia.get(CHAT).observer == otro.observe
+
+
+def test_restarts_do_not_duplicate_entries(tmp_path):
+    directory = tmp_path / "journal"
+    path = tmp_path / "partidas.snapshot"
+    registry = GameRegistry()
+    journal = Journal(str(directory))
+    registry.attach_journal(journal)
+    game = partida(registry)
+    jugar(game, 2)
+    asyncio.run(journal.flush())
+    asyncio.run(snapshot.Snapshotter(registry, str(path), journal=journal).save())
+    snapshot_seq = journal.seq
+
+    # Acciones despues del snapshot (solo estan en el journal)
+    alive = game.get_alive_players()
+    game.start_voting()
+    for player in alive[:6]:
+        game.day_vote(player.user_id, alive[-1].user_id)
+    _parar(journal)
+    assert journal.seq == snapshot_seq + 7
+
+    # Dos arranques seguidos sin snapshot nuevo entre medias
+    for _ in range(2):
+        restored, journal, replayed = _reiniciar(directory, path)
+        assert replayed == 7
+        assert journal._buffer == []
+        assert journal.seq == snapshot_seq + 7
+        assert estado(restored) == estado(registry)
+        _parar(journal)
+
+    # Lo nuevo sigue la numeracion y tambien se repite en el siguiente arranque
+    restored.get(CHAT).day_vote(alive[6].user_id, alive[-1].user_id)
+    _parar(journal)
+    seqs = [entry[0] for entry in read(str(directory))]
+    assert seqs == list(range(snapshot_seq + 1, snapshot_seq + 9))
+
+    final, journal, replayed = _reiniciar(directory, path)
+    assert replayed == 8
+    assert estado(final) == estado(restored)
@@ -0,0 +1,97 @@
+import pytest
+
+from core import snapshot
+from core.registry import GameRegistry
+from games.hombres_lobo import WerewolfGame
+from games.impostor import ImpostorGame
+
+from .partidas import estado, estado_partida, jugar, partida
+
+
+def _igual(game: WerewolfGame, restored: WerewolfGame):
+    assert estado_partida(restored) == estado_partida(game)
+    # Lo que no se guarda se reconstruye igual
+    assert restored.players == game.players
+    assert restored._alive == game._alive
+    assert restored._holders == game._holders
+    assert restored._alive_non_wolves == game._alive_non_wolves
+    assert restored._enchanted_alive == game._enchanted_alive
+    assert restored._flautista_id == game._flautista_id
+    assert restored.pending_actions == game.pending_actions
+    for tally in ("wolf_tally", "day_tally"):
+        original, copia = getattr(game, tally), getattr(restored, tally)
+        assert (copia.votes, copia.counts, copia.max_count) == (original.votes, original.counts, original.max_count)
+
+
+@pytest.mark.parametrize("fases", [0, 1, 2, 3, 6, 40])
+@pytest.mark.parametrize("jugadores", [6, 9, 14])
+def test_werewolf_state_round_trip(jugadores, fases):
+    game = partida(GameRegistry(), jugadores, seed=jugadores)
+    jugar(game, fases, seed=fases)
+    _igual(game, WerewolfGame.from_state(game.to_state()))
+
+
+def test_werewolf_round_trip_mid_night():
+    game = partida(GameRegistry(), 12)
+    # Un lobo ha votado y el otro no: la Bruja sigue esperando
+    wolf = game.get_wolves()[0]
+    game.wolf_vote(wolf.user_id, game.get_alive_non_wolves()[0].user_id)
+    restored = WerewolfGame.from_state(game.to_state())
+    _igual(game, restored)
+    assert restored.awake_roles() == game.awake_roles()
+
+
+def test_impostor_state_round_trip():
+    game = ImpostorGame(chat_id=-5, creator_id=1)
+    for user_id in range(1, 6):
+        game.add_player(user_id, f"Jugador {user_id}")
+    game.start_game(1, 7)
+    game.get_player_role(2)
+    game.start_voting()
+    game.vote(1, 2)
+    game.vote(3, 2)
+
+    restored = ImpostorGame.from_state(game.to_state())
+    assert restored.to_state() == game.to_state()
+    assert restored.players == game.players
+    assert restored.tally.votes == game.tally.votes
+    assert restored.get_results() == game.get_results()
+
+
+def test_dump_and_load(tmp_path):
+    registry = GameRegistry()
+    for i, fases in enumerate((0, 2, 5)):
+        jugar(partida(registry, 10, seed=i, chat_id=-100 - i), fases)
+    impostor = ImpostorGame(chat_id=-200, creator_id=50)
+    registry.create(-200, impostor)
+    impostor.add_player(50, "Jugador 50")
+    registry.map_users(-200, [50])
+
+    path = tmp_path / "partidas.snapshot"
+    snapshot.write_atomic(str(path), snapshot.dump_bytes(registry, journal_seq=42))
+
+    restored = GameRegistry()
+    assert snapshot.load(restored, str(path)) == (4, 42)
+    assert estado(restored) == estado(registry)
+    assert restored.chat_for_user(1) == registry.chat_for_user(1)
+    assert restored.chat_for_user(50) == -200
+    assert len(restored) == 4
+
+
+def test_load_missing(tmp_path):
+    assert snapshot.load(GameRegistry(), str(tmp_path / "no_existe")) == (0, 0)
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"BM",
+    snapshot.MAGIC,
+    b"XXXX" + bytes([snapshot.SNAPSHOT_VERSION]),
+    snapshot.MAGIC + bytes([snapshot.SNAPSHOT_VERSION + 1]),
+])
+def test_load_unknown_format(tmp_path, data):
+    path = tmp_path / "partidas.snapshot"
+    path.write_bytes(data)
+    registry = GameRegistry()
+    assert snapshot.load(registry, str(path)) == (0, 0)
+    assert len(registry) == 0
@@ -0,0 +1,149 @@
+from games.tally import NO_LYNCH, VoteTally
+
+
+def test_cast_counts_votes():
+    tally = VoteTally()
+    tally.cast(1, 10)
+    tally.cast(2, 10)
+    tally.cast(3, 20)
+
+    assert len(tally) == 3
+    assert tally.count(10) == 2
+    assert tally.count(20) == 1
+    assert tally.count(30) == 0
+    assert tally.winner() == 10
+    assert tally.ranking() == [(10, 2), (20, 1)]
+
+
+def test_cast_replaces_previous_vote():
+    tally = VoteTally()
+    tally.cast(1, 10)
+    tally.cast(1, 20)
+
+    assert len(tally) == 1
+    assert tally.count(10) == 0
+    assert tally.winner() == 20
+
+
+def test_repeated_vote_counts_once():
+    tally = VoteTally()
+    tally.cast(1, 10)
+    tally.cast(1, 10)
+
+    assert tally.count(10) == 1
+    assert tally.max_count == 1
+
+
+def test_retract():
+    tally = VoteTally()
+    tally.cast(1, 10)
+    tally.cast(2, 10)
+    tally.cast(3, 20)
+
+    assert tally.retract(1) == 10
+    assert tally.retract(1) is None
+    assert len(tally) == 2
+    # 10 y 20 quedan empatados a un voto
+    assert tally.max_count == 1
+    assert tally.is_tie()
+    assert tally.winner() is None
+
+
+def test_retract_last_vote():
+    tally = VoteTally()
+    tally.cast(1, 10)
+    tally.retract(1)
+
+    assert len(tally) == 0
+    assert tally.max_count == 0
+    assert tally.leaders() == []
+    assert tally.ranking() == []
+    assert not tally.is_tie()
+    assert tally.winner() is None
+
+
+def test_retract_target():
+    tally = VoteTally()
+    tally.cast(1, 10)
+    tally.cast(2, 10)
+    tally.cast(3, 20)
+
+    assert tally.retract_target(10) == [1, 2]
+    assert tally.retract_target(10) == []
+    assert tally.votes == {3: 20}
+    assert tally.winner() == 20
+
+
+def test_tie():
+    tally = VoteTally()
+    tally.cast(1, 10)
+    tally.cast(2, 20)
+
+    assert tally.is_tie()
+    assert tally.winner() is None
+    # Lideres en el orden en que llegaron al maximo
+    assert tally.leaders() == [10, 20]
+
+    # Un voto mas deshace el empate
+    tally.cast(3, 20)
+    assert not tally.is_tie()
+    assert tally.winner() == 20
+    assert tally.leaders() == [20]
+
+
+def test_tie_broken_by_changing_vote():
+    tally = VoteTally()
+    tally.cast(1, 10)
+    tally.cast(2, 20)
+    tally.cast(2, 10)
+
+    assert tally.winner() == 10
+    assert tally.count(20) == 0
+
+
+def test_no_lynch_is_a_target():
+    tally = VoteTally()
+    tally.cast(1, NO_LYNCH)
+    tally.cast(2, NO_LYNCH)
+    tally.cast(3, 10)
+
+    assert tally.winner() == NO_LYNCH
+    assert tally.ranking() == [(NO_LYNCH, 2), (10, 1)]
+
+
+def test_clear():
+    tally = VoteTally()
+    tally.cast(1, 10)
+    tally.cast(2, 20)
+    tally.clear()
+
+    assert len(tally) == 0
+    assert tally.max_count == 0
+    assert tally.winner() is None
+    tally.cast(3, 30)
+    assert tally.winner() == 30
+
+
+def test_matches_full_recount():
+    # Secuencia fija de votos, cambios y retiradas contra un recuento desde cero
+    tally = VoteTally()
+    votes = {}
+    for step in range(500):
+        voter = step * 7 % 13
+        if step % 5 == 4:
+            tally.retract(voter)
+            votes.pop(voter, None)
+        else:
+            target = step * 11 % 6
+            tally.cast(voter, target)
+            votes[voter] = target
+
+        counts = {}
+        for target in votes.values():
+            counts[target] = counts.get(target, 0) + 1
+        best = max(counts.values(), default=0)
+        leaders = {target for target, count in counts.items() if count == best}
+        assert tally.counts == counts
+        assert tally.max_count == best
+        assert set(tally.leaders()) == (leaders if best else set())
+        assert tally.winner() == (next(iter(leaders)) if len(leaders) == 1 else None)